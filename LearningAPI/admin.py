@@ -1,5 +1,6 @@
 from django import forms
 from django.contrib import admin
+from django.utils import timezone
 
 # Register your models here.
 from .models.people import (
@@ -15,6 +16,7 @@ from .models.coursework import (
     CohortCourse, FoundationsLearnerProfile, FoundationsExercise
 )
 
+from .models import DeferredGithubRequest, SlackMessage
 from .models.skill import (
     CoreSkill, CoreSkillRecord,
     LearningRecordEntry, LearningRecord, LearningWeight,
@@ -190,3 +192,24 @@ class FoundationsExerciseAdmin(admin.ModelAdmin):
     ordering = ('-pk',)
     search_fields = ["learner_name"]
     search_help_text = "Search by learner name"
+
+@admin.register(SlackMessage)
+class SlackMessageAdmin(admin.ModelAdmin):
+    """Slack outbox"""
+    list_display = ('channel', 'status', 'attempts', 'created_on', 'sent_on', 'last_error')
+    list_filter = ('status',)
+    ordering = ('-pk',)
+    actions = ['retry']
+
+    @admin.action(description="Retry the selected messages")
+    def retry(self, request, queryset):
+        queryset.exclude(status=SlackMessage.SENT).update(
+            status=SlackMessage.PENDING, attempts=0, available_on=timezone.now()
+        )
+
+@admin.register(DeferredGithubRequest)
+class DeferredGithubRequestAdmin(admin.ModelAdmin):
+    """GitHub writes deferred by the rate limit"""
+    list_display = ('method', 'url', 'status', 'attempts', 'available_on', 'last_error')
+    list_filter = ('status',)
+    ordering = ('-pk',)
@@ -0,0 +1,136 @@
+"""Versioned response cache backed by Valkey
+
+Cached values are stored under keys that embed a version counter for their
+namespace. Writers never delete cached values; they bump the namespace version
+and the stale entries simply stop being read and expire on their own.
+
+Version counters start at the time they are first used rather than at zero, so
+a counter lost to eviction or a restart cannot come back at a version whose
+cached values are still stored.
+"""
+import time
+
+import valkey
+import structlog
+
+from django.conf import settings
+
+from LearningAPI.metrics import response_cache_hits_total, response_cache_misses_total
+
+log = structlog.get_logger(__name__)
+
+valkey_client = valkey.Valkey(
+    host=settings.VALKEY_CONFIG['HOST'],
+    port=settings.VALKEY_CONFIG['PORT'],
+    db=settings.VALKEY_CONFIG['DB'],
+)
+
+DEFAULT_TTL = 60 * 60
+
+
+def seed_version():
+    """Starting value of a new version counter, the current time in microseconds"""
+    return time.time_ns() // 1000
+
+
+def get_versions(namespaces):
+    """Get the current versions of cache namespaces, starting any that are missing
+
+    Args:
+        namespaces (list): Names of the groups of cached values, e.g. ["cohort_students:4"]
+
+    Returns:
+        list: The versions in the order given, or None when Valkey cannot be reached
+    """
+    keys = [f'version:{namespace}' for namespace in namespaces]
+    seed = seed_version()
+
+    try:
+        pipeline = valkey_client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.set(key, seed, nx=True)
+        pipeline.mget(keys)
+        return [int(version or 0) for version in pipeline.execute()[-1]]
+    except valkey.exceptions.ValkeyError as ex:
+        log.warning("Cache version lookup failed", namespaces=namespaces, error=str(ex))
+        return None
+
+
+def get_version(namespace):
+    """Get the current version of a cache namespace
+
+    Args:
+        namespace (str): Name of the group of cached values, e.g. "cohort_students:4"
+
+    Returns:
+        int: The version, or None when Valkey cannot be reached
+    """
+    versions = get_versions([namespace])
+    return None if versions is None else versions[0]
+
+
+def bump_version(*namespaces):
+    """Invalidate everything cached under the given namespaces
+
+    Args:
+        namespaces (str): Names of the groups of cached values to invalidate
+    """
+    seed = seed_version()
+
+    try:
+        pipeline = valkey_client.pipeline(transaction=False)
+        for namespace in namespaces:
+            pipeline.set(f'version:{namespace}', seed, nx=True)
+            pipeline.incr(f'version:{namespace}')
+        pipeline.execute()
+    except valkey.exceptions.ValkeyError as ex:
+        log.warning("Cache version bump failed", namespaces=namespaces, error=str(ex))
+
+
+def versioned_key(namespace, version):
+    return f'cache:{namespace}:v{version}'
+
+
+def get(cache_name, namespace, version):
+    """Fetch a cached value for a version of a namespace
+
+    Args:
+        cache_name (str): Label used for the hit/miss metrics
+        namespace (str): Name of the group of cached values
+        version (int): Version returned by get_version()
+
+    Returns:
+        bytes: The cached value, or None on a miss
+    """
+    value = None
+
+    if version is not None:
+        try:
+            value = valkey_client.get(versioned_key(namespace, version))
+        except valkey.exceptions.ValkeyError as ex:
+            log.warning("Cache read failed", namespace=namespace, error=str(ex))
+
+    if value is None:
+        response_cache_misses_total.labels(cache=cache_name).inc()
+    else:
+        response_cache_hits_total.labels(cache=cache_name).inc()
+
+    return value
+
+
+def set(namespace, version, value, ttl=DEFAULT_TTL):  # pylint: disable=redefined-builtin
+    """Store a value for a version of a namespace
+
+    Args:
+        namespace (str): Name of the group of cached values
+        version (int): Version returned by get_version() before the value was built
+        value (bytes): Value to cache
+        ttl (int): Seconds until the value expires
+    """
+    if version is None:
+        return
+
+    try:
+        valkey_client.set(versioned_key(namespace, version), value, ex=ttl)
+    except valkey.exceptions.ValkeyError as ex:
+        log.warning("Cache write failed", namespace=namespace, error=str(ex))
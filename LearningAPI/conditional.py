@@ -0,0 +1,76 @@
+"""Conditional GET for read-mostly resources
+
+Each model in signals.RESOURCE_SOURCES has a version counter in Valkey that is
+bumped whenever one of its rows is saved or deleted. A view wrapped with
+conditional() tags its response with an ETag made from the versions of the
+models it reads, and answers a request whose If-None-Match carries that ETag
+with 304 before running any query or serializer.
+
+The counters are cache version counters, so like them they start at the
+time they are first used and an ETag issued before Valkey lost its data
+cannot match again.
+"""
+import functools
+import hashlib
+
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+
+from LearningAPI import cache
+
+
+def resource_namespace(model):
+    """Name of the version namespace of a model's rows, e.g. resource:LearningAPI.course"""
+    return f'resource:{model._meta.label_lower}'
+
+
+def resource_etag(request, models):
+    """ETag for a response built from the rows of models, for the requesting user
+
+    Args:
+        request (Request): The request being answered
+        models (iterable): Models whose rows the response is built from
+
+    Returns:
+        str: The quoted ETag, or None when Valkey cannot be reached
+    """
+    versions = cache.get_versions([resource_namespace(model) for model in models])
+    if versions is None:
+        return None
+
+    token = ':'.join([str(request.user.id)] + [str(version) for version in versions])
+    return f'"{hashlib.md5(token.encode()).hexdigest()}"'
+
+
+def expire_resources(*models):
+    """Change the ETags of responses built from models once the transaction commits"""
+    namespaces = [resource_namespace(model) for model in models]
+    transaction.on_commit(lambda: cache.bump_version(*namespaces))
+
+
+def conditional(*models):
+    """Answer GET requests with 304 while the rows of models are unchanged
+
+    Use with method_decorator on a viewset's list or retrieve method. When
+    Valkey cannot be reached the view runs as usual without an ETag.
+
+    Args:
+        models: Models whose rows the view reads
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def __wrapper(request, *args, **kwargs):
+            etag = resource_etag(request, models)
+            if etag is None:
+                return func(request, *args, **kwargs)
+
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response['ETag'] = etag
+            return response
+        return __wrapper
+    return decorator
@@ -0,0 +1,438 @@
+"""Storage of Foundations exercise progress, with a write-behind buffer in Valkey
+
+Learners report progress on every attempt. Rather than writing each report to
+the database, buffer_update() coalesces the reports of an exercise into one
+pending update in Valkey: the highest attempt count, the earliest first
+attempt, the latest last attempt and completion, and the final code. The
+flush_foundations_progress command writes the pending updates in batches, and
+a completed exercise is written at once. Read endpoints overlay pending()
+updates on what the database holds.
+
+Pending updates are kept per learner in a hash keyed by exercise slug, with a
+set listing the learners that have any. A flush moves a learner's updates to
+an in-flight hash and only deletes them once the database write succeeds, so
+updates taken by a flush that dies are merged back by the next one.
+"""
+import json
+import time
+import uuid
+
+import valkey
+import structlog
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from LearningAPI import cache
+from LearningAPI.models.coursework import (
+    FoundationsExercise, FoundationsLearnerProfile, FoundationsLearnerSummary,
+)
+
+log = structlog.get_logger(__name__)
+
+LEARNERS_KEY = 'foundations:buffer:learners'
+LOCK_SECONDS = 60
+LOCK_POLL_SECONDS = 0.05
+
+# Seconds update() waits for a learner's running flush before writing a
+# completed exercise itself
+COMPLETION_LOCK_WAIT_SECONDS = 5
+
+# Columns overwritten when an update matches a stored exercise
+UPSERT_FIELDS = [
+    'learner_name', 'title', 'attempts', 'complete', 'completed_on',
+    'first_attempt', 'last_attempt', 'completed_code', 'used_solution',
+]
+
+# (request key, model field) of the timestamps in an update
+TIMESTAMPS = (
+    ('completedAt', 'completed_on'),
+    ('firstAttempt', 'first_attempt'),
+    ('lastAttempt', 'last_attempt'),
+)
+
+# Merges an update into the pending update of the same exercise and returns
+# the result. Timestamps are compared on their epoch copies ("_" prefixed),
+# and anything the update leaves out is kept from the pending update.
+MERGE_SCRIPT = """
+local update = cjson.decode(ARGV[2])
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if current then
+    local old = cjson.decode(current)
+    update.attempts = math.max(tonumber(old.attempts) or 0, tonumber(update.attempts) or 0)
+    update.completed = old.completed == true or update.completed == true
+    update.solutionShown = old.solutionShown == true or update.solutionShown == true
+    if old._firstAttempt and (not update._firstAttempt or old._firstAttempt < update._firstAttempt) then
+        update.firstAttempt = old.firstAttempt
+        update._firstAttempt = old._firstAttempt
+    end
+    for _, name in ipairs({'lastAttempt', 'completedAt'}) do
+        local stamp = '_' .. name
+        if old[stamp] and (not update[stamp] or old[stamp] > update[stamp]) then
+            update[name] = old[name]
+            update[stamp] = old[stamp]
+        end
+    end
+    for key, value in pairs(old) do
+        if update[key] == nil then
+            update[key] = value
+        end
+    end
+end
+local merged = cjson.encode(update)
+redis.call('HSET', KEYS[1], ARGV[1], merged)
+redis.call('SADD', KEYS[2], ARGV[3])
+return merged
+"""
+
+# Moves one pending update (ARGV[1] is the slug) or, without a slug, every
+# pending update of the learner to the in-flight hash, and returns them as a
+# flat field/value list
+TAKE_SCRIPT = """
+local taken = {}
+if ARGV[1] ~= '' then
+    local value = redis.call('HGET', KEYS[1], ARGV[1])
+    if value then
+        taken = {ARGV[1], value}
+    end
+else
+    taken = redis.call('HGETALL', KEYS[1])
+end
+if #taken > 0 then
+    redis.call('HSET', KEYS[2], unpack(taken))
+    for index = 1, #taken, 2 do
+        redis.call('HDEL', KEYS[1], taken[index])
+    end
+end
+return taken
+"""
+
+# Drops the in-flight updates of a learner once they are written, and takes
+# the learner off the list when nothing else is pending
+ACK_SCRIPT = """
+redis.call('DEL', KEYS[2])
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('SREM', KEYS[3], ARGV[1])
+end
+return 1
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def learner_key(learner_github_id):
+    return f'foundations:buffer:{learner_github_id}'
+
+
+def inflight_key(learner_github_id):
+    return f'foundations:buffer:{learner_github_id}:inflight'
+
+
+def lock_key(learner_github_id):
+    return f'foundations:buffer:{learner_github_id}:lock'
+
+
+def build_exercise(data):
+    """Build an unsaved FoundationsExercise from a progress update
+
+    Args:
+        data (dict): The update, using the keys of a PUT /foundations/<slug> body
+            plus the exercise `slug`
+
+    Returns:
+        FoundationsExercise: The exercise as it should be stored
+
+    Raises:
+        ValueError: When the update has no slug or userId, or a timestamp is invalid
+    """
+    if not data.get('slug') or data.get('userId') in (None, ''):
+        raise ValueError("Each update needs a 'slug' and a 'userId'")
+
+    timestamps = {}
+    for key, field in TIMESTAMPS:
+        value = data.get(key, None)
+        timestamps[field] = parse_datetime(value) if value else None
+        if value and timestamps[field] is None:
+            raise ValueError(f"'{key}' is not an ISO 8601 timestamp")
+
+    return FoundationsExercise(
+        slug=data['slug'],
+        learner_github_id=str(data['userId']),
+        learner_name=data.get('username', ""),
+        title=data.get('title', "Undefined"),
+        attempts=data.get('attempts', 0),
+        complete=bool(data.get('completed', False)),
+        completed_code=data.get('completedCode', None),
+        used_solution=bool(data.get('solutionShown', False)),
+        **timestamps
+    )
+
+
+def upsert_exercises(exercises):
+    """Store exercises and create profiles for new learners in one statement each
+
+    Rows are matched to stored exercises on (slug, learner_github_id). When
+    the same exercise appears more than once, the last update wins. The
+    learners' summaries are recalculated in the same transaction.
+
+    Args:
+        exercises (list): Unsaved FoundationsExercise instances
+
+    Returns:
+        int: Number of exercises stored
+    """
+    latest = {(exercise.slug, exercise.learner_github_id): exercise for exercise in exercises}
+    learners = {exercise.learner_github_id: exercise.learner_name for exercise in latest.values()}
+    if not latest:
+        return 0
+
+    with transaction.atomic():
+        known = set(
+            FoundationsLearnerProfile.objects.filter(learner_github_id__in=list(learners))
+            .values_list('learner_github_id', flat=True)
+        )
+        FoundationsLearnerProfile.objects.bulk_create([
+            FoundationsLearnerProfile(learner_github_id=learner_github_id, learner_name=learner_name)
+            for learner_github_id, learner_name in learners.items()
+            if learner_github_id not in known
+        ])
+        FoundationsExercise.objects.bulk_create(
+            latest.values(),
+            update_conflicts=True,
+            unique_fields=['slug', 'learner_github_id'],
+            update_fields=UPSERT_FIELDS,
+        )
+        FoundationsLearnerSummary.refresh(learners)
+
+    return len(latest)
+
+
+def buffer_update(data):
+    """Coalesce a progress update into the pending update of its exercise
+
+    Args:
+        data (dict): An update accepted by build_exercise()
+
+    Returns:
+        dict: The pending update after merging, or None when Valkey cannot
+            be reached and the update must be written directly
+    """
+    update = {key: value for key, value in data.items() if value is not None}
+    update['userId'] = str(update['userId'])
+    for key, _ in TIMESTAMPS:
+        if update.get(key):
+            update[f'_{key}'] = parse_datetime(update[key]).timestamp()
+
+    try:
+        merged = cache.valkey_client.eval(
+            MERGE_SCRIPT, 2, learner_key(update['userId']), LEARNERS_KEY,
+            update['slug'], json.dumps(update), update['userId']
+        )
+    except valkey.exceptions.ValkeyError as ex:
+        log.warning("Foundations buffer write failed", error=str(ex))
+        return None
+
+    return json.loads(merged)
+
+
+def pending(learner_ids=None):
+    """Read the pending updates of learners without removing them
+
+    Args:
+        learner_ids (iterable): GitHub ids of the learners, or None for every
+            learner with pending updates
+
+    Returns:
+        dict: Pending updates keyed by learner GitHub id, then exercise slug
+    """
+    try:
+        if learner_ids is None:
+            learner_ids = [member.decode() for member in cache.valkey_client.smembers(LEARNERS_KEY)]
+        learner_ids = [str(learner_id) for learner_id in learner_ids]
+        if not learner_ids:
+            return {}
+
+        pipeline = cache.valkey_client.pipeline(transaction=False)
+        for learner_id in learner_ids:
+            pipeline.hgetall(inflight_key(learner_id))
+            pipeline.hgetall(learner_key(learner_id))
+        entries = pipeline.execute()
+    except valkey.exceptions.ValkeyError as ex:
+        log.warning("Foundations buffer read failed", error=str(ex))
+        return {}
+
+    # Updates being flushed are shown until they are written, unless a newer
+    # pending update of the exercise replaces them
+    buffered = {}
+    for learner_id, inflight, waiting in zip(learner_ids, entries[0::2], entries[1::2]):
+        updates = {**inflight, **waiting}
+        if updates:
+            buffered[learner_id] = {slug.decode(): json.loads(value) for slug, value in updates.items()}
+    return buffered
+
+
+def flush(learner_github_id=None, slug=None, wait=0):
+    """Write pending updates to the database
+
+    Each learner's updates are flushed by one process at a time, under a
+    per-learner lock. Learners locked by another flush are skipped. Updates
+    are kept in Valkey until the database write succeeds, and merged back
+    into the buffer if it fails.
+
+    Args:
+        learner_github_id (str): Flush only this learner, and only the
+            exercise named by `slug` when given. Without it, every learner
+            with pending updates is flushed.
+        slug (str): Slug of the exercise to flush
+        wait (float): Seconds to wait for the learner's lock
+
+    Returns:
+        int: Number of exercises written, or None when Valkey cannot be
+            reached or the learner's lock was not obtained in time
+    """
+    try:
+        if learner_github_id is not None:
+            learner_ids = [str(learner_github_id)]
+        else:
+            learner_ids = [member.decode() for member in cache.valkey_client.smembers(LEARNERS_KEY)]
+        if not learner_ids:
+            return 0
+
+        token, locked = lock_learners(learner_ids, wait)
+        if not locked:
+            return None if learner_github_id is not None else 0
+
+        try:
+            return write_learners(locked, slug)
+        finally:
+            pipeline = cache.valkey_client.pipeline(transaction=False)
+            for learner_id in locked:
+                pipeline.eval(RELEASE_SCRIPT, 1, lock_key(learner_id), token)
+            pipeline.execute()
+    except valkey.exceptions.ValkeyError as ex:
+        log.warning("Foundations buffer flush failed", error=str(ex))
+        return None
+
+
+def lock_learners(learner_ids, wait=0):
+    """Take the flush locks of learners that no other flush holds
+
+    Returns:
+        tuple: The lock token and the ids of the learners locked. When none
+            could be locked, retries until `wait` seconds have passed.
+    """
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+    while True:
+        pipeline = cache.valkey_client.pipeline(transaction=False)
+        for learner_id in learner_ids:
+            pipeline.set(lock_key(learner_id), token, nx=True, ex=LOCK_SECONDS)
+        locked = [learner_id for learner_id, taken in zip(learner_ids, pipeline.execute()) if taken]
+
+        if locked or time.monotonic() >= deadline:
+            return token, locked
+        time.sleep(LOCK_POLL_SECONDS)
+
+
+def write_learners(learner_ids, slug=None):
+    """Move locked learners' updates in flight, write them, then drop them"""
+    requeue(learner_ids)
+
+    pipeline = cache.valkey_client.pipeline(transaction=False)
+    for learner_id in learner_ids:
+        pipeline.eval(TAKE_SCRIPT, 2, learner_key(learner_id), inflight_key(learner_id), slug or '')
+    updates = [json.loads(value) for taken in pipeline.execute() for value in taken[1::2]]
+
+    try:
+        written = upsert_exercises([build_exercise(update) for update in updates])
+    except Exception:
+        requeue(learner_ids)
+        raise
+
+    pipeline = cache.valkey_client.pipeline(transaction=False)
+    for learner_id in learner_ids:
+        pipeline.eval(ACK_SCRIPT, 3, learner_key(learner_id), inflight_key(learner_id), LEARNERS_KEY, learner_id)
+    pipeline.execute()
+    return written
+
+
+def requeue(learner_ids):
+    """Merge the in-flight updates of locked learners back into their pending updates
+
+    Recovers the updates of a flush that failed or died before its database
+    write was confirmed. Merging is idempotent, so an update that was in fact
+    written is only written again.
+    """
+    pipeline = cache.valkey_client.pipeline(transaction=False)
+    for learner_id in learner_ids:
+        pipeline.hgetall(inflight_key(learner_id))
+    inflight = pipeline.execute()
+    if not any(inflight):
+        return
+
+    pipeline = cache.valkey_client.pipeline(transaction=False)
+    for learner_id, updates in zip(learner_ids, inflight):
+        for slug, value in updates.items():
+            pipeline.eval(MERGE_SCRIPT, 2, learner_key(learner_id), LEARNERS_KEY, slug, value, learner_id)
+        if updates:
+            pipeline.delete(inflight_key(learner_id))
+    pipeline.execute()
+
+
+def active_learners(buffered, since, learner_name=None):
+    """Learners with a pending update inside an activity window
+
+    Args:
+        buffered (dict): Pending updates from pending()
+        since (date): Start of the window
+        learner_name (str): Only learners whose username contains this, ignoring case
+
+    Returns:
+        list: GitHub ids of the learners, sorted
+    """
+    active = []
+    for learner_github_id, updates in buffered.items():
+        for update in updates.values():
+            last_attempt = parse_datetime(update.get('lastAttempt') or '')
+            if last_attempt is None or last_attempt.date() < since:
+                continue
+            if learner_name is not None and learner_name.lower() not in update.get('username', '').lower():
+                continue
+            active.append(learner_github_id)
+            break
+
+    return sorted(active)
+
+
+def overlay(learner_github_id, rows, updates):
+    """Apply a learner's pending updates to their stored exercises
+
+    Args:
+        learner_github_id (str): GitHub id of the learner
+        rows (iterable): The learner's stored exercises as dictionaries of field values
+        updates (dict): The learner's pending updates keyed by slug, from pending()
+
+    Yields:
+        dict: Each stored exercise with its pending update applied, then the
+            exercises that are only pending, with no id
+    """
+    remaining = dict(updates)
+    for row in rows:
+        update = remaining.pop(row['slug'], None)
+        if update is not None:
+            row = {**row, **pending_values(update)}
+        yield row
+
+    for slug, update in remaining.items():
+        yield {'id': None, 'slug': slug, 'learner_github_id': str(learner_github_id), **pending_values(update)}
+
+
+def pending_values(update):
+    """Field values a pending update will store"""
+    exercise = build_exercise(update)
+    return {field: getattr(exercise, field) for field in UPSERT_FIELDS}
@@ -0,0 +1,15 @@
+"""Archive the Slack channels of teams removed with DELETE /teams/reset"""
+from LearningAPI.management.job_command import JobCommand
+from LearningAPI.models.people import ChannelArchiveJob
+from LearningAPI.views.team_maker_view import run_archive_job
+
+
+class Command(JobCommand):
+    help = "Run pending Slack channel archive jobs"
+    job_model = ChannelArchiveJob
+
+    def run(self, job):
+        run_archive_job(job)
+
+    def describe(self, job):
+        return f"{job.archived} of {job.total} channels archived, {job.failed} failed"
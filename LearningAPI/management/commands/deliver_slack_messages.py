@@ -0,0 +1,85 @@
+"""Deliver the Slack messages queued in the outbox"""
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+
+from LearningAPI.metrics import slack_messages_total
+from LearningAPI.models import SlackMessage
+from LearningAPI.utils import SlackAPI
+
+# Slack errors that will not go away by retrying the same message
+PERMANENT_ERRORS = {
+    "channel_not_found", "is_archived", "msg_too_long", "no_text",
+    "not_in_channel", "invalid_auth", "account_inactive", "token_revoked",
+}
+
+
+def deliver_batch(batch_size):
+    """Post one batch of due messages to Slack
+
+    The batch is claimed in its own transaction, so no row stays locked while
+    Slack is called.
+
+    Args:
+        batch_size (int): Maximum number of messages to deliver
+
+    Returns:
+        int: Number of messages that were attempted
+    """
+    slack = SlackAPI()
+
+    messages = SlackMessage.claim(batch_size)
+
+    for message in messages:
+        try:
+            result = slack.send_message(channel=message.channel, text=message.text)
+        except (requests.RequestException, ValueError) as ex:
+            message.mark_failed(repr(ex))
+        else:
+            if result.get("ok"):
+                message.mark_sent()
+            else:
+                error = result.get("error", "unknown_error")
+                message.mark_failed(error, permanent=error in PERMANENT_ERRORS)
+
+        slack_messages_total.labels(status=message.status).inc()
+
+    return len(messages)
+
+
+class Command(BaseCommand):
+    help = "Deliver queued Slack messages, retrying failures and dead-lettering the rest"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Deliver the messages that are due now and exit",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Number of messages to claim at once",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the outbox is empty",
+        )
+
+    def handle(self, *args, **options):
+        delivered = 0
+
+        while True:
+            attempted = deliver_batch(options["batch_size"])
+            delivered += attempted
+
+            if attempted < options["batch_size"]:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Attempted {delivered} Slack messages"))
@@ -0,0 +1,36 @@
+"""Write buffered Foundations progress to the database"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from LearningAPI import foundations_progress
+
+
+class Command(BaseCommand):
+    help = "Flush the Foundations progress updates waiting in the write-behind buffer"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Flush the updates pending now and exit",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.FOUNDATIONS_FLUSH_SECONDS,
+            help="Seconds to wait between flushes",
+        )
+
+    def handle(self, *args, **options):
+        written = 0
+
+        while True:
+            written += foundations_progress.flush() or 0
+
+            if options["once"]:
+                break
+            time.sleep(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} Foundations exercises"))
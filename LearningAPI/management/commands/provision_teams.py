@@ -0,0 +1,15 @@
+"""Create the Slack channels and repositories of teams made with POST /teams/bulk"""
+from LearningAPI.management.job_command import JobCommand
+from LearningAPI.models.people import TeamProvisioningJob
+from LearningAPI.views.team_maker_view import run_provisioning_job
+
+
+class Command(JobCommand):
+    help = "Run pending bulk team provisioning jobs"
+    job_model = TeamProvisioningJob
+
+    def run(self, job):
+        run_provisioning_job(job)
+
+    def describe(self, job):
+        return f"{job.completed} of {job.total} teams provisioned, {job.failed} failed"
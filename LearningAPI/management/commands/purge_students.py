@@ -0,0 +1,44 @@
+"""Remove students and their coursework history, e.g. at the end of a cohort"""
+from django.core.management.base import BaseCommand, CommandError
+
+from LearningAPI.models.people import NssUser
+from LearningAPI.purge import purge_students
+
+
+class Command(BaseCommand):
+    help = "Delete the students of a cohort, or listed students, with all of their records"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cohort",
+            type=int,
+            help="Purge every student assigned to this cohort",
+        )
+        parser.add_argument(
+            "--student",
+            type=int,
+            action="append",
+            default=[],
+            help="Purge this student (may be repeated)",
+        )
+        parser.add_argument(
+            "--soft",
+            action="store_true",
+            help="Keep the students' accounts and notes",
+        )
+
+    def handle(self, *args, **options):
+        students = NssUser.objects.filter(user__is_staff=False)
+        if options["cohort"] is not None:
+            students = students.filter(assigned_cohorts__cohort_id=options["cohort"])
+        elif options["student"]:
+            students = students.filter(id__in=options["student"])
+        else:
+            raise CommandError("Provide --cohort or at least one --student")
+
+        student_ids = list(students.values_list("id", flat=True).distinct())
+        counts = purge_students(student_ids, soft=options["soft"])
+
+        for label, count in sorted(counts.items()):
+            self.stdout.write(f"{label}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Purged {len(student_ids)} students"))
@@ -0,0 +1,48 @@
+"""Backfill or verify the stored learning scores of students"""
+from django.core.management.base import BaseCommand, CommandError
+
+from LearningAPI.models.people import NssUser
+
+
+class Command(BaseCommand):
+    help = "Recalculate NssUser.score from learning and core skill records"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Report students whose stored score is wrong without changing it",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of students to recalculate per transaction",
+        )
+
+    def handle(self, *args, **options):
+        student_ids = list(NssUser.objects.order_by("id").values_list("id", flat=True))
+        batch_size = options["batch_size"]
+        mismatches = 0
+
+        for start in range(0, len(student_ids), batch_size):
+            batch = student_ids[start:start + batch_size]
+
+            if options["verify"]:
+                stored = dict(NssUser.objects.filter(id__in=batch).values_list("id", "score"))
+                for student_id, score in NssUser.calculate_scores(batch).items():
+                    if stored[student_id] != score:
+                        mismatches += 1
+                        self.stdout.write(
+                            f"Student {student_id}: stored {stored[student_id]}, expected {score}"
+                        )
+            else:
+                NssUser.refresh_scores(batch)
+
+        if options["verify"]:
+            if mismatches:
+                raise CommandError(f"{mismatches} of {len(student_ids)} stored scores are wrong")
+
+            self.stdout.write(self.style.SUCCESS(f"All {len(student_ids)} stored scores are correct"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Recalculated {len(student_ids)} scores"))
@@ -0,0 +1,81 @@
+"""Send the GitHub API writes that were deferred by the rate limit"""
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+
+from LearningAPI.models import DeferredGithubRequest
+from LearningAPI.utils import GithubRateLimited, GithubRequest
+
+
+def run_batch(batch_size):
+    """Send one batch of due deferred requests
+
+    Stops at the first rate limited request and postpones it and the rest of
+    the batch, so their order is kept. The batch is claimed in its own
+    transaction, so no row stays locked while GitHub is called.
+
+    Args:
+        batch_size (int): Maximum number of requests to send
+
+    Returns:
+        int: Number of requests that were attempted
+    """
+    github = GithubRequest()
+
+    deferred_requests = DeferredGithubRequest.claim(batch_size)
+
+    for index, deferred in enumerate(deferred_requests):
+        try:
+            response = github.send(deferred.method, deferred.url, deferred.data)
+        except GithubRateLimited as ex:
+            for waiting in deferred_requests[index:]:
+                waiting.postpone(ex.wait)
+            return index
+        except requests.RequestException as ex:
+            deferred.mark_failed(repr(ex))
+            continue
+
+        if response.ok:
+            deferred.mark_sent()
+        else:
+            deferred.mark_failed(f'{response.status_code} {response.text[:500]}')
+
+    return len(deferred_requests)
+
+
+class Command(BaseCommand):
+    help = "Send GitHub API requests that were deferred while GitHub was rate limited"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send the requests that are due now and exit",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Number of requests to claim at once",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait when nothing is due",
+        )
+
+    def handle(self, *args, **options):
+        sent = 0
+
+        while True:
+            attempted = run_batch(options["batch_size"])
+            sent += attempted
+
+            if attempted < options["batch_size"]:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Attempted {sent} deferred GitHub requests"))
@@ -0,0 +1,48 @@
+"""Base for management commands that run BackgroundJob rows"""
+import abc
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class JobCommand(BaseCommand, abc.ABC):
+    """Claim and run jobs of `job_model` until none are waiting
+
+    Subclasses set `job_model` and implement run() and describe(). A command
+    missing either cannot be created, so it fails before it claims a job.
+    """
+    job_model = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs that are waiting now and exit",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait when no job is waiting",
+        )
+
+    @abc.abstractmethod
+    def run(self, job):
+        """Do the work of a claimed job"""
+
+    @abc.abstractmethod
+    def describe(self, job):
+        """One line of progress reported when the job finishes"""
+
+    def handle(self, *args, **options):
+        while True:
+            job = self.job_model.claim()
+
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.run(job)
+            self.stdout.write(f"Job {job.id}: {self.describe(job)}")
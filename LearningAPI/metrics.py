@@ -31,4 +31,59 @@ course_views_total = Counter(
     'course_views_total',
     'Total number of course views',
     ['type', 'course_id'] # Labels for view type (list/detail) and course ID
-)
\ No newline at end of file
+)
+
+# Counters for the versioned response caches in LearningAPI.cache
+response_cache_hits_total = Counter(
+    'response_cache_hits_total',
+    'Total number of response cache hits',
+    ['cache'] # Label for the name of the cache
+)
+
+response_cache_misses_total = Counter(
+    'response_cache_misses_total',
+    'Total number of response cache misses',
+    ['cache'] # Label for the name of the cache
+)
+
+# Counter for deliveries attempted by the deliver_slack_messages worker
+slack_messages_total = Counter(
+    'slack_messages_total',
+    'Total number of Slack message delivery attempts',
+    ['status'] # Label for the message status after the attempt (sent/pending/dead)
+)
+
+# Histogram for calls to external APIs made through LearningAPI.utils.timed_request
+outbound_request_duration_seconds = Histogram(
+    'outbound_request_duration_seconds',
+    'Histogram of request durations to external APIs',
+    ['service', 'endpoint', 'method', 'status'] # Labels for the API, endpoint template, HTTP method and status code
+)
+
+# Histograms for the database work of each request, measured by QueryProfileMiddleware
+db_queries_per_request = Histogram(
+    'db_queries_per_request',
+    'Histogram of the number of database queries per request',
+    ['view'], # Label for the URL name of the view
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+
+db_query_seconds_per_request = Histogram(
+    'db_query_seconds_per_request',
+    'Histogram of the time spent in database queries per request',
+    ['view'] # Label for the URL name of the view
+)
+
+# Counter for requests that repeated one query pattern, a likely N+1
+db_duplicate_query_requests_total = Counter(
+    'db_duplicate_query_requests_total',
+    'Total number of requests repeating a query pattern',
+    ['view'] # Label for the URL name of the view
+)
+
+# Counter for requests that issued more queries than their view's budget
+db_query_budget_exceeded_total = Counter(
+    'db_query_budget_exceeded_total',
+    'Total number of requests over their query budget',
+    ['view'] # Label for the URL name of the view
+)
@@ -1,8 +1,19 @@
 # middleware.py
+import re
+import time
 import uuid
+from collections import Counter
+
 import structlog
+from django.conf import settings
+from django.db import connection
 from django.utils.deprecation import MiddlewareMixin
 
+from LearningAPI.metrics import (
+    db_duplicate_query_requests_total, db_queries_per_request,
+    db_query_budget_exceeded_total, db_query_seconds_per_request,
+)
+
 log = structlog.get_logger(__name__)
 
 class RequestContextMiddleware(MiddlewareMixin):
@@ -31,3 +42,85 @@ class RequestContextMiddleware(MiddlewareMixin):
     def process_exception(self, request, exception):
         structlog.contextvars.clear_contextvars()
         log.exception("RequestContextMiddleware: exception occurred", exc_info=exception)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a view issues more queries than its budget and budgets are strict"""
+
+
+class QueryProfile:
+    """Database execute wrapper counting a request's queries and the time they take
+
+    Statements are grouped into patterns by their SQL with placeholders, and
+    `IN` lists of any length count as one pattern.
+    """
+    IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.patterns = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+            self.patterns[self.IN_LIST.sub('IN (...)', sql)] += 1
+
+    def duplicates(self, threshold):
+        """Query patterns run at least `threshold` times, most repeated first"""
+        return [(sql, count) for sql, count in self.patterns.most_common() if count >= threshold]
+
+
+class QueryProfileMiddleware:
+    """
+    Middleware to measure the queries of each request against its view's budget.
+
+    The query count and database time are observed in Prometheus histograms
+    labeled by URL name. Nothing is logged for a request within its budget,
+    since every log record is also written to the database by db_handler.
+    Repeated query patterns are reported as likely N+1 queries. Queries run while a streaming
+    response is consumed happen after this middleware returns and are not counted.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_PROFILE_ENABLED:
+            return self.get_response(request)
+
+        profile = QueryProfile()
+        with connection.execute_wrapper(profile):
+            response = self.get_response(request)
+
+        view = request.resolver_match.view_name if request.resolver_match else 'unresolved'
+        db_queries_per_request.labels(view=view).observe(profile.count)
+        db_query_seconds_per_request.labels(view=view).observe(profile.seconds)
+        structlog.contextvars.bind_contextvars(
+            view=view,
+            db_queries=profile.count,
+            db_time_ms=round(profile.seconds * 1000, 1),
+        )
+
+        duplicates = profile.duplicates(settings.QUERY_DUPLICATE_THRESHOLD)
+        if duplicates:
+            db_duplicate_query_requests_total.labels(view=view).inc()
+            sql, count = duplicates[0]
+            log.warning(
+                "QueryProfileMiddleware: repeated query pattern",
+                patterns=len(duplicates),
+                repeats=count,
+                sql=sql[:300],
+            )
+
+        budget = settings.QUERY_BUDGETS.get(view, settings.QUERY_BUDGET_DEFAULT)
+        if budget is not None and profile.count > budget:
+            db_query_budget_exceeded_total.labels(view=view).inc()
+            log.warning("QueryProfileMiddleware: query budget exceeded", budget=budget)
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(f"{view} issued {profile.count} queries, over its budget of {budget}")
+
+        return response
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LearningAPI', '0075_cohorteventtype_color'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CohortRoster',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.IntegerField(default=0)),
+                ('name', models.TextField()),
+                ('github_handle', models.TextField(blank=True, null=True)),
+                ('avatar', models.TextField(blank=True, null=True)),
+                ('cohort_name', models.TextField()),
+                ('assessment_status_id', models.IntegerField(null=True)),
+                ('assessment_url', models.TextField(blank=True, null=True)),
+                ('project_id', models.IntegerField(null=True)),
+                ('project_index', models.IntegerField(null=True)),
+                ('project_name', models.TextField(blank=True, null=True)),
+                ('book_id', models.IntegerField(null=True)),
+                ('book_index', models.IntegerField(null=True)),
+                ('book_name', models.TextField(blank=True, null=True)),
+                ('score', models.IntegerField(null=True)),
+                ('notes', models.JSONField(default=list)),
+                ('tags', models.JSONField(default=list)),
+                ('proposals', models.JSONField(default=list)),
+                ('project_duration', models.FloatField(null=True)),
+                ('stale', models.BooleanField(default=False)),
+                ('refreshed_on', models.DateTimeField()),
+                ('cohort', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roster', to='LearningAPI.cohort')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roster_entries', to='LearningAPI.nssuser')),
+            ],
+            options={
+                'ordering': ('position',),
+            },
+        ),
+    ]
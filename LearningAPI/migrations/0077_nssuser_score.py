@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:22
+
+import statistics
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_scores(apps, schema_editor):
+    """Store the score of every existing student, as NssUser.calculate_scores() does"""
+    NssUser = apps.get_model('LearningAPI', 'NssUser')
+
+    totals = dict(
+        NssUser.objects.filter(learning_records__achieved=True)
+        .values('id')
+        .annotate(total=Sum('learning_records__weight__weight'))
+        .values_list('id', 'total')
+    )
+
+    levels = {}
+    for student_id, level in NssUser.objects.filter(core_skills__isnull=False) \
+            .values_list('id', 'core_skills__level'):
+        levels.setdefault(student_id, []).append(level)
+
+    students = []
+    for student_id in NssUser.objects.values_list('id', flat=True):
+        total = totals.get(student_id) or 0
+        if levels.get(student_id):
+            total = round(total * (1 + (statistics.mean(levels[student_id]) / 10)))
+
+        if total:
+            students.append(NssUser(id=student_id, score=total))
+
+    NssUser.objects.bulk_update(students, ['score'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LearningAPI', '0076_cohortroster'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nssuser',
+            name='score',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LearningAPI', '0081_channelarchivejob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='foundationslearnerprofile',
+            name='learner_github_id',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='foundationsexercise',
+            index=models.Index(fields=['learner_github_id', 'last_attempt'], name='foundations_learner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foundationsexercise',
+            index=models.Index(fields=['slug', 'learner_github_id'], name='foundations_slug_learner_idx'),
+        ),
+    ]
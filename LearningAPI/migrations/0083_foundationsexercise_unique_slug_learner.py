@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:10
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def remove_duplicate_exercises(apps, schema_editor):
+    """Keep only the most recent row of each learner's exercise"""
+    FoundationsExercise = apps.get_model('LearningAPI', 'FoundationsExercise')
+    keep = (
+        FoundationsExercise.objects.values('slug', 'learner_github_id')
+        .annotate(keep_id=Max('id'))
+        .values_list('keep_id', flat=True)
+    )
+    FoundationsExercise.objects.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LearningAPI', '0082_foundations_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_exercises, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='foundationsexercise',
+            name='foundations_slug_learner_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='foundationsexercise',
+            constraint=models.UniqueConstraint(fields=('slug', 'learner_github_id'), name='foundations_slug_learner_unique'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:45
+
+from django.db import migrations, models
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum
+
+
+def build_summaries(apps, schema_editor):
+    """Summarize the exercises stored before the table existed"""
+    FoundationsExercise = apps.get_model('LearningAPI', 'FoundationsExercise')
+    FoundationsLearnerSummary = apps.get_model('LearningAPI', 'FoundationsLearnerSummary')
+
+    latest_name = FoundationsExercise.objects.filter(
+        learner_github_id=OuterRef('learner_github_id')
+    ).order_by(F('last_attempt').desc(nulls_last=True), '-id').values('learner_name')[:1]
+    totals = (
+        FoundationsExercise.objects.values('learner_github_id')
+        .annotate(
+            name=Subquery(latest_name),
+            started=Count('id'),
+            completed=Count('id', filter=Q(complete=True)),
+            attempts=Sum('attempts'),
+            shown=Count('id', filter=Q(used_solution=True)),
+            latest=Max('last_attempt'),
+        )
+        .order_by()
+    )
+    FoundationsLearnerSummary.objects.bulk_create([
+        FoundationsLearnerSummary(
+            learner_github_id=row['learner_github_id'],
+            learner_name=row['name'],
+            exercises_started=row['started'],
+            exercises_completed=row['completed'],
+            total_attempts=row['attempts'] or 0,
+            solutions_shown=row['shown'],
+            last_activity=row['latest'],
+        )
+        for row in totals
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LearningAPI', '0083_foundationsexercise_unique_slug_learner'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FoundationsLearnerSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('learner_github_id', models.CharField(max_length=50, unique=True)),
+                ('learner_name', models.CharField(max_length=75)),
+                ('exercises_started', models.IntegerField(default=0)),
+                ('exercises_completed', models.IntegerField(default=0)),
+                ('total_attempts', models.IntegerField(default=0)),
+                ('solutions_shown', models.IntegerField(default=0)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_activity'], name='foundations_summary_active_idx')],
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
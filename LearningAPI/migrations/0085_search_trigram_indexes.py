@@ -0,0 +1,31 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# (index name, table, column) of the columns searched by LearningAPI.search
+TRIGRAM_INDEXES = (
+    ('cohort_name_trgm_idx', 'LearningAPI_cohort', 'name'),
+    ('nssuser_github_handle_trgm_idx', 'LearningAPI_nssuser', 'github_handle'),
+    ('auth_user_first_name_trgm_idx', 'auth_user', 'first_name'),
+    ('auth_user_last_name_trgm_idx', 'auth_user', 'last_name'),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LearningAPI', '0084_foundationslearnersummary'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(
+            sql=[
+                f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin ("{column}" gin_trgm_ops);'
+                for name, table, column in TRIGRAM_INDEXES
+            ],
+            reverse_sql=[
+                f'DROP INDEX IF EXISTS "{name}";'
+                for name, _, _ in TRIGRAM_INDEXES
+            ],
+        ),
+    ]
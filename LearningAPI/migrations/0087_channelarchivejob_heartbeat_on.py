@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LearningAPI', '0086_teamprovisioningjob_heartbeat_on'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='channelarchivejob',
+            name='heartbeat_on',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
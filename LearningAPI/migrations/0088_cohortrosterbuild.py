@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LearningAPI', '0087_channelarchivejob_heartbeat_on'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CohortRosterBuild',
+            fields=[
+                ('cohort', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='roster_build', serialize=False, to='LearningAPI.cohort')),
+                ('refreshed_on', models.DateTimeField()),
+            ],
+        ),
+    ]
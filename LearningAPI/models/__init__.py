@@ -7,4 +7,6 @@ from .people.student_team import StudentTeam
 from .people.cohort_info import CohortInfo
 from .people.nssuser_cohort import NssUserCohort
 from .people.group_project_repo import GroupProjectRepository
-from .tag import Tag
\ No newline at end of file
+from .tag import Tag
+from .slack_message import SlackMessage
+from .deferred_github_request import DeferredGithubRequest
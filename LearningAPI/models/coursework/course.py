@@ -9,3 +9,10 @@ class Course(models.Model):
 
     def __str__(self) -> str: # pylint: disable=E0307
         return self.name
+
+    @staticmethod
+    def cache_namespace(course_id=None):
+        """Name of the response cache namespace for a course's tree, or for the list of courses"""
+        if course_id is None:
+            return 'course_tree:all'
+        return f'course_tree:{course_id}'
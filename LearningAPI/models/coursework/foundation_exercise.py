@@ -15,5 +15,13 @@ class FoundationsExercise(models.Model):
     completed_code = models.TextField(null=True, blank=True)
     used_solution = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["learner_github_id", "last_attempt"], name="foundations_learner_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["slug", "learner_github_id"], name="foundations_slug_learner_unique"),
+        ]
+
     def __str__(self) -> str: # pylint: disable=E0307
         return f'{self.learner_github_id} - {self.title} - {self.attempts} - {self.complete}'
@@ -0,0 +1,102 @@
+from django.db import models
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum
+from .foundation_exercise import FoundationsExercise
+
+
+class FoundationsLearnerSummary(models.Model):
+    """Per-learner totals of Foundations progress, shown on the Foundations list
+
+    Rows are derived from FoundationsExercise and recalculated by refresh()
+    whenever a learner's exercises are upserted.
+    """
+    learner_github_id = models.CharField(max_length=50, unique=True)
+    learner_name = models.CharField(max_length=75)
+    exercises_started = models.IntegerField(default=0)
+    exercises_completed = models.IntegerField(default=0)
+    total_attempts = models.IntegerField(default=0)
+    solutions_shown = models.IntegerField(default=0)
+    last_activity = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["last_activity"], name="foundations_summary_active_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.learner_name} - {self.exercises_completed} completed'
+
+    @staticmethod
+    def latest_name():
+        """Name on the learner's most recently attempted exercise, for use in a Subquery"""
+        return FoundationsExercise.objects.filter(
+            learner_github_id=OuterRef('learner_github_id')
+        ).order_by(F('last_attempt').desc(nulls_last=True), '-id').values('learner_name')[:1]
+
+    @staticmethod
+    def from_exercises(learner_github_id, exercises):
+        """Build an unsaved summary from exercises as dictionaries of field values
+
+        Used to summarize progress that has not been written to the database,
+        the way refresh() summarizes stored exercises.
+        """
+        latest = max(
+            exercises,
+            key=lambda exercise: (exercise['last_attempt'] is not None, exercise['last_attempt'] or 0, exercise['id'] or 0)
+        )
+        return FoundationsLearnerSummary(
+            learner_github_id=learner_github_id,
+            learner_name=latest['learner_name'],
+            exercises_started=len(exercises),
+            exercises_completed=sum(1 for exercise in exercises if exercise['complete']),
+            total_attempts=sum(exercise['attempts'] or 0 for exercise in exercises),
+            solutions_shown=sum(1 for exercise in exercises if exercise['used_solution']),
+            last_activity=latest['last_attempt'],
+        )
+
+    @staticmethod
+    def refresh(learner_github_ids):
+        """Recalculate the summaries of learners in one query and one upsert
+
+        Args:
+            learner_github_ids (iterable): GitHub ids of the learners
+        """
+        learner_github_ids = set(learner_github_ids)
+        totals = list(
+            FoundationsExercise.objects.filter(learner_github_id__in=learner_github_ids)
+            .values('learner_github_id')
+            .annotate(
+                name=Subquery(FoundationsLearnerSummary.latest_name()),
+                started=Count('id'),
+                completed=Count('id', filter=Q(complete=True)),
+                attempts=Sum('attempts'),
+                shown=Count('id', filter=Q(used_solution=True)),
+                latest=Max('last_attempt'),
+            )
+            .order_by()
+        )
+
+        # Learners whose last exercise was deleted have nothing to summarize
+        emptied = learner_github_ids - {row['learner_github_id'] for row in totals}
+        if emptied:
+            FoundationsLearnerSummary.objects.filter(learner_github_id__in=emptied).delete()
+
+        FoundationsLearnerSummary.objects.bulk_create(
+            [
+                FoundationsLearnerSummary(
+                    learner_github_id=row['learner_github_id'],
+                    learner_name=row['name'],
+                    exercises_started=row['started'],
+                    exercises_completed=row['completed'],
+                    total_attempts=row['attempts'] or 0,
+                    solutions_shown=row['shown'],
+                    last_activity=row['latest'],
+                )
+                for row in totals
+            ],
+            update_conflicts=True,
+            unique_fields=['learner_github_id'],
+            update_fields=[
+                'learner_name', 'exercises_started', 'exercises_completed',
+                'total_attempts', 'solutions_shown', 'last_activity',
+            ],
+        )
@@ -0,0 +1,102 @@
+"""GitHub API writes postponed until the rate limit allows them"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+
+class DeferredGithubRequest(models.Model):
+    """A GitHub API write that arrived while the shared budget was spent
+
+    GithubRequest.put() and post() add rows here when called with defer=True
+    and GitHub is rate limited, instead of waiting in the request thread. The
+    run_deferred_github_requests command sends them, oldest first, once
+    available_on has passed.
+    """
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
+    STATUSES = (
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (DEAD, "Dead"),
+    )
+
+    method = models.CharField(max_length=6)
+    url = models.URLField(max_length=500)
+    data = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.SmallIntegerField(default=0)
+    available_on = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(null=True, blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    sent_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("id",)
+        indexes = [
+            models.Index(fields=["status", "available_on"], name="deferred_github_pending_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.method} {self.url}'
+
+    @classmethod
+    def claim(cls, batch_size):
+        """Lease the next batch of requests that are due to be sent
+
+        As with SlackMessage.claim(), the rows are locked only while their
+        lease of GITHUB_DEFERRED_LEASE_SECONDS is written, and rows locked by
+        another worker are skipped.
+
+        Args:
+            batch_size (int): Maximum number of requests to claim
+
+        Returns:
+            list: DeferredGithubRequest instances, oldest first
+        """
+        with transaction.atomic():
+            deferred_requests = list(
+                cls.objects.select_for_update(skip_locked=True)
+                .filter(status=cls.PENDING, available_on__lte=timezone.now())
+                .order_by("id")[:batch_size]
+            )
+            leased_until = timezone.now() + timedelta(seconds=settings.GITHUB_DEFERRED_LEASE_SECONDS)
+            cls.objects.filter(pk__in=[deferred.pk for deferred in deferred_requests]).update(available_on=leased_until)
+
+        return deferred_requests
+
+    @staticmethod
+    def defer(method, url, data, wait_seconds):
+        """Postpone a request until the rate limit is expected to allow it"""
+        return DeferredGithubRequest.objects.create(
+            method=method,
+            url=url,
+            data=data,
+            available_on=timezone.now() + timedelta(seconds=wait_seconds),
+        )
+
+    def postpone(self, wait_seconds):
+        """Put the request back in line without counting an attempt"""
+        self.available_on = timezone.now() + timedelta(seconds=wait_seconds)
+        self.save(update_fields=["available_on"])
+
+    def mark_sent(self):
+        self.status = DeferredGithubRequest.SENT
+        self.attempts += 1
+        self.sent_on = timezone.now()
+        self.last_error = None
+        self.save(update_fields=["status", "attempts", "sent_on", "last_error"])
+
+    def mark_failed(self, error):
+        """Record a failed request and schedule a retry or dead-letter it"""
+        self.attempts += 1
+        self.last_error = error
+
+        if self.attempts >= settings.GITHUB_DEFERRED_MAX_ATTEMPTS:
+            self.status = DeferredGithubRequest.DEAD
+        else:
+            self.available_on = timezone.now() + timedelta(minutes=2 ** self.attempts)
+
+        self.save(update_fields=["status", "attempts", "last_error", "available_on"])
@@ -17,4 +17,8 @@ from .student_tag import StudentTag
 from .student_note_type import StudentNoteType
 from .student_team import StudentTeam
 from .nssuser_team import NSSUserTeam
-from .group_project_repo import GroupProjectRepository
\ No newline at end of file
+from .group_project_repo import GroupProjectRepository
+from .cohort_roster import CohortRoster
+from .cohort_roster_build import CohortRosterBuild
+from .team_provisioning_job import TeamProvisioningJob
+from .channel_archive_job import ChannelArchiveJob
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+class BackgroundJob(models.Model):
+    """Work queued by a request and run by a management command
+
+    A worker claims the oldest waiting job, saves its progress as it goes,
+    and marks it complete. Saving progress renews the job's heartbeat; a job
+    whose heartbeat is older than JOB_LEASE_SECONDS belongs to a worker that
+    stopped, and is claimed again with its progress counts reset. Subclasses
+    list those counts in PROGRESS_FIELDS and must be safe to run again.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETE = "complete"
+    STATUSES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (COMPLETE, "Complete"),
+    )
+    PROGRESS_FIELDS = ()
+
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    errors = models.JSONField(default=list)
+    created_on = models.DateTimeField(auto_now_add=True)
+    heartbeat_on = models.DateTimeField(null=True, blank=True)
+    finished_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+        ordering = ("id",)
+
+    @classmethod
+    def claim(cls):
+        """Mark the oldest waiting job as running and return it, or None"""
+        stale = timezone.now() - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+
+        with transaction.atomic():
+            job = cls.objects.select_for_update(skip_locked=True) \
+                .filter(Q(status=cls.PENDING) | Q(status=cls.RUNNING, heartbeat_on__lt=stale)) \
+                .order_by("id").first()
+
+            if job is not None:
+                for field in cls.PROGRESS_FIELDS:
+                    setattr(job, field, job._meta.get_field(field).get_default())
+                job.status = cls.RUNNING
+                job.heartbeat_on = timezone.now()
+                job.save(update_fields=["status", "heartbeat_on", *cls.PROGRESS_FIELDS])
+
+        return job
+
+    def save_progress(self):
+        """Save the progress counts and renew the heartbeat"""
+        self.heartbeat_on = timezone.now()
+        self.save(update_fields=["heartbeat_on", *self.PROGRESS_FIELDS])
+
+    def finish(self):
+        self.status = self.COMPLETE
+        self.finished_on = timezone.now()
+        self.save(update_fields=["status", "finished_on"])
@@ -0,0 +1,22 @@
+from django.db import models
+
+from .background_job import BackgroundJob
+
+
+class ChannelArchiveJob(BackgroundJob):
+    """Slack channels left to archive after a cohort's teams were reset
+
+    DELETE /teams/reset removes the teams straight away and records their
+    channels here. The archive_slack_channels command archives them,
+    updating the progress counts as each one finishes.
+    """
+    PROGRESS_FIELDS = ("archived", "failed", "errors")
+
+    cohort = models.ForeignKey("Cohort", on_delete=models.CASCADE, related_name="channel_archive_jobs")
+    channel_ids = models.JSONField(default=list)
+    archived = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+
+    @property
+    def total(self):
+        return len(self.channel_ids)
@@ -20,7 +20,11 @@ class Cohort(models.Model):
     @property
     def coaches(self):
         coaches = []
-        user_cohorts = NssUserCohort.objects.filter(cohort=self, nss_user__user__is_staff=True)
+        # Memberships prefetched into `coach_memberships` save a query per cohort
+        user_cohorts = getattr(self, 'coach_memberships', None)
+        if user_cohorts is None:
+            user_cohorts = NssUserCohort.objects.filter(cohort=self, nss_user__user__is_staff=True)\
+                .select_related('nss_user__user')
         for user_cohort in user_cohorts:
             coaches.append({
                 "id": user_cohort.nss_user.id,
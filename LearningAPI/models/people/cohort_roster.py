@@ -0,0 +1,153 @@
+"""Materialized per-cohort student roster"""
+from datetime import timedelta
+
+from django.db import connection, models, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .cohort_roster_build import CohortRosterBuild
+
+
+class CohortRoster(models.Model):
+    """Snapshot of the rows produced by get_cohort_student_data() for a cohort
+
+    The roster for a cohort is rebuilt in a single statement from the database
+    function. The signal handlers in LearningAPI.signals flag rows as stale
+    whenever one of the tables feeding the function changes, and the next read
+    of that cohort rebuilds it. A cohort with no students has no rows, so its
+    CohortRosterBuild row records that its empty roster is current.
+    """
+    MAX_AGE = timedelta(minutes=30)
+
+    # First key of the advisory lock taken while a cohort's roster is rebuilt
+    LOCK_NAMESPACE = 41
+
+    cohort = models.ForeignKey("Cohort", on_delete=models.CASCADE, related_name="roster")
+    student = models.ForeignKey("NssUser", on_delete=models.CASCADE, related_name="roster_entries")
+    position = models.IntegerField(default=0)
+    name = models.TextField()
+    github_handle = models.TextField(null=True, blank=True)
+    avatar = models.TextField(null=True, blank=True)
+    cohort_name = models.TextField()
+    assessment_status_id = models.IntegerField(null=True)
+    assessment_url = models.TextField(null=True, blank=True)
+    project_id = models.IntegerField(null=True)
+    project_index = models.IntegerField(null=True)
+    project_name = models.TextField(null=True, blank=True)
+    book_id = models.IntegerField(null=True)
+    book_index = models.IntegerField(null=True)
+    book_name = models.TextField(null=True, blank=True)
+    score = models.IntegerField(null=True)
+    notes = models.JSONField(default=list)
+    tags = models.JSONField(default=list)
+    proposals = models.JSONField(default=list)
+    project_duration = models.FloatField(null=True)
+    stale = models.BooleanField(default=False)
+    refreshed_on = models.DateTimeField()
+
+    class Meta:
+        ordering = ("position",)
+
+    @staticmethod
+    def cache_namespace(cohort_id):
+        """Name of the response cache namespace for a cohort's student list"""
+        return f'cohort_students:{cohort_id}'
+
+    @classmethod
+    def for_cohort(cls, cohort_id):
+        """Return the roster rows for a cohort, rebuilding them when stale
+
+        Args:
+            cohort_id (int): Primary key of the cohort
+
+        Returns:
+            list: One dictionary per student in the cohort
+        """
+        rows = list(cls.objects.filter(cohort_id=cohort_id).values())
+        oldest_allowed = timezone.now() - cls.MAX_AGE
+
+        if rows:
+            current = not any(row["stale"] or row["refreshed_on"] < oldest_allowed for row in rows)
+        else:
+            current = CohortRosterBuild.objects.filter(cohort_id=cohort_id, refreshed_on__gte=oldest_allowed).exists()
+
+        if not current:
+            cls.refresh(cohort_id)
+            rows = list(cls.objects.filter(cohort_id=cohort_id).values())
+
+        return rows
+
+    @classmethod
+    def refresh(cls, cohort_id):
+        """Rebuild the roster rows for a cohort from get_cohort_student_data()
+
+        Concurrent refreshes of the same cohort are serialized with a
+        transaction-level advisory lock, and a refresh that finds the roster
+        was rebuilt while it waited for the lock does nothing.
+
+        Args:
+            cohort_id (int): Primary key of the cohort
+        """
+        table = cls._meta.db_table
+        cohort_id = int(cohort_id)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", [cls.LOCK_NAMESPACE, cohort_id])
+
+            oldest_allowed = timezone.now() - cls.MAX_AGE
+            current = cls.objects.filter(
+                cohort_id=cohort_id,
+                refreshed_on__gte=oldest_allowed
+            ).aggregate(
+                total=Count("id"),
+                stale=Count("id", filter=Q(stale=True))
+            )
+            if current["total"] > 0 and current["stale"] == 0:
+                return
+            if current["total"] == 0 and CohortRosterBuild.objects.filter(
+                cohort_id=cohort_id, refreshed_on__gte=oldest_allowed
+            ).exists():
+                return
+
+            cursor.execute(f'DELETE FROM "{table}" WHERE cohort_id = %s', [cohort_id])
+            cursor.execute(f"""
+                INSERT INTO "{table}" (
+                    cohort_id, student_id, position, name, github_handle, avatar,
+                    cohort_name, assessment_status_id, assessment_url,
+                    project_id, project_index, project_name,
+                    book_id, book_index, book_name, score,
+                    notes, tags, proposals, project_duration,
+                    stale, refreshed_on
+                )
+                SELECT
+                    %s,
+                    r.user_id,
+                    r.ordinality,
+                    r.student_name,
+                    r.github_handle,
+                    r.extra_data::jsonb ->> 'avatar_url',
+                    r.current_cohort,
+                    r.assessment_status_id,
+                    r.assessment_url,
+                    r.current_project_id,
+                    r.current_project_index,
+                    r.current_project_name,
+                    r.current_book_id,
+                    r.current_book_index,
+                    r.current_book_name,
+                    r.score,
+                    r.student_notes::jsonb,
+                    r.student_tags::jsonb,
+                    r.capstone_proposals::jsonb,
+                    r.project_duration,
+                    FALSE,
+                    NOW()
+                FROM get_cohort_student_data(%s) WITH ORDINALITY AS r
+            """, [cohort_id, cohort_id])
+
+            CohortRosterBuild.objects.bulk_create(
+                [CohortRosterBuild(cohort_id=cohort_id, refreshed_on=timezone.now())],
+                update_conflicts=True,
+                unique_fields=["cohort"],
+                update_fields=["refreshed_on"],
+            )
@@ -0,0 +1,11 @@
+from django.db import models
+
+
+class CohortRosterBuild(models.Model):
+    """When a cohort's roster was last built, recorded even when it has no rows
+
+    The row is deleted whenever the roster is expired, so an empty cohort is
+    served from the roster table like any other until something changes.
+    """
+    cohort = models.OneToOneField("Cohort", on_delete=models.CASCADE, primary_key=True, related_name="roster_build")
+    refreshed_on = models.DateTimeField()
@@ -1,10 +1,16 @@
 """NssUser database model"""
+import json
 import statistics
 import logging
+from datetime import date
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import Sum
+from django.utils.functional import cached_property
+
+from LearningAPI import cache
 
 
 class NssUser(models.Model):
@@ -15,6 +21,10 @@ class NssUser(models.Model):
     slack_handle = models.CharField(max_length=55, null=True, blank=True)
     github_handle = models.CharField(max_length=55, null=True, blank=True)
 
+    # Total learning score, kept current by the LearningRecord, CoreSkillRecord
+    # and LearningWeight signal handlers
+    score = models.IntegerField(default=0, db_index=True)
+
     def __repr__(self) -> str:
         return f'{self.user.first_name} {self.user.last_name}'
 
@@ -34,33 +44,88 @@ class NssUser(models.Model):
     def name(self):
         return f'{self.user.first_name} {self.user.last_name}'
 
-    @property
-    def score(self):
-        """Return total learning score"""
-
-        # First get the total of the student's technical objectives
-        total = 0
-        scores = self.learning_records.filter(achieved=True) \
-            .annotate(total_score=Sum("weight__weight")) \
-            .values_list('total_score', flat=True)
-        total = sum(list(scores))
-
-        # Get the average of the core skills' levels and adjust the
-        # technical score positively by the percent
-
-        core_skill_records = list(
-            self.core_skills.values_list('level', flat=True))
-
-        try:
-            # Hannah and I did this on a Monday morning, so it may be the wrong
-            # approach, but it's a step in the right direction
-            mean = statistics.mean(core_skill_records)
-            total = round(total * (1 + (mean / 10)))
-
-        except statistics.StatisticsError:
-            pass
-
-        return total
+    def calculate_score(self):
+        """Calculate the learning score from the student's records
+
+        Use `score` to read the stored value. This is the source of truth that
+        `refresh_scores()` and the `refresh_scores` command keep it in step with.
+        """
+        return NssUser.calculate_scores([self.id]).get(self.id, 0)
+
+    @staticmethod
+    def calculate_scores(student_ids):
+        """Calculate the learning scores of many students in two queries
+
+        Args:
+            student_ids (list): Primary keys of the students
+
+        Returns:
+            dict: Score keyed by student id
+        """
+        student_ids = list(student_ids)
+
+        # First get the total of each student's technical objectives
+        totals = dict(
+            NssUser.objects.filter(id__in=student_ids, learning_records__achieved=True)
+            .values('id')
+            .annotate(total=Sum('learning_records__weight__weight'))
+            .values_list('id', 'total')
+        )
+
+        # Get the core skills' levels so the technical score can be adjusted
+        # positively by the percent of their average
+        levels = {}
+        for student_id, level in NssUser.objects.filter(id__in=student_ids, core_skills__isnull=False) \
+                .values_list('id', 'core_skills__level'):
+            levels.setdefault(student_id, []).append(level)
+
+        scores = {}
+        for student_id in student_ids:
+            total = totals.get(student_id) or 0
+
+            try:
+                # Hannah and I did this on a Monday morning, so it may be the wrong
+                # approach, but it's a step in the right direction
+                mean = statistics.mean(levels.get(student_id, []))
+                total = round(total * (1 + (mean / 10)))
+
+            except statistics.StatisticsError:
+                pass
+
+            scores[student_id] = total
+
+        return scores
+
+    @staticmethod
+    def refresh_scores(student_ids):
+        """Recalculate and store the learning scores of students
+
+        The students' rows are locked before their records are read, so two
+        transactions changing records of the same student cannot store a score
+        that misses the other's change. Scores are written with bulk_update()
+        so that saving them does not fire the NssUser signal handlers.
+
+        Args:
+            student_ids (list): Primary keys of the students
+
+        Returns:
+            dict: The new score keyed by student id
+        """
+        with transaction.atomic():
+            stored = dict(
+                NssUser.objects.select_for_update().filter(id__in=list(student_ids))
+                .order_by('id').values_list('id', 'score')
+            )
+            scores = NssUser.calculate_scores(stored.keys())
+
+            changed = [
+                NssUser(id=student_id, score=score)
+                for student_id, score in scores.items()
+                if stored[student_id] != score
+            ]
+            NssUser.objects.bulk_update(changed, ['score'], batch_size=500)
+
+        return scores
 
     @property
     def assessment_overview(self):
@@ -76,14 +141,51 @@ class NssUser(models.Model):
             })
         return assessment_list
 
-    @property
+    @staticmethod
+    def current_cohort_namespace(student_id):
+        """Name of the cache namespace holding a student's current cohort"""
+        return f'current_cohort:{student_id}'
+
+    @cached_property
     def current_cohort(self):
-        assignment = self.assigned_cohorts.order_by("-id").last()
+        """Return the student's cohort assignment with its info and courses
+
+        Resolved once per instance, and shared between requests through Valkey
+        when CURRENT_COHORT_CACHE_TTL is set. The cached copy is invalidated by
+        the NssUserCohort, Cohort, CohortInfo, CohortCourse and Course signal
+        handlers.
+        """
+        ttl = settings.CURRENT_COHORT_CACHE_TTL
+        if not ttl:
+            return self.resolve_current_cohort()
+
+        namespace = NssUser.current_cohort_namespace(self.id)
+        version = cache.get_version(namespace)
+        cached_cohort = cache.get('current_cohort', namespace, version)
+
+        if cached_cohort is not None:
+            current_cohort = json.loads(cached_cohort)
+            for field in ('start', 'end'):
+                if field in current_cohort:
+                    current_cohort[field] = date.fromisoformat(current_cohort[field])
+            return current_cohort
+
+        current_cohort = self.resolve_current_cohort()
+        cache.set(namespace, version, json.dumps(current_cohort, cls=DjangoJSONEncoder), ttl)
+        return current_cohort
+
+    def resolve_current_cohort(self):
+        """Load the student's current cohort from the database"""
+        assignment = self.assigned_cohorts.select_related('cohort__info').order_by("-id").last()
         if assignment is None:
             return {
                 "name": "Unassigned"
             }
 
+        courses = list(
+            assignment.cohort.courses.order_by('index').values('course__name', 'course__id', 'active')
+        )
+
         try:
             return {
                 "name": assignment.cohort.name,
@@ -95,7 +197,7 @@ class NssUser(models.Model):
                 "end": assignment.cohort.end_date,
                 "ic": assignment.cohort.slack_channel,
                 "github_org": assignment.cohort.info.student_organization_url,
-                "courses": assignment.cohort.courses.order_by('index').values('course__name', 'course__id', 'active'),
+                "courses": courses,
             }
         except Exception as ex:
             logger = logging.getLogger("LearningPlatform")
@@ -107,5 +209,5 @@ class NssUser(models.Model):
                 "start": assignment.cohort.start_date,
                 "end": assignment.cohort.end_date,
                 "ic": assignment.cohort.slack_channel,
-                "courses": assignment.cohort.courses.order_by('index').values('course__name', 'course__id', 'active'),
+                "courses": courses,
             }
@@ -0,0 +1,24 @@
+from django.db import models
+
+from .background_job import BackgroundJob
+
+
+class TeamProvisioningJob(BackgroundJob):
+    """Slack and GitHub setup for a batch of teams made with POST /teams/bulk
+
+    The teams and their members are saved when the job is created. The
+    provision_teams command then creates each team's Slack channel and group
+    project repositories, updating the progress counts after every team.
+    """
+    PROGRESS_FIELDS = ("completed", "failed", "errors")
+
+    cohort = models.ForeignKey("Cohort", on_delete=models.CASCADE, related_name="provisioning_jobs")
+    project = models.ForeignKey("Project", on_delete=models.SET_NULL, null=True, blank=True)
+    team_prefix = models.CharField(max_length=55)
+    team_ids = models.JSONField(default=list)
+    completed = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+
+    @property
+    def total(self):
+        return len(self.team_ids)
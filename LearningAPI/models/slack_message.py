@@ -0,0 +1,106 @@
+"""Outbox of Slack messages waiting to be delivered"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+
+class SlackMessage(models.Model):
+    """A Slack message queued by a request handler
+
+    Views add rows with SlackAPI.queue_message() instead of calling Slack, so
+    a slow Slack API never holds up a response. The deliver_slack_messages
+    command claims pending rows, posts them, and retries failures with an
+    exponential backoff until SLACK_OUTBOX_MAX_ATTEMPTS is reached, when the
+    message is marked dead for someone to inspect.
+    """
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
+    STATUSES = (
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (DEAD, "Dead"),
+    )
+
+    channel = models.CharField(max_length=55)
+    text = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.SmallIntegerField(default=0)
+    available_on = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(null=True, blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    sent_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("id",)
+        indexes = [
+            models.Index(fields=["status", "available_on"], name="slack_message_pending_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.channel}: {self.text[:40]}'
+
+    @classmethod
+    def claim(cls, batch_size):
+        """Lease the next batch of messages that are due for delivery
+
+        The rows are locked only while their lease is written, so the claim
+        commits before any message is sent. Rows locked by another worker are
+        skipped, so several workers can drain the outbox at once. A message
+        whose worker dies before marking it is claimed again once its lease
+        of SLACK_OUTBOX_LEASE_SECONDS expires.
+
+        Args:
+            batch_size (int): Maximum number of messages to claim
+
+        Returns:
+            list: SlackMessage instances, oldest first
+        """
+        with transaction.atomic():
+            messages = list(
+                cls.objects.select_for_update(skip_locked=True)
+                .filter(status=cls.PENDING, available_on__lte=timezone.now())
+                .order_by("id")[:batch_size]
+            )
+            leased_until = timezone.now() + timedelta(seconds=settings.SLACK_OUTBOX_LEASE_SECONDS)
+            cls.objects.filter(pk__in=[message.pk for message in messages]).update(available_on=leased_until)
+
+        return messages
+
+    def mark_sent(self):
+        self.status = SlackMessage.SENT
+        self.attempts += 1
+        self.sent_on = timezone.now()
+        self.last_error = None
+        self.save(update_fields=["status", "attempts", "sent_on", "last_error"])
+
+    def mark_failed(self, error, permanent=False):
+        """Record a failed delivery and schedule a retry or dead-letter it
+
+        Args:
+            error (str): Reason reported by Slack or the HTTP client
+            permanent (bool): Skip the remaining retries
+        """
+        self.attempts += 1
+        self.last_error = error
+
+        if permanent or self.attempts >= settings.SLACK_OUTBOX_MAX_ATTEMPTS:
+            self.status = SlackMessage.DEAD
+        else:
+            backoff = settings.SLACK_OUTBOX_RETRY_SECONDS * 2 ** (self.attempts - 1)
+            self.available_on = timezone.now() + timedelta(seconds=min(backoff, 60 * 60))
+
+        self.save(update_fields=["status", "attempts", "last_error", "available_on"])
+
+    @staticmethod
+    def queue(channel, text):
+        """Add a message to the outbox
+
+        Requests run in autocommit, so the row is saved at once and the
+        message is delivered even if the request fails afterwards. Call this
+        inside transaction.atomic() with the change it announces to deliver
+        it only if that change is committed.
+        """
+        return SlackMessage.objects.create(channel=channel, text=text)
@@ -0,0 +1,86 @@
+"""Removal of students and their coursework history
+
+A student owns rows in a dozen tables, most of which have signal receivers
+that expire cached rosters or recalculate scores one row at a time. Purging
+deletes each table with a single statement instead, in one transaction, and
+then expires the affected caches once for every purged student.
+"""
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from LearningAPI import cache
+from LearningAPI.conditional import expire_resources
+from LearningAPI.models.coursework import Capstone, CapstoneTimeline, StudentProject
+from LearningAPI.models.people import (
+    NssUser, NssUserCohort, StudentAssessment, StudentMentor, StudentNote,
+    StudentPersonality, StudentTag,
+)
+from LearningAPI.models.skill import (
+    CoreSkillRecord, CoreSkillRecordEntry, LearningRecord, LearningRecordEntry,
+)
+from LearningAPI.signals import expire_cohorts
+
+# Tables cleared for a student, children before the rows they reference.
+# Each entry is the model and the lookup from it to the student's id.
+STUDENT_TABLES = (
+    (StudentPersonality, "student_id"),
+    (StudentAssessment, "student_id"),
+    (StudentProject, "student_id"),
+    (StudentTag, "student_id"),
+    (LearningRecordEntry, "record__student_id"),
+    (LearningRecord, "student_id"),
+    (CoreSkillRecordEntry, "record__student_id"),
+    (CoreSkillRecord, "student_id"),
+    (CapstoneTimeline, "capstone__student_id"),
+    (StudentMentor, "capstone__student_id"),
+    (Capstone, "student_id"),
+    (NssUserCohort, "nss_user_id"),
+)
+
+
+def purge_students(student_ids, soft=False):
+    """Delete the coursework history of students, and the students themselves
+
+    A soft purge keeps the student, their account and their notes so they can
+    be assigned to a new cohort. Otherwise the notes, NssUser and Django user
+    are deleted too, along with anything else that references them.
+
+    Args:
+        student_ids (iterable): Primary keys of the students
+        soft (bool): Keep the students' accounts and notes
+
+    Returns:
+        dict: Number of deleted rows keyed by model label
+    """
+    student_ids = list(student_ids)
+    counts = Counter()
+    if not student_ids:
+        return {}
+
+    with transaction.atomic():
+        cohort_ids = set(
+            NssUserCohort.objects.filter(nss_user_id__in=student_ids).values_list('cohort_id', flat=True)
+        )
+
+        tables = STUDENT_TABLES if soft else STUDENT_TABLES + ((StudentNote, "student_id"),)
+        for model, lookup in tables:
+            queryset = model.objects.filter(**{f"{lookup}__in": student_ids})
+            counts[model._meta.label] += queryset._raw_delete(queryset.db)
+
+        # The signal receivers did not run for the rows deleted above
+        expire_cohorts(cohort_ids)
+        expire_resources(LearningRecord)
+        namespaces = [NssUser.current_cohort_namespace(student_id) for student_id in student_ids]
+        transaction.on_commit(lambda: cache.bump_version(*namespaces))
+
+        if soft:
+            NssUser.refresh_scores(student_ids)
+        else:
+            # What remains is small, so the ORM cascades it (instructor
+            # entries, teams, one on one notes, tokens and the users)
+            _, deleted = User.objects.filter(nssuser__id__in=student_ids).delete()
+            counts.update(deleted)
+
+    return {label: count for label, count in counts.items() if count}
@@ -0,0 +1,126 @@
+"""Shared GitHub API request budget backed by Valkey
+
+Every worker draws from one budget mirroring GitHub's own. Each response
+resets the budget to the X-RateLimit-Remaining value GitHub reported, expiring
+when the limit resets. Between responses, acquire() takes one request from it.
+When GitHub asks clients to back off with Retry-After, or the budget runs dry,
+every worker stops calling GitHub until the reported time. A secondary rate
+limit reported without either header blocks workers for
+SECONDARY_LIMIT_SECONDS, as GitHub recommends.
+"""
+import math
+import time
+from email.utils import parsedate_to_datetime
+
+import valkey
+import structlog
+
+from django.conf import settings
+
+from LearningAPI import cache
+
+log = structlog.get_logger(__name__)
+
+BUDGET_KEY = 'github:rate_limit:remaining'
+BLOCKED_KEY = 'github:rate_limit:blocked_until'
+SECONDARY_LIMIT_SECONDS = 60
+
+# Returns the seconds to wait, or 0 after taking one request from the budget.
+# An unknown budget (no response seen since the last reset) is not limited.
+ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[2])
+local blocked_until = tonumber(redis.call('GET', KEYS[2]) or '0')
+if blocked_until > now then
+    return blocked_until - now
+end
+
+local remaining = redis.call('GET', KEYS[1])
+if remaining then
+    if tonumber(remaining) <= tonumber(ARGV[1]) then
+        return math.max(redis.call('TTL', KEYS[1]), 1)
+    end
+    redis.call('DECR', KEYS[1])
+end
+return 0
+"""
+
+
+def acquire():
+    """Take one request from the shared budget
+
+    Returns:
+        int: 0 when the request may be sent, otherwise the seconds to wait.
+            Valkey errors never block a request.
+    """
+    try:
+        return int(cache.valkey_client.eval(
+            ACQUIRE_SCRIPT, 2, BUDGET_KEY, BLOCKED_KEY,
+            settings.GITHUB_RATE_LIMIT_RESERVE, math.ceil(time.time())
+        ))
+    except valkey.exceptions.ValkeyError as ex:
+        log.warning("GitHub rate limit lookup failed", error=str(ex))
+        return 0
+
+
+def retry_after_seconds(value, now):
+    """Seconds to wait from a Retry-After header given in seconds or as an HTTP date
+
+    Returns:
+        int: At least 1, or None when the value cannot be read
+    """
+    try:
+        return max(int(value), 1)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(math.ceil(retry_at.timestamp()) - now, 1)
+
+
+def is_secondary_limit(response):
+    """Whether a response reports GitHub's secondary rate limit in its message"""
+    try:
+        return 'secondary rate limit' in response.text.lower()
+    except (AttributeError, ValueError):
+        return False
+
+
+def record(response):
+    """Update the shared budget from the rate limit headers of a GitHub response
+
+    Args:
+        response (requests.Response): Response from the GitHub API
+
+    Returns:
+        int: 0 when the response was not rate limited, otherwise the seconds
+            to wait before calling GitHub again
+    """
+    now = math.ceil(time.time())
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    reset = int(response.headers.get('X-RateLimit-Reset') or 0)
+    retry_after = response.headers.get('Retry-After')
+
+    blocked_until = 0
+    if response.status_code in (403, 429):
+        wait = retry_after_seconds(retry_after, now) if retry_after is not None else None
+        if wait is not None:
+            blocked_until = now + wait
+        elif remaining == '0':
+            blocked_until = max(reset, now + 1)
+        elif response.status_code == 429 or is_secondary_limit(response):
+            blocked_until = now + SECONDARY_LIMIT_SECONDS
+
+    try:
+        pipeline = cache.valkey_client.pipeline(transaction=False)
+        if remaining is not None and reset > now:
+            pipeline.set(BUDGET_KEY, remaining, exat=reset)
+        if blocked_until:
+            pipeline.set(BLOCKED_KEY, blocked_until, exat=blocked_until)
+        pipeline.execute()
+    except valkey.exceptions.ValkeyError as ex:
+        log.warning("GitHub rate limit update failed", error=str(ex))
+
+    return blocked_until - now if blocked_until else 0
@@ -0,0 +1,101 @@
+"""Ranked fuzzy search over cohorts and students
+
+On PostgreSQL with the pg_trgm extension, a word matches a column when the
+column contains it or is trigram-similar to it. Both comparisons are served by
+the GIN trigram indexes created in migration 0085, and matches are ranked by
+trigram similarity. Without the extension, as on test databases created
+without migrations, substring matches are used and ranked by how closely the
+column matches the word.
+"""
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection
+from django.db.models import Case, FloatField, Prefetch, Q, Value, When
+from django.db.models.functions import Greatest
+
+from LearningAPI.models.people import Cohort, NssUser, NssUserCohort
+
+# Columns searched for each kind of record
+COHORT_FIELDS = ('name',)
+STUDENT_FIELDS = ('user__first_name', 'user__last_name', 'github_handle')
+
+_trigram_available = None
+
+
+def trigram_available():
+    """Whether the database has the pg_trgm extension, checked once per process"""
+    global _trigram_available  # pylint: disable=global-statement
+
+    if _trigram_available is None:
+        if connection.vendor != 'postgresql':
+            _trigram_available = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                _trigram_available = cursor.fetchone() is not None
+
+    return _trigram_available
+
+
+def word_rank(field, word):
+    """Expression scoring how well a column matches a word, from 0 to 1"""
+    if trigram_available():
+        return TrigramSimilarity(field, word)
+
+    return Case(
+        When(**{f'{field}__iexact': word}, then=Value(1.0)),
+        When(**{f'{field}__istartswith': word}, then=Value(0.75)),
+        When(**{f'{field}__icontains': word}, then=Value(0.5)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def ranked(queryset, fields, terms):
+    """Filter a queryset to the rows matching every word of a search, best first
+
+    Args:
+        queryset (QuerySet): The rows to search
+        fields (tuple): Lookups of the text columns compared with each word
+        terms (str): The search, split into words on whitespace
+
+    Returns:
+        QuerySet: Matching rows annotated with `rank`, ordered by it descending
+    """
+    matches = Q()
+    rank = Value(0.0)
+    for word in terms.split():
+        word_matches = Q()
+        for field in fields:
+            word_matches |= Q(**{f'{field}__icontains': word})
+            if trigram_available():
+                word_matches |= Q(**{f'{field}__trigram_similar': word})
+        matches &= word_matches
+
+        ranks = [word_rank(field, word) for field in fields]
+        rank = rank + (Greatest(*ranks) if len(ranks) > 1 else ranks[0])
+
+    return queryset.filter(matches).annotate(rank=rank).order_by('-rank', 'pk')
+
+
+def search_cohorts(terms, queryset=None):
+    """Cohorts whose name matches a search, best first"""
+    return ranked(queryset if queryset is not None else Cohort.objects.all(), COHORT_FIELDS, terms)
+
+
+def search_students(terms, cohort_id=None):
+    """Students whose name or GitHub handle matches a search, best first
+
+    Args:
+        terms (str): The search
+        cohort_id (int): Only search the members of this cohort
+
+    Returns:
+        QuerySet: NssUser rows with their user and cohort memberships loaded
+    """
+    students = NssUser.objects.filter(user__is_staff=False)
+    if cohort_id is not None:
+        students = students.filter(assigned_cohorts__cohort_id=cohort_id)
+
+    return ranked(students, STUDENT_FIELDS, terms).select_related('user').prefetch_related(
+        Prefetch('assigned_cohorts', queryset=NssUserCohort.objects.select_related('cohort').order_by('id'))
+    )
@@ -0,0 +1,262 @@
+"""Signal handlers that keep denormalized data in step with its source tables"""
+import contextvars
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from LearningAPI import cache
+from LearningAPI.conditional import expire_resources
+from LearningAPI.models import Tag
+from LearningAPI.models.coursework import (
+    Book, Capstone, CapstoneTimeline, CohortCourse, Course, FoundationsExercise,
+    FoundationsLearnerSummary, Project, ProposalStatus, StudentProject,
+)
+from LearningAPI.models.people import (
+    Assessment, Cohort, CohortEventType, CohortInfo, CohortRoster, CohortRosterBuild, NssUser,
+    NssUserCohort, StudentAssessment, StudentAssessmentStatus, StudentNote, StudentTag,
+)
+from LearningAPI.models.skill import CoreSkillRecord, LearningRecord, LearningWeight
+
+
+# Models with a `student` foreign key that feed get_cohort_student_data()
+ROSTER_STUDENT_SOURCES = (
+    StudentProject, StudentAssessment, StudentNote,
+    StudentTag, Capstone, LearningRecord,
+)
+
+# Models read by views wrapped with LearningAPI.conditional.conditional()
+RESOURCE_SOURCES = (
+    Course, Book, Project, Assessment, CohortCourse, LearningWeight,
+    LearningRecord, CohortEventType, ProposalStatus, StudentAssessmentStatus,
+)
+
+
+def expire_cohorts(cohort_ids):
+    """Flag the rosters of cohorts as stale and invalidate their cached student lists
+
+    The cache versions are bumped once the surrounding transaction commits so
+    that a concurrent reader cannot cache pre-commit data under the new version.
+    """
+    cohort_ids = list(cohort_ids)
+    if not cohort_ids:
+        return
+
+    CohortRoster.objects.filter(cohort_id__in=cohort_ids).update(stale=True)
+    CohortRosterBuild.objects.filter(cohort_id__in=cohort_ids).delete()
+
+    namespaces = [CohortRoster.cache_namespace(cohort_id) for cohort_id in cohort_ids]
+    transaction.on_commit(lambda: cache.bump_version(*namespaces))
+
+
+def expire_students(student_filter):
+    """Expire the rosters of every cohort containing the matching students
+
+    Args:
+        student_filter (Q): Filter on NssUserCohort selecting the students
+    """
+    expire_cohorts(set(
+        NssUserCohort.objects.filter(student_filter).values_list('cohort_id', flat=True)
+    ))
+
+
+def stored_value(instance, field):
+    """Value of a field as stored before a pending save, or None for a new row"""
+    if instance.pk is None:
+        return None
+    return type(instance).objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+roster_expiry_deferred = contextvars.ContextVar('roster_expiry_deferred', default=False)
+
+
+@contextmanager
+def defer_roster_expiry():
+    """Skip the per-row roster expiry of ROSTER_STUDENT_SOURCES in this block
+
+    For bulk writes that expire the affected rosters once themselves. Unlike
+    disconnecting the receivers, only the current thread or task is affected.
+    """
+    token = roster_expiry_deferred.set(True)
+    try:
+        yield
+    finally:
+        roster_expiry_deferred.reset(token)
+
+
+def expire_student_roster(sender, instance, **kwargs):
+    """Expire the rosters of a student whose cohort data changed"""
+    if roster_expiry_deferred.get():
+        return
+
+    expire_students(Q(nss_user_id=instance.student_id))
+
+
+for source in ROSTER_STUDENT_SOURCES:
+    post_save.connect(expire_student_roster, sender=source, dispatch_uid=f"roster_{source.__name__}_save")
+    post_delete.connect(expire_student_roster, sender=source, dispatch_uid=f"roster_{source.__name__}_delete")
+
+
+@receiver(pre_save, sender=NssUserCohort)
+def remember_membership_cohort(sender, instance, **kwargs):
+    """Keep the cohort a membership belonged to before a move to another cohort"""
+    instance._previous_cohort_id = stored_value(instance, 'cohort_id')
+
+
+@receiver([post_save, post_delete], sender=NssUserCohort)
+def expire_membership_roster(sender, instance, **kwargs):
+    """Expire the rosters of the cohorts that gained or lost a member"""
+    cohort_ids = {instance.cohort_id, getattr(instance, '_previous_cohort_id', None)}
+    expire_cohorts(cohort_ids - {None})
+
+
+@receiver([post_save, post_delete], sender=CapstoneTimeline)
+def expire_capstone_roster(sender, instance, **kwargs):
+    """Expire the rosters of a student whose capstone status changed"""
+    expire_students(Q(nss_user__capstones__id=instance.capstone_id))
+
+
+@receiver(post_save, sender=NssUser)
+def expire_nssuser_roster(sender, instance, **kwargs):
+    """Expire the rosters of a student whose handles changed"""
+    expire_students(Q(nss_user_id=instance.id))
+
+
+@receiver(post_save, sender=User)
+def expire_user_roster(sender, instance, update_fields=None, **kwargs):
+    """Expire the rosters of a student whose name or status changed"""
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+
+    expire_students(Q(nss_user__user_id=instance.id))
+
+
+@receiver(post_save, sender=Tag)
+def expire_tag_roster(sender, instance, **kwargs):
+    """Expire the rosters of every student with a renamed tag"""
+    expire_students(Q(nss_user__tags__tag_id=instance.id))
+
+
+@receiver(post_save, sender=Cohort)
+def expire_cohort_roster(sender, instance, **kwargs):
+    """Expire the roster of a renamed cohort"""
+    expire_cohorts({instance.id})
+
+
+@receiver([post_save, post_delete], sender=LearningRecord)
+@receiver([post_save, post_delete], sender=CoreSkillRecord)
+def refresh_student_score(sender, instance, **kwargs):
+    """Recalculate the stored score of a student whose records changed"""
+    NssUser.refresh_scores([instance.student_id])
+
+
+@receiver(post_save, sender=LearningWeight)
+def refresh_weight_scores(sender, instance, created=False, **kwargs):
+    """Recalculate the stored scores of every student who achieved a reweighted objective"""
+    if created:
+        return
+
+    NssUser.refresh_scores(
+        instance.records.filter(achieved=True).values_list('student_id', flat=True).distinct()
+    )
+
+
+def expire_current_cohorts(student_filter):
+    """Invalidate the cached current cohort of the matching students
+
+    Args:
+        student_filter (Q): Filter on NssUserCohort selecting the students
+    """
+    namespaces = [
+        NssUser.current_cohort_namespace(student_id)
+        for student_id in set(NssUserCohort.objects.filter(student_filter).values_list('nss_user_id', flat=True))
+    ]
+    if namespaces:
+        transaction.on_commit(lambda: cache.bump_version(*namespaces))
+
+
+@receiver([post_save, post_delete], sender=NssUserCohort)
+def expire_membership_current_cohort(sender, instance, **kwargs):
+    """Invalidate the cached current cohort of a student who joined or left a cohort"""
+    namespace = NssUser.current_cohort_namespace(instance.nss_user_id)
+    transaction.on_commit(lambda: cache.bump_version(namespace))
+
+
+@receiver(post_save, sender=Cohort)
+def expire_cohort_current_cohort(sender, instance, **kwargs):
+    """Invalidate the cached current cohort of every member of a changed cohort"""
+    expire_current_cohorts(Q(cohort_id=instance.id))
+
+
+@receiver([post_save, post_delete], sender=CohortInfo)
+@receiver([post_save, post_delete], sender=CohortCourse)
+def expire_cohort_detail_current_cohort(sender, instance, **kwargs):
+    """Invalidate the cached current cohort of every member of a cohort whose info or courses changed"""
+    expire_current_cohorts(Q(cohort_id=instance.cohort_id))
+
+
+@receiver(post_save, sender=Course)
+def expire_course_current_cohort(sender, instance, **kwargs):
+    """Invalidate the cached current cohort of every student in a cohort taking a renamed course"""
+    expire_current_cohorts(Q(cohort__courses__course_id=instance.id))
+
+
+@receiver([post_save, post_delete], sender=FoundationsExercise)
+def refresh_foundations_summary(sender, instance, **kwargs):
+    """Recalculate the summary of a learner whose exercise was saved one at a time"""
+    FoundationsLearnerSummary.refresh([instance.learner_github_id])
+
+
+def expire_courses(course_ids):
+    """Invalidate the cached trees of courses and the cached course list"""
+    namespaces = [Course.cache_namespace()] + [
+        Course.cache_namespace(course_id) for course_id in set(course_ids)
+    ]
+    transaction.on_commit(lambda: cache.bump_version(*namespaces))
+
+
+@receiver([post_save, post_delete], sender=Course)
+def expire_course_tree(sender, instance, **kwargs):
+    """Invalidate the cached tree of a changed course"""
+    expire_courses({instance.id})
+
+
+@receiver(pre_save, sender=Book)
+def remember_book_course(sender, instance, **kwargs):
+    """Keep the course a book belonged to before a move to another course"""
+    instance._previous_course_id = stored_value(instance, 'course_id')
+
+
+@receiver([post_save, post_delete], sender=Book)
+def expire_book_course_tree(sender, instance, **kwargs):
+    """Invalidate the cached trees of the courses a changed book left and is in"""
+    course_ids = {instance.course_id, getattr(instance, '_previous_course_id', None)}
+    expire_courses(course_ids - {None})
+
+
+@receiver(pre_save, sender=Project)
+@receiver(pre_save, sender=Assessment)
+def remember_content_book(sender, instance, **kwargs):
+    """Keep the book a project or assessment belonged to before a move to another book"""
+    instance._previous_book_id = stored_value(instance, 'book_id')
+
+
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=Assessment)
+def expire_book_content_course_tree(sender, instance, **kwargs):
+    """Invalidate the cached trees of the courses a changed project or assessment left and is in"""
+    book_ids = {instance.book_id, getattr(instance, '_previous_book_id', None)}
+    expire_courses(Book.objects.filter(id__in=book_ids - {None}).values_list('course_id', flat=True))
+
+
+def expire_resource(sender, instance, **kwargs):
+    """Change the ETags of responses built from a changed model"""
+    expire_resources(sender)
+
+
+for source in RESOURCE_SOURCES:
+    post_save.connect(expire_resource, sender=source, dispatch_uid=f"resource_{source.__name__}_save")
+    post_delete.connect(expire_resource, sender=source, dispatch_uid=f"resource_{source.__name__}_delete")
@@ -2,12 +2,35 @@
 Tests for the LearningAPI application.
 
 Test files are organized by model/view being tested:
-- test_cohort.py: Cohort model tests
-- test_course.py: Course model tests
 - test_assessment.py: Assessment model tests
-- test_student_note.py: StudentNote model tests
 - test_book.py: Book model tests
 - test_capstone.py: Capstone model tests
+- test_cohort.py: Cohort model tests
+- test_cohort_bulk_assign.py: Bulk cohort student assignment tests
+- test_cohort_list.py: Cohort list query count tests
+- test_cohort_migrate.py: Cohort migration statement count and dry run tests
+- test_cohort_roster.py: Cohort roster invalidation tests
+- test_cohort_student_cache.py: Cohort student list cache tests
+- test_cohort_student_serializer.py: Cohort student representation tests and benchmark
+- test_conditional.py: Conditional GET ETag and resource version tests
+- test_course.py: Course model tests
+- test_course_tree.py: Cached course tree query count, invalidation and ETag tests
+- test_current_cohort.py: Memoized student current cohort tests
+- test_foundations_batch.py: Batched Foundations progress ingestion tests
+- test_foundations_buffer.py: Foundations progress write-behind buffer tests
+- test_foundations_list.py: Foundations learner listing, pagination and streaming tests and benchmark
+- test_foundations_summary.py: Foundations learner summary table tests
+- test_github_rate_limit.py: Shared GitHub rate limit and deferred request tests
+- test_http_session.py: Pooled outbound HTTP session tests
 - test_project.py: Project model tests
+- test_query_profile.py: Per-request query profiling and budget tests
+- test_search.py: Ranked cohort and student search tests
+- test_slack_outbox.py: Slack outbox and delivery worker tests
+- test_student_detail.py: Student detail query budget tests
+- test_student_note.py: StudentNote model tests
+- test_student_purge.py: Set-based student purge tests
+- test_student_score.py: Stored student score tests
+- test_team_bulk.py: Bulk team creation and provisioning job tests
 - test_team_maker_integration.py: Team maker view integration tests
+- test_team_reset.py: Team reset and Slack channel archive job tests
 """
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""Settings shared by every test"""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """Fail any request that goes over its view's query budget
+
+    Tests that cover the lenient mode override this with override_settings.
+    """
+    settings.QUERY_BUDGET_STRICT = True
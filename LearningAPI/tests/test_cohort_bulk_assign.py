@@ -0,0 +1,138 @@
+"""
+Tests for POST /cohorts/<id>/assign/bulk.
+
+Orientation day adds a whole cohort at once, so the statement count must not
+grow with the number of students.
+"""
+from datetime import date
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models import Book, Cohort, Course, NssUser, NssUserCohort, Project
+from LearningAPI.models.coursework import CohortCourse, StudentProject
+
+
+class CohortBulkAssignTests(APITestCase):
+    """Verify students are validated and assigned in bulk"""
+
+    def setUp(self):
+        """Create an instructor and a cohort whose active course has a first project"""
+        self.user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        self.instructor = NssUser.objects.create(user=self.user, github_handle='coachgh')
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.cohort = Cohort.objects.create(
+            name="Orientation Cohort 1",
+            slack_channel="C12345",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 6, 30),
+            break_start_date=date(2024, 3, 15),
+            break_end_date=date(2024, 3, 22),
+        )
+        course = Course.objects.create(name="Client Side")
+        CohortCourse.objects.create(cohort=self.cohort, course=course, active=True, index=0)
+        self.project = Project.objects.create(
+            name="First Project", book=Book.objects.create(name="First Book", course=course, index=0), index=0
+        )
+
+    def add_students(self, count, offset=0):
+        return [
+            NssUser.objects.create(
+                user=User.objects.create_user(username=f'student{index}', password='pass'),
+                github_handle=f'student{index}gh'
+            )
+            for index in range(offset, offset + count)
+        ]
+
+    def bulk_assign(self, students):
+        return self.client.post(
+            f'/cohorts/{self.cohort.id}/assign/bulk', {"students": students}, format='json'
+        )
+
+    def test_bulk_assign_reports_every_entry(self):
+        """
+        Test that ids and GitHub handles are assigned with their first project
+        and that unknown, repeated and instructor entries are reported.
+        """
+        # Arrange
+        students = self.add_students(3)
+        NssUserCohort.objects.create(cohort=self.cohort, nss_user=students[2])
+
+        # Act
+        response = self.bulk_assign([
+            students[0].id, 'student1gh', students[2].id, 'nobody', students[0].id, 'coachgh'
+        ])
+
+        # Assert
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['assigned'], 2)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['assigned', 'assigned', 'already_assigned', 'not_found', 'already_assigned', 'is_instructor']
+        )
+        self.assertEqual(NssUserCohort.objects.filter(cohort=self.cohort).count(), 3)
+        self.assertEqual(
+            set(StudentProject.objects.filter(project=self.project).values_list('student_id', flat=True)),
+            {students[0].id, students[1].id}
+        )
+
+    def test_handles_match_ignoring_case(self):
+        """
+        Test that a GitHub handle matches whatever its letter case.
+        """
+        # Arrange
+        student = self.add_students(1)[0]
+
+        # Act
+        response = self.bulk_assign(['Student0GH'])
+
+        # Assert
+        self.assertEqual(response.data['results'][0], {'input': 'Student0GH', 'student_id': student.id, 'status': 'assigned'})
+
+    def test_student_with_first_project_is_assigned(self):
+        """
+        Test that a student who already has the first project, such as one
+        returning to the cohort, is assigned without a conflict.
+        """
+        # Arrange
+        returning, new = self.add_students(2)
+        StudentProject.objects.create(student=returning, project=self.project)
+
+        # Act
+        response = self.bulk_assign([returning.id, new.id])
+
+        # Assert
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['assigned'], 2)
+        self.assertEqual(StudentProject.objects.filter(project=self.project).count(), 2)
+
+    def test_empty_request_is_rejected(self):
+        """
+        Test that a request without a list of students is a bad request.
+        """
+        # Act
+        response = self.bulk_assign([])
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+
+    def test_query_count_does_not_grow_with_students(self):
+        """
+        Test that assigning 30 students takes as many queries as assigning 2.
+        """
+        # Arrange
+        small = [student.id for student in self.add_students(2)]
+        large = [student.id for student in self.add_students(30, offset=2)]
+
+        # Act
+        with CaptureQueriesContext(connection) as small_queries:
+            self.assertEqual(self.bulk_assign(small).status_code, 201)
+        with CaptureQueriesContext(connection) as large_queries:
+            self.assertEqual(self.bulk_assign(large).status_code, 201)
+
+        # Assert
+        self.assertEqual(len(small_queries), len(large_queries))
+        self.assertEqual(StudentProject.objects.filter(project=self.project).count(), 32)
@@ -0,0 +1,84 @@
+"""
+Tests for the query count of GET /cohorts.
+
+Every cohort has a coach, a student, a course and cohort info so that each
+serialized relation is exercised.
+"""
+from datetime import date
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models import Cohort, Course, NssUser, NssUserCohort
+from LearningAPI.models.coursework import CohortCourse
+from LearningAPI.models.people import CohortInfo
+
+
+class CohortListTests(APITestCase):
+    """Verify the cohort list loads its relations in bulk"""
+
+    def setUp(self):
+        """Create an instructor, a student and a course, and authenticate"""
+        user = User.objects.create_user(username='coach', password='pass', is_staff=True, first_name='Grace', last_name='Hopper')
+        self.coach = NssUser.objects.create(user=user)
+        self.student = NssUser.objects.create(user=User.objects.create_user(username='student', password='pass'))
+        self.course = Course.objects.create(name="Client Side")
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def make_cohorts(self, count, offset=0):
+        cohorts = Cohort.objects.bulk_create([
+            Cohort(
+                name=f"Cohort {number}", slack_channel="C12345",
+                start_date=date(2024, 1, 1), end_date=date(2024, 6, 30),
+                break_start_date=date(2024, 3, 15), break_end_date=date(2024, 3, 22),
+            )
+            for number in range(offset, offset + count)
+        ])
+        CohortInfo.objects.bulk_create([
+            CohortInfo(cohort=cohort, student_organization_url=f'https://github.com/cohort-{cohort.id}')
+            for cohort in cohorts
+        ])
+        CohortCourse.objects.bulk_create([
+            CohortCourse(cohort=cohort, course=self.course, active=True, index=0) for cohort in cohorts
+        ])
+        NssUserCohort.objects.bulk_create([
+            NssUserCohort(cohort=cohort, nss_user=member)
+            for cohort in cohorts for member in (self.coach, self.student)
+        ])
+
+    def test_relations_are_serialized(self):
+        """
+        Test that each cohort lists its coaches, courses, info and student count.
+        """
+        # Arrange
+        self.make_cohorts(1)
+
+        # Act
+        response = self.client.get('/cohorts')
+
+        # Assert
+        cohort = response.data[0]
+        self.assertEqual(cohort['coaches'], [{'id': self.coach.id, 'name': 'Grace Hopper'}])
+        self.assertEqual(cohort['courses'][0]['course']['name'], 'Client Side')
+        self.assertTrue(cohort['student_organization_url'].startswith('https://github.com/cohort-'))
+        self.assertEqual((cohort['students'], cohort['is_instructor']), (1, 1))
+
+    def test_query_count_does_not_grow_with_cohorts(self):
+        """
+        Test that listing 500 cohorts takes as many queries as listing 5.
+        """
+        # Arrange
+        self.make_cohorts(5)
+
+        # Act
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/cohorts')
+        self.make_cohorts(495, offset=5)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/cohorts')
+
+        # Assert
+        self.assertEqual(len(response.data), 500)
+        self.assertEqual(len(small), len(large))
@@ -0,0 +1,161 @@
+"""
+Tests for PUT /cohorts/<id>/migrate.
+
+Migrating a cohort must take the same number of statements no matter how many
+students it has, and a dry run must change nothing.
+"""
+from datetime import date
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models import Book, Cohort, Course, NssUser, NssUserCohort, Project
+from LearningAPI.models.coursework import CohortCourse, StudentProject
+from LearningAPI.models.people import CohortRoster
+
+
+class CohortMigrateTests(APITestCase):
+    """Verify the set-based cohort migration and its dry run"""
+
+    def setUp(self):
+        """Create a cohort on its client side course with students on a client side project"""
+        self.user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        NssUser.objects.create(user=self.user)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.cohort = Cohort.objects.create(
+            name="Migrate Cohort 1",
+            slack_channel="C12345",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 6, 30),
+            break_start_date=date(2024, 3, 15),
+            break_end_date=date(2024, 3, 22),
+        )
+        client_course = Course.objects.create(name="Client Side")
+        server_course = Course.objects.create(name="Server Side")
+        self.client_side = CohortCourse.objects.create(cohort=self.cohort, course=client_course, active=True, index=0)
+        self.server_side = CohortCourse.objects.create(cohort=self.cohort, course=server_course, active=False, index=1)
+
+        self.client_project = Project.objects.create(
+            name="Client Project", book=Book.objects.create(name="Client Book", course=client_course, index=0), index=0
+        )
+        self.server_project = Project.objects.create(
+            name="Server Project", book=Book.objects.create(name="Server Book", course=server_course, index=0), index=0
+        )
+
+    def add_students(self, count, offset=0):
+        students = []
+        for index in range(offset, offset + count):
+            student = NssUser.objects.create(
+                user=User.objects.create_user(username=f'student{index}', password='pass', first_name='Student', last_name=str(index))
+            )
+            NssUserCohort.objects.create(nss_user=student, cohort=self.cohort)
+            StudentProject.objects.create(student=student, project=self.client_project)
+            students.append(student)
+        return students
+
+    def migrate(self, query=''):
+        return self.client.put(f'/cohorts/{self.cohort.id}/migrate{query}')
+
+    def test_migrate_assigns_first_server_project(self):
+        """
+        Test that every student's latest project becomes the first server side
+        project, including a student who already had it, and the courses swap.
+        """
+        # Arrange
+        students = self.add_students(3)
+        StudentProject.objects.create(student=students[0], project=self.server_project)
+        StudentProject.objects.create(
+            student=students[0],
+            project=Project.objects.create(name="Client Project 2", book=self.client_project.book, index=1)
+        )
+
+        # Act
+        response = self.migrate()
+
+        # Assert
+        self.assertEqual(response.status_code, 204)
+        for student in students:
+            latest = StudentProject.objects.filter(student=student).latest('id')
+            self.assertEqual(latest.project, self.server_project)
+        self.assertEqual(StudentProject.objects.filter(project=self.server_project).count(), 3)
+        self.client_side.refresh_from_db()
+        self.server_side.refresh_from_db()
+        self.assertFalse(self.client_side.active)
+        self.assertTrue(self.server_side.active)
+
+    def test_dry_run_returns_diff_without_changes(self):
+        """
+        Test that a dry run lists each student's change and writes nothing.
+        """
+        # Arrange
+        students = self.add_students(2)
+        StudentProject.objects.create(student=students[1], project=self.server_project)
+
+        # Act
+        response = self.migrate('?dryRun=true')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['project']['id'], self.server_project.id)
+        self.assertEqual(response.data['activate_course']['name'], "Server Side")
+        self.assertEqual(
+            [(student['id'], student['change']) for student in response.data['students']],
+            [(students[0].id, 'assigned'), (students[1].id, 'reassigned')]
+        )
+        self.assertEqual(StudentProject.objects.filter(project=self.server_project).count(), 1)
+        self.client_side.refresh_from_db()
+        self.assertTrue(self.client_side.active)
+
+    def test_query_count_does_not_grow_with_cohort_size(self):
+        """
+        Test that migrating a cohort of 30 takes as many queries as a cohort
+        of 2, when some students in each already have the server side project.
+        """
+        def migrate_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.migrate().status_code, 204)
+            return queries.captured_queries
+
+        # Arrange / Act
+        students = self.add_students(2)
+        StudentProject.objects.create(student=students[0], project=self.server_project)
+        small = migrate_queries()
+
+        StudentProject.objects.all().delete()
+        CohortCourse.objects.filter(pk=self.client_side.pk).update(active=True)
+        CohortCourse.objects.filter(pk=self.server_side.pk).update(active=False)
+        students = self.add_students(28, offset=2)
+        for student in students[:10]:
+            StudentProject.objects.create(student=student, project=self.server_project)
+        large = migrate_queries()
+
+        # Assert
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(StudentProject.objects.filter(project=self.server_project).count(), 30)
+
+    def test_migrate_flags_roster_once_changed(self):
+        """
+        Test that the roster is flagged as stale after migrating, although
+        the replaced projects do not expire it row by row.
+        """
+        # Arrange
+        students = self.add_students(2)
+        StudentProject.objects.create(student=students[0], project=self.server_project)
+        row = CohortRoster.objects.create(
+            cohort=self.cohort,
+            student=students[0],
+            name="Student 0",
+            cohort_name=self.cohort.name,
+            refreshed_on=timezone.now(),
+        )
+
+        # Act
+        self.migrate()
+
+        # Assert
+        row.refresh_from_db()
+        self.assertTrue(row.stale, "Roster should be stale after the cohort migrates")
@@ -0,0 +1,152 @@
+"""
+Tests for the materialized cohort roster.
+
+The roster itself is rebuilt by a Postgres function, so these tests cover the
+signal handlers that flag roster rows as stale when their source data changes.
+Valkey is mocked, following the pattern in test_cohort_student_cache.py.
+"""
+from datetime import date
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from LearningAPI.models import Cohort, NssUser, NssUserCohort
+from LearningAPI.models.people import CohortRoster, CohortRosterBuild, StudentNote
+
+
+@patch('LearningAPI.cache.valkey_client')
+class CohortRosterInvalidationTests(TestCase):
+    """Verify that writes to roster source tables flag the roster as stale"""
+
+    def setUp(self):
+        """Create a cohort with one student and a fresh roster row"""
+        self.cohort = Cohort.objects.create(
+            name="Roster Cohort 1",
+            slack_channel="C12345",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 6, 30),
+            break_start_date=date(2024, 3, 15),
+            break_end_date=date(2024, 3, 22),
+        )
+        self.coach = NssUser.objects.create(
+            user=User.objects.create_user(username='coach', password='pass', is_staff=True)
+        )
+        self.student = NssUser.objects.create(
+            user=User.objects.create_user(username='student', password='pass'),
+            github_handle='studentgh'
+        )
+        NssUserCohort.objects.create(nss_user=self.student, cohort=self.cohort)
+
+        self.row = CohortRoster.objects.create(
+            cohort=self.cohort,
+            student=self.student,
+            name="Student Name",
+            cohort_name=self.cohort.name,
+            refreshed_on=timezone.now(),
+        )
+
+    def test_student_note_flags_student_rows(self, mock_valkey):
+        """
+        Test that adding a note for a student flags that student's
+        roster row as stale.
+        """
+        # Act
+        StudentNote.objects.create(student=self.student, coach=self.coach, note="Doing great")
+
+        # Assert
+        self.row.refresh_from_db()
+        self.assertTrue(self.row.stale, "Roster row should be stale after a new note")
+
+    def test_new_member_flags_cohort_rows(self, mock_valkey):
+        """
+        Test that assigning a new student to a cohort flags the whole
+        cohort roster as stale so the new student appears on next read.
+        """
+        # Arrange
+        newcomer = NssUser.objects.create(
+            user=User.objects.create_user(username='newcomer', password='pass')
+        )
+
+        # Act
+        NssUserCohort.objects.create(nss_user=newcomer, cohort=self.cohort)
+
+        # Assert
+        self.row.refresh_from_db()
+        self.assertTrue(self.row.stale, "Cohort roster should be stale after a new member joins")
+
+    def test_last_login_does_not_flag_rows(self, mock_valkey):
+        """
+        Test that recording a login does not invalidate the roster.
+        """
+        # Act
+        self.student.user.last_login = timezone.now()
+        self.student.user.save(update_fields=['last_login'])
+
+        # Assert
+        self.row.refresh_from_db()
+        self.assertFalse(self.row.stale, "Logging in should not invalidate the roster")
+
+    def test_moved_member_flags_previous_cohort_rows(self, mock_valkey):
+        """
+        Test that moving a student to another cohort flags the roster of
+        the cohort they left.
+        """
+        # Arrange
+        other = Cohort.objects.create(
+            name="Roster Cohort 2",
+            slack_channel="C67890",
+            start_date=date(2024, 7, 1),
+            end_date=date(2024, 12, 31),
+            break_start_date=date(2024, 9, 15),
+            break_end_date=date(2024, 9, 22),
+        )
+        membership = NssUserCohort.objects.get(nss_user=self.student)
+
+        # Act
+        membership.cohort = other
+        membership.save()
+
+        # Assert
+        self.row.refresh_from_db()
+        self.assertTrue(self.row.stale, "Roster of the previous cohort should be stale after a move")
+
+    def test_built_empty_cohort_is_not_rebuilt(self, mock_valkey):
+        """
+        Test that a cohort with no students whose empty roster was built
+        recently is read without rebuilding it.
+        """
+        # Arrange
+        empty = Cohort.objects.create(
+            name="Roster Cohort 3",
+            slack_channel="C24680",
+            start_date=date(2024, 7, 1),
+            end_date=date(2024, 12, 31),
+            break_start_date=date(2024, 9, 15),
+            break_end_date=date(2024, 9, 22),
+        )
+        CohortRosterBuild.objects.create(cohort=empty, refreshed_on=timezone.now())
+
+        # Act
+        with patch.object(CohortRoster, 'refresh') as mock_refresh:
+            rows = CohortRoster.for_cohort(empty.id)
+
+        # Assert
+        self.assertEqual(rows, [])
+        mock_refresh.assert_not_called()
+
+    def test_new_member_clears_build_marker(self, mock_valkey):
+        """
+        Test that a student joining a cohort removes the record of its last
+        build, so an empty roster is rebuilt on the next read.
+        """
+        # Arrange
+        CohortRosterBuild.objects.create(cohort=self.cohort, refreshed_on=timezone.now())
+        newcomer = NssUser.objects.create(
+            user=User.objects.create_user(username='newcomer', password='pass')
+        )
+
+        # Act
+        NssUserCohort.objects.create(nss_user=newcomer, cohort=self.cohort)
+
+        # Assert
+        self.assertFalse(CohortRosterBuild.objects.filter(cohort=self.cohort).exists())
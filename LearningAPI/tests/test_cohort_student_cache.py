@@ -0,0 +1,184 @@
+"""
+Tests for the versioned response cache behind GET /students?cohort=N.
+
+Valkey is mocked, following the pattern in test_team_maker_integration.py.
+"""
+import json
+from datetime import date
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI import cache
+from LearningAPI.models import Cohort, NssUser, NssUserCohort
+from LearningAPI.models.people import StudentNote
+
+
+class CohortStudentCacheTests(APITestCase):
+    """Verify cache hits, misses and signal-driven invalidation"""
+
+    def setUp(self):
+        """Create an instructor, a cohort with one student, and authenticate"""
+        self.user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        self.coach = NssUser.objects.create(user=self.user)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.cohort = Cohort.objects.create(
+            name="Cache Cohort 1",
+            slack_channel="C12345",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 6, 30),
+            break_start_date=date(2024, 3, 15),
+            break_end_date=date(2024, 3, 22),
+        )
+        self.student = NssUser.objects.create(
+            user=User.objects.create_user(username='student', password='pass', first_name='Ada', last_name='Lovelace'),
+            github_handle='adagh'
+        )
+        NssUserCohort.objects.create(nss_user=self.student, cohort=self.cohort)
+
+        self.roster_row = {
+            'student_id': self.student.id, 'github_handle': 'adagh', 'name': 'Ada Lovelace',
+            'cohort_id': self.cohort.id, 'cohort_name': self.cohort.name, 'avatar': '',
+            'assessment_status_id': 0, 'assessment_url': None, 'project_id': 1,
+            'project_duration': 3.0, 'project_index': 0, 'project_name': 'Intro',
+            'book_id': 1, 'book_index': 0, 'book_name': 'Book One', 'score': 10,
+            'notes': [], 'proposals': [], 'tags': [],
+        }
+
+    @patch('LearningAPI.views.student_view.CohortRoster.for_cohort')
+    @patch('LearningAPI.cache.valkey_client')
+    def test_cache_miss_builds_and_stores_list(self, mock_valkey, mock_for_cohort):
+        """
+        Test that a cache miss reads the roster and stores the rendered list
+        under the current cohort version.
+        """
+        # Arrange
+        mock_valkey.pipeline.return_value.execute.return_value = [True, [b'0']]
+        mock_valkey.get.return_value = None
+        mock_for_cohort.return_value = [self.roster_row]
+
+        # Act
+        response = self.client.get(f'/students?cohort={self.cohort.id}')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        mock_for_cohort.assert_called_once()
+        key, value = mock_valkey.set.call_args[0]
+        self.assertEqual(key, f'cache:cohort_students:{self.cohort.id}:v0')
+        self.assertEqual(json.loads(value)[0]['name'], 'Ada Lovelace')
+
+    @patch('LearningAPI.views.student_view.CohortRoster.for_cohort')
+    @patch('LearningAPI.cache.valkey_client')
+    def test_cache_hit_skips_roster_and_serializer(self, mock_valkey, mock_for_cohort):
+        """
+        Test that a cache hit returns the stored payload without touching
+        the roster.
+        """
+        # Arrange
+        cached_payload = json.dumps([{'id': self.student.id, 'name': 'Cached'}]).encode()
+        mock_valkey.pipeline.return_value.execute.return_value = [True, [b'7']]
+        mock_valkey.get.return_value = cached_payload
+
+        # Act
+        response = self.client.get(f'/students?cohort={self.cohort.id}')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, cached_payload)
+        mock_for_cohort.assert_not_called()
+        mock_valkey.get.assert_any_call(f'cache:cohort_students:{self.cohort.id}:v7')
+
+    @patch('LearningAPI.cache.valkey_client')
+    def test_student_change_bumps_cohort_version(self, mock_valkey):
+        """
+        Test that saving a note for a student bumps the cache version of
+        the student's cohort once the transaction commits.
+        """
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            StudentNote.objects.create(student=self.student, coach=self.coach, note="Nice work")
+
+        # Assert
+        mock_valkey.pipeline.return_value.incr.assert_called_with(
+            f'version:cohort_students:{self.cohort.id}'
+        )
+
+    @patch('LearningAPI.cache.valkey_client')
+    def test_missing_version_starts_at_current_time(self, mock_valkey):
+        """
+        Test that a version counter lost from Valkey is started at the
+        current time rather than at zero, so it cannot return to a version
+        whose cached list is still stored.
+        """
+        # Arrange
+        mock_valkey.pipeline.return_value.execute.return_value = [True, [None]]
+
+        # Act
+        with patch('LearningAPI.cache.time.time_ns', return_value=1_700_000_000_000_000_000):
+            cache.get_version(f'cohort_students:{self.cohort.id}')
+
+        # Assert
+        mock_valkey.pipeline.return_value.set.assert_called_with(
+            f'version:cohort_students:{self.cohort.id}', 1_700_000_000_000_000, nx=True
+        )
+
+    @patch('LearningAPI.views.student_view.CohortRoster.for_cohort')
+    @patch('LearningAPI.cache.valkey_client')
+    def test_padded_cohort_uses_same_cache_key(self, mock_valkey, mock_for_cohort):
+        """
+        Test that a cohort id written with leading zeros reads the same
+        cache entry as the plain id.
+        """
+        # Arrange
+        mock_valkey.pipeline.return_value.execute.return_value = [True, [b'0']]
+        mock_valkey.get.return_value = None
+        mock_for_cohort.return_value = [self.roster_row]
+
+        # Act
+        self.client.get(f'/students?cohort=0{self.cohort.id}')
+
+        # Assert
+        key, _ = mock_valkey.set.call_args[0]
+        self.assertEqual(key, f'cache:cohort_students:{self.cohort.id}:v0')
+
+    @patch('LearningAPI.cache.valkey_client')
+    def test_non_numeric_cohort_is_rejected(self, mock_valkey):
+        """
+        Test that a cohort that is not a number is rejected before the cache
+        is read.
+        """
+        # Act
+        response = self.client.get('/students?cohort=abc')
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        mock_valkey.get.assert_not_called()
+
+    @patch('LearningAPI.cache.valkey_client')
+    def test_moved_member_bumps_both_cohorts(self, mock_valkey):
+        """
+        Test that moving a student to another cohort bumps the cache
+        versions of the cohort they left and the one they joined.
+        """
+        # Arrange
+        other = Cohort.objects.create(
+            name="Cache Cohort 2",
+            slack_channel="C67890",
+            start_date=date(2024, 7, 1),
+            end_date=date(2024, 12, 31),
+            break_start_date=date(2024, 9, 15),
+            break_end_date=date(2024, 9, 22),
+        )
+        membership = NssUserCohort.objects.get(nss_user=self.student)
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            membership.cohort = other
+            membership.save()
+
+        # Assert
+        bumped = [call.args[0] for call in mock_valkey.pipeline.return_value.incr.call_args_list]
+        self.assertIn(f'version:cohort_students:{self.cohort.id}', bumped)
+        self.assertIn(f'version:cohort_students:{other.id}', bumped)
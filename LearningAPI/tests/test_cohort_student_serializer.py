@@ -0,0 +1,124 @@
+"""
+Tests and benchmark for CohortStudentSerializer.represent_roster().
+
+The direct representation must produce exactly the payload of the validated
+serializer it replaces. Run the benchmark with `pytest -m slow -s` to see the
+per-row cost of both paths.
+"""
+import timeit
+import pytest
+from django.test import SimpleTestCase
+from LearningAPI.views.student_view import CohortStudentSerializer
+
+
+def make_roster(size):
+    """Build CohortRoster rows shaped like CohortRoster.for_cohort() output"""
+    return [
+        {
+            'student_id': index,
+            'cohort_id': 12,
+            'cohort_name': 'Day Cohort 12',
+            'github_handle': f'learner{index}',
+            'name': f'Learner {index} ' if index % 5 == 0 else f'Learner {index}',
+            'avatar': f'https://avatars.githubusercontent.com/u/{index}',
+            'assessment_status_id': index % 4,
+            'assessment_url': f'https://github.com/org/assessment-{index}',
+            'project_id': index % 9 + 1,
+            'project_duration': float(index % 14),
+            'project_index': index % 3,
+            'project_name': 'Kneel Diamonds',
+            'book_id': index % 4 + 1,
+            'book_index': index % 4,
+            'book_name': 'Single Page Applications',
+            'score': index * 7,
+            'notes': [
+                {'note_id': index, 'note': 'Pairing went well', 'created_on': '2024-03-01T14:00:00',
+                 'note_type_id': None, 'note_label': ''},
+            ],
+            'tags': [{'id': index, 'tag': 'Needs help'}],
+            'proposals': [],
+        }
+        for index in range(1, size + 1)
+    ]
+
+
+def validated_payload(rows):
+    """The original list path: build dicts, validate, then read .data"""
+    students = []
+    for row in rows:
+        student = dict(row)
+        student['id'] = row['student_id']
+        student['current_cohort'] = {'id': row['cohort_id'], 'name': row['cohort_name']}
+        students.append(student)
+
+    serializer = CohortStudentSerializer(data=students, many=True)
+    serializer.is_valid()
+    return serializer.data
+
+
+class CohortStudentRepresentationTests(SimpleTestCase):
+    """Verify the direct representation matches the validated serializer"""
+
+    def test_payload_matches_validated_serializer(self):
+        """
+        Test that represent_roster() returns the same payload, field for
+        field and in the same order, as the validated serializer.
+        """
+        # Arrange
+        rows = make_roster(10)
+
+        # Act
+        expected = validated_payload(rows)
+        actual = CohortStudentSerializer.represent_roster(rows)
+
+        # Assert
+        self.assertEqual([list(student.keys()) for student in actual],
+                         [list(student.keys()) for student in expected])
+        self.assertEqual(actual, [dict(student) for student in expected])
+
+    def test_invalid_row_keeps_untrimmed_payload(self):
+        """
+        Test that a roster with a row the serializer rejects, here a student
+        with no project name, is returned untrimmed as the serializer did.
+        """
+        # Arrange
+        rows = make_roster(10)
+        rows[3]['project_name'] = None
+
+        # Act
+        expected = validated_payload(rows)
+        actual = CohortStudentSerializer.represent_roster(rows)
+
+        # Assert
+        self.assertEqual([dict(student) for student in actual], [dict(student) for student in expected])
+        self.assertEqual(actual[4]['name'], 'Learner 5 ')
+
+    def test_empty_roster(self):
+        """
+        Test that an empty cohort produces an empty list.
+        """
+        self.assertEqual(CohortStudentSerializer.represent_roster([]), [])
+
+
+@pytest.mark.slow
+class CohortStudentRepresentationBenchmark(SimpleTestCase):
+    """Compare the per-row cost of both serialization paths"""
+
+    def test_per_row_cost(self):
+        """
+        Test that the direct representation is cheaper per row than the
+        validated serializer for a 40-student and a 400-student cohort.
+        """
+        for size in (40, 400):
+            rows = make_roster(size)
+            repetitions = 5
+
+            validated = timeit.timeit(lambda: validated_payload(rows), number=repetitions)
+            direct = timeit.timeit(lambda: CohortStudentSerializer.represent_roster(rows), number=repetitions)
+
+            validated_per_row = validated / (repetitions * size) * 1_000_000
+            direct_per_row = direct / (repetitions * size) * 1_000_000
+            print(f"\n{size} students: validated {validated_per_row:.1f}us/row, "
+                  f"direct {direct_per_row:.1f}us/row")
+
+            self.assertLess(direct_per_row, validated_per_row)
@@ -0,0 +1,93 @@
+"""
+Tests for conditional GET on read-mostly resources.
+
+Valkey is mocked, following the pattern in test_cohort_student_cache.py. The
+mocked pipeline answers the version lookup with the list of versions last.
+"""
+from unittest.mock import patch
+import valkey
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models.coursework import ProposalStatus
+from LearningAPI.models.people import CohortEventType
+
+
+@patch('LearningAPI.cache.valkey_client')
+class ConditionalGetTests(APITestCase):
+    """Verify ETags follow resource versions and unchanged resources get 304"""
+
+    def setUp(self):
+        """Create event types and authenticate"""
+        user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        CohortEventType.objects.create(description='Graduation', color='#00ff00')
+
+    def set_version(self, mock_valkey, version):
+        mock_valkey.pipeline.return_value.execute.return_value = [True, [version]]
+
+    def test_unchanged_resource_is_not_modified(self, mock_valkey):
+        """
+        Test that a request with the current ETag gets 304 without reading
+        the resource.
+        """
+        # Arrange
+        self.set_version(mock_valkey, b'1700000000000000')
+        etag = self.client.get('/eventtypes')['ETag']
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/eventtypes', HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse([query for query in queries if 'cohorteventtype' in query['sql'].lower()])
+
+    def test_new_version_returns_payload(self, mock_valkey):
+        """
+        Test that a request with an ETag from an older version gets the
+        full payload and the new ETag.
+        """
+        # Arrange
+        self.set_version(mock_valkey, b'1700000000000000')
+        old_etag = self.client.get('/eventtypes')['ETag']
+        self.set_version(mock_valkey, b'1700000000000001')
+
+        # Act
+        response = self.client.get('/eventtypes', HTTP_IF_NONE_MATCH=old_etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['description'], 'Graduation')
+        self.assertNotEqual(response['ETag'], old_etag)
+
+    def test_change_bumps_resource_version(self, mock_valkey):
+        """
+        Test that saving a row bumps its model's version once the
+        transaction commits.
+        """
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            ProposalStatus.objects.create(status='Approved')
+
+        # Assert
+        mock_valkey.pipeline.return_value.incr.assert_called_with('version:resource:LearningAPI.proposalstatus')
+
+    def test_unreachable_valkey_skips_etag(self, mock_valkey):
+        """
+        Test that the resource is served without an ETag when Valkey cannot
+        be reached.
+        """
+        # Arrange
+        mock_valkey.pipeline.return_value.execute.side_effect = valkey.exceptions.ConnectionError()
+
+        # Act
+        response = self.client.get('/eventtypes')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
@@ -0,0 +1,159 @@
+"""
+Tests for the prefetched and cached course tree behind GET /courses.
+
+Valkey is mocked, following the pattern in test_cohort_student_cache.py.
+"""
+import json
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models.coursework import Book, Course, Project
+from LearningAPI.models.people import Assessment
+
+
+@patch('LearningAPI.cache.valkey_client')
+class CourseTreeTests(APITestCase):
+    """Verify the course tree query count, caching and revalidation"""
+
+    def setUp(self):
+        """Create a course with books, projects and assessments, and authenticate"""
+        user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.course = self.make_course("Client Side", books=2)
+
+    def make_course(self, name, books):
+        course = Course.objects.create(name=name)
+        for book_index in range(books):
+            book = Book.objects.create(name=f'{name} {book_index}', course=course, index=book_index)
+            Project.objects.create(name='Intro', book=book, index=0, implementation_url='')
+            Project.objects.create(name='Retired', book=book, index=1, implementation_url='', active=False)
+            Assessment.objects.create(name=f'Assessment {book_index}', source_url='', book=book)
+        return course
+
+    def test_tree_shape(self, mock_valkey):
+        """
+        Test that a course lists its books in order with their active projects
+        and assessments.
+        """
+        # Arrange
+        mock_valkey.get.return_value = None
+
+        # Act
+        response = self.client.get(f'/courses/{self.course.id}')
+
+        # Assert
+        course = json.loads(response.content)
+        self.assertEqual([book['index'] for book in course['books']], [0, 1])
+        self.assertEqual([project['name'] for project in course['books'][0]['projects']], ['Intro'])
+        self.assertEqual([assessment['name'] for assessment in course['books'][1]['assessments']], ['Assessment 1'])
+
+    def test_query_count_does_not_grow_with_books(self, mock_valkey):
+        """
+        Test that listing courses takes as many queries with ten books as with two.
+        """
+        # Arrange
+        mock_valkey.get.return_value = None
+
+        # Act
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/courses')
+        self.make_course("Server Side", books=8)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/courses')
+
+        # Assert
+        self.assertEqual(len(json.loads(response.content)), 2)
+        self.assertEqual(len(small), len(large))
+
+    def test_cache_hit_skips_database(self, mock_valkey):
+        """
+        Test that a cached tree is returned without reading the course.
+        """
+        # Arrange
+        cached_tree = json.dumps({'id': self.course.id, 'name': 'Cached'}).encode()
+        mock_valkey.pipeline.return_value.execute.return_value = [True, [b'3']]
+        mock_valkey.get.return_value = cached_tree
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/courses/{self.course.id}')
+
+        # Assert
+        self.assertEqual(response.content, cached_tree)
+        self.assertFalse([query for query in queries if 'learningapi_course' in query['sql'].lower()])
+        mock_valkey.get.assert_any_call(f'cache:course_tree:{self.course.id}:v3')
+
+    def test_unchanged_tree_is_not_modified(self, mock_valkey):
+        """
+        Test that a request with the current ETag is answered with 304.
+        """
+        # Arrange
+        mock_valkey.get.return_value = None
+        mock_valkey.pipeline.return_value.execute.return_value = [True] * 4 + [[b'11', b'12', b'13', b'14']]
+        etag = self.client.get(f'/courses/{self.course.id}')['ETag']
+
+        # Act
+        response = self.client.get(f'/courses/{self.course.id}', HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+
+    def test_project_change_expires_course_tree(self, mock_valkey):
+        """
+        Test that saving a project bumps the versions of its course's tree
+        and of the course list.
+        """
+        # Arrange
+        project = Project.objects.filter(book__course=self.course).first()
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            project.name = 'Renamed'
+            project.save()
+
+        # Assert
+        bumped = [call.args[0] for call in mock_valkey.pipeline.return_value.incr.call_args_list]
+        self.assertIn(f'version:course_tree:{self.course.id}', bumped)
+        self.assertIn('version:course_tree:all', bumped)
+
+    def test_moved_book_expires_both_course_trees(self, mock_valkey):
+        """
+        Test that moving a book to another course bumps the versions of the
+        tree it left and the tree it joined.
+        """
+        # Arrange
+        other = self.make_course("Server Side", books=1)
+        book = Book.objects.filter(course=self.course).first()
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            book.course = other
+            book.save()
+
+        # Assert
+        bumped = [call.args[0] for call in mock_valkey.pipeline.return_value.incr.call_args_list]
+        self.assertIn(f'version:course_tree:{self.course.id}', bumped)
+        self.assertIn(f'version:course_tree:{other.id}', bumped)
+
+    def test_moved_project_expires_both_course_trees(self, mock_valkey):
+        """
+        Test that moving a project to a book of another course bumps the
+        versions of the tree it left and the tree it joined.
+        """
+        # Arrange
+        other = self.make_course("Server Side", books=1)
+        project = Project.objects.filter(book__course=self.course).first()
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            project.book = other.books.first()
+            project.save()
+
+        # Assert
+        bumped = [call.args[0] for call in mock_valkey.pipeline.return_value.incr.call_args_list]
+        self.assertIn(f'version:course_tree:{self.course.id}', bumped)
+        self.assertIn(f'version:course_tree:{other.id}', bumped)
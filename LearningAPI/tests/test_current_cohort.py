@@ -0,0 +1,135 @@
+"""
+Tests for the memoized NssUser.current_cohort.
+
+Valkey is mocked, following the pattern in test_cohort_student_cache.py.
+"""
+import json
+from datetime import date
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from LearningAPI.models import Cohort, CohortInfo, Course, NssUser, NssUserCohort
+from LearningAPI.models.coursework import CohortCourse
+
+
+@patch('LearningAPI.cache.valkey_client')
+class CurrentCohortTests(TestCase):
+    """Verify per-instance memoization, the Valkey copy and its invalidation"""
+
+    def setUp(self):
+        """Create a cohort with info and a course, and one student in it"""
+        self.cohort = Cohort.objects.create(
+            name="Memo Cohort 1",
+            slack_channel="C12345",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 6, 30),
+            break_start_date=date(2024, 3, 15),
+            break_end_date=date(2024, 3, 22),
+        )
+        CohortInfo.objects.create(cohort=self.cohort, student_organization_url="https://github.com/memo-org")
+        self.course = Course.objects.create(name="Client Side")
+        CohortCourse.objects.create(cohort=self.cohort, course=self.course, active=True, index=0)
+
+        self.student = NssUser.objects.create(
+            user=User.objects.create_user(username='student', password='pass')
+        )
+        NssUserCohort.objects.create(nss_user=self.student, cohort=self.cohort)
+
+    @override_settings(CURRENT_COHORT_CACHE_TTL=0)
+    def test_repeated_access_queries_once(self, mock_valkey):
+        """
+        Test that reading current_cohort twice on one instance only
+        queries the database the first time.
+        """
+        # Arrange
+        student = NssUser.objects.get(pk=self.student.id)
+
+        # Act
+        with CaptureQueriesContext(connection) as first:
+            cohort = student.current_cohort
+        with CaptureQueriesContext(connection) as second:
+            student.current_cohort
+
+        # Assert
+        self.assertEqual(len(first.captured_queries), 2)
+        self.assertEqual(len(second.captured_queries), 0)
+        self.assertEqual(cohort["name"], "Memo Cohort 1")
+        self.assertEqual(cohort["github_org"], "https://github.com/memo-org")
+        self.assertEqual(cohort["courses"], [
+            {"course__name": "Client Side", "course__id": self.course.id, "active": True}
+        ])
+
+    def test_cache_hit_skips_database(self, mock_valkey):
+        """
+        Test that a cached copy is decoded, with its dates restored,
+        without querying the database.
+        """
+        # Arrange
+        cached = {"name": "Cached Cohort", "id": self.cohort.id, "start": "2024-01-01", "end": "2024-06-30"}
+        mock_valkey.pipeline.return_value.execute.return_value = [True, [b'2']]
+        mock_valkey.get.return_value = json.dumps(cached).encode()
+        student = NssUser.objects.get(pk=self.student.id)
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            cohort = student.current_cohort
+
+        # Assert
+        self.assertEqual(len(queries.captured_queries), 0)
+        self.assertEqual(cohort["name"], "Cached Cohort")
+        self.assertEqual(cohort["start"], date(2024, 1, 1))
+        mock_valkey.get.assert_any_call(f'cache:current_cohort:{self.student.id}:v2')
+
+    def test_cache_miss_stores_resolved_cohort(self, mock_valkey):
+        """
+        Test that a miss resolves the cohort from the database and stores
+        it under the current version.
+        """
+        # Arrange
+        mock_valkey.pipeline.return_value.execute.return_value = [True, [b'0']]
+        mock_valkey.get.return_value = None
+        student = NssUser.objects.get(pk=self.student.id)
+
+        # Act
+        cohort = student.current_cohort
+
+        # Assert
+        self.assertEqual(cohort["name"], "Memo Cohort 1")
+        key, value = mock_valkey.set.call_args.args
+        self.assertEqual(key, f'cache:current_cohort:{self.student.id}:v0')
+        self.assertEqual(json.loads(value)["start"], "2024-01-01")
+
+    @patch('LearningAPI.cache.bump_version')
+    def test_membership_change_invalidates_cache(self, mock_bump, mock_valkey):
+        """
+        Test that moving a student to another cohort bumps their current
+        cohort version once the transaction commits.
+        """
+        # Arrange
+        namespace = NssUser.current_cohort_namespace(self.student.id)
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            NssUserCohort.objects.filter(nss_user=self.student).delete()
+
+        # Assert
+        mock_bump.assert_any_call(namespace)
+
+    @patch('LearningAPI.cache.bump_version')
+    def test_cohort_course_change_invalidates_cache(self, mock_bump, mock_valkey):
+        """
+        Test that changing a cohort's courses bumps the current cohort
+        version of every member.
+        """
+        # Arrange
+        namespace = NssUser.current_cohort_namespace(self.student.id)
+        other_course = Course.objects.create(name="Server Side")
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            CohortCourse.objects.create(cohort=self.cohort, course=other_course, index=1)
+
+        # Assert
+        mock_bump.assert_any_call(namespace)
@@ -0,0 +1,112 @@
+"""
+Tests for batched Foundations progress with POST /foundations/batch.
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models.coursework import FoundationsExercise, FoundationsLearnerProfile
+
+
+def make_update(slug, user_id, **fields):
+    update = {
+        'slug': slug,
+        'userId': user_id,
+        'username': f'learner{user_id}',
+        'title': slug.title(),
+        'attempts': 1,
+        'completed': False,
+        'firstAttempt': '2024-05-01T10:00:00.000Z',
+        'lastAttempt': '2024-05-01T10:00:00.000Z',
+    }
+    update.update(fields)
+    return update
+
+
+class FoundationsBatchTests(APITestCase):
+    """Verify batched updates are upserted for many learners at once"""
+
+    def setUp(self):
+        """Authenticate as a learner"""
+        user = User.objects.create_user(username='learner', password='pass')
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def test_batch_inserts_and_updates(self):
+        """
+        Test that new exercises are inserted, stored ones are updated in place,
+        and profiles are created for new learners.
+        """
+        # Arrange
+        stored = FoundationsExercise.objects.create(
+            slug='variables', learner_github_id='101', learner_name='learner101', title='Variables', attempts=1
+        )
+        FoundationsLearnerProfile.objects.create(learner_github_id='101', learner_name='learner101')
+
+        # Act
+        response = self.client.post('/foundations/batch', [
+            make_update('variables', 101, attempts=3, completed=True, completedAt='2024-05-02T09:30:00.000Z'),
+            make_update('loops', 101),
+            make_update('variables', 202),
+        ], format='json')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['stored'], 3)
+        stored.refresh_from_db()
+        self.assertEqual((stored.attempts, stored.complete), (3, True))
+        self.assertEqual(stored.completed_on.day, 2)
+        self.assertEqual(FoundationsExercise.objects.count(), 3)
+        self.assertEqual(
+            sorted(FoundationsLearnerProfile.objects.values_list('learner_github_id', flat=True)),
+            ['101', '202']
+        )
+
+    def test_last_update_of_an_exercise_wins(self):
+        """
+        Test that repeated updates of one exercise in a batch store the last.
+        """
+        # Act
+        response = self.client.post('/foundations/batch', [
+            make_update('loops', 101, attempts=1),
+            make_update('loops', 101, attempts=2),
+        ], format='json')
+
+        # Assert
+        self.assertEqual(response.data['stored'], 1)
+        self.assertEqual(FoundationsExercise.objects.get().attempts, 2)
+
+    def test_invalid_updates_store_nothing(self):
+        """
+        Test that a batch with an invalid update is rejected with its position.
+        """
+        # Act
+        response = self.client.post('/foundations/batch', [
+            make_update('loops', 101),
+            make_update('arrays', 101, lastAttempt='yesterday'),
+            {'slug': 'functions'},
+        ], format='json')
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertEqual(FoundationsExercise.objects.count(), 0)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        """
+        Test that a batch of 50 updates takes as many queries as a batch of 2.
+        """
+        # Arrange
+        small = [make_update(f'exercise-{number}', 101) for number in range(2)]
+        large = [make_update(f'exercise-{number}', learner) for number in range(5) for learner in range(200, 210)]
+
+        # Act
+        with CaptureQueriesContext(connection) as small_queries:
+            self.client.post('/foundations/batch', small, format='json')
+        with CaptureQueriesContext(connection) as large_queries:
+            self.client.post('/foundations/batch', large, format='json')
+
+        # Assert
+        self.assertEqual(len(small_queries), len(large_queries))
+        self.assertEqual(FoundationsExercise.objects.count(), 52)
@@ -0,0 +1,248 @@
+"""
+Tests for the Foundations progress write-behind buffer.
+
+Valkey is mocked, following the pattern in test_cohort_student_cache.py. A
+flush runs one pipeline each to lock the learners, look for in-flight updates,
+take the pending updates, acknowledge them and release the locks.
+"""
+import json
+from unittest.mock import patch
+import valkey
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI import foundations_progress
+from LearningAPI.models.coursework import FoundationsExercise, FoundationsLearnerProfile
+
+
+def progress(**fields):
+    body = {
+        'userId': 101,
+        'username': 'learner101',
+        'title': 'Loops',
+        'attempts': 4,
+        'completed': False,
+        'firstAttempt': '2024-05-01T10:00:00.000Z',
+        'lastAttempt': '2024-05-01T10:05:00.000Z',
+    }
+    body.update(fields)
+    return body
+
+
+def pending_update(**fields):
+    return {'slug': 'loops', **progress(**fields), 'userId': '101'}
+
+
+@override_settings(FOUNDATIONS_WRITE_BEHIND=True)
+@patch('LearningAPI.cache.valkey_client')
+class FoundationsBufferTests(APITestCase):
+    """Verify progress is coalesced in Valkey and flushed to the database"""
+
+    def setUp(self):
+        """Authenticate as a learner"""
+        self.user = User.objects.create_user(username='learner', password='pass')
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def test_update_is_buffered(self, mock_valkey):
+        """
+        Test that an attempt is merged into the buffer without a database write.
+        """
+        # Arrange
+        mock_valkey.eval.return_value = json.dumps(pending_update())
+
+        # Act
+        response = self.client.put('/foundations/loops', progress(), format='json')
+
+        # Assert
+        self.assertEqual(response.status_code, 204)
+        script, _, key, learners, slug, update, learner = mock_valkey.eval.call_args.args
+        self.assertEqual(script, foundations_progress.MERGE_SCRIPT)
+        self.assertEqual((key, learners, slug, learner), (
+            'foundations:buffer:101', foundations_progress.LEARNERS_KEY, 'loops', '101'
+        ))
+        self.assertIn('_lastAttempt', json.loads(update))
+        self.assertEqual(FoundationsExercise.objects.count(), 0)
+
+    def test_completed_exercise_is_flushed(self, mock_valkey):
+        """
+        Test that completing an exercise writes its coalesced progress at once.
+        """
+        # Arrange
+        merged = pending_update(completed=True, completedAt='2024-05-01T10:06:00.000Z', completedCode='for ()')
+        mock_valkey.eval.return_value = json.dumps(merged)
+        mock_valkey.pipeline.return_value.execute.side_effect = [
+            [True], [{}], [[b'loops', json.dumps(merged).encode()]], [1], [1]
+        ]
+
+        # Act
+        response = self.client.put('/foundations/loops', progress(completed=True), format='json')
+
+        # Assert
+        self.assertEqual(response.status_code, 204)
+        exercise = FoundationsExercise.objects.get()
+        self.assertEqual((exercise.slug, exercise.learner_github_id, exercise.complete), ('loops', '101', True))
+        self.assertEqual(exercise.completed_code, 'for ()')
+        self.assertTrue(FoundationsLearnerProfile.objects.filter(learner_github_id='101').exists())
+        scripts = [call.args[0] for call in mock_valkey.pipeline.return_value.eval.call_args_list]
+        self.assertEqual(scripts, [
+            foundations_progress.TAKE_SCRIPT, foundations_progress.ACK_SCRIPT, foundations_progress.RELEASE_SCRIPT
+        ])
+
+    @patch('LearningAPI.foundations_progress.COMPLETION_LOCK_WAIT_SECONDS', 0)
+    def test_completed_exercise_is_written_while_learner_is_flushing(self, mock_valkey):
+        """
+        Test that a completed exercise is written directly when another flush
+        holds the learner's lock.
+        """
+        # Arrange
+        merged = pending_update(completed=True, completedAt='2024-05-01T10:06:00.000Z')
+        mock_valkey.eval.return_value = json.dumps(merged)
+        mock_valkey.pipeline.return_value.execute.return_value = [None]
+
+        # Act
+        response = self.client.put('/foundations/loops', progress(completed=True), format='json')
+
+        # Assert
+        self.assertEqual(response.status_code, 204)
+        self.assertTrue(FoundationsExercise.objects.get().complete)
+
+    def test_completed_exercise_is_written_when_flush_fails(self, mock_valkey):
+        """
+        Test that a completed exercise is written directly when Valkey fails
+        during its flush.
+        """
+        # Arrange
+        mock_valkey.eval.return_value = json.dumps(pending_update(completed=True))
+        mock_valkey.pipeline.return_value.execute.side_effect = valkey.exceptions.ConnectionError()
+
+        # Act
+        response = self.client.put('/foundations/loops', progress(completed=True), format='json')
+
+        # Assert
+        self.assertEqual(response.status_code, 204)
+        self.assertTrue(FoundationsExercise.objects.get().complete)
+
+    def test_flush_skips_locked_learners(self, mock_valkey):
+        """
+        Test that a full flush leaves learners locked by another flush alone.
+        """
+        # Arrange
+        mock_valkey.smembers.return_value = {b'101'}
+        mock_valkey.pipeline.return_value.execute.return_value = [None]
+
+        # Act
+        written = foundations_progress.flush()
+
+        # Assert
+        self.assertEqual(written, 0)
+        mock_valkey.pipeline.return_value.eval.assert_not_called()
+
+    def test_unreachable_buffer_writes_directly(self, mock_valkey):
+        """
+        Test that the update is stored directly when Valkey cannot be reached.
+        """
+        # Arrange
+        mock_valkey.eval.side_effect = valkey.exceptions.ConnectionError()
+
+        # Act
+        response = self.client.put('/foundations/loops', progress(), format='json')
+
+        # Assert
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(FoundationsExercise.objects.get().attempts, 4)
+
+    @override_settings(FOUNDATIONS_WRITE_BEHIND=False)
+    def test_update_without_buffer(self, mock_valkey):
+        """
+        Test that with the buffer disabled an update replaces the stored exercise.
+        """
+        # Arrange
+        FoundationsExercise.objects.create(slug='loops', learner_github_id='101', learner_name='learner101', attempts=1)
+
+        # Act
+        self.client.put('/foundations/loops', progress(attempts=6), format='json')
+
+        # Assert
+        mock_valkey.eval.assert_not_called()
+        self.assertEqual(FoundationsExercise.objects.get().attempts, 6)
+
+    def test_learner_exercises_include_pending_progress(self, mock_valkey):
+        """
+        Test that a learner's exercises show buffered progress over stored
+        rows, including exercises not written yet.
+        """
+        # Arrange
+        FoundationsExercise.objects.create(slug='loops', learner_github_id='101', learner_name='learner101', attempts=1)
+        mock_valkey.pipeline.return_value.execute.return_value = [
+            {b'loops': json.dumps(pending_update(attempts=3)).encode()},
+            {
+                b'loops': json.dumps(pending_update(attempts=7)).encode(),
+                b'arrays': json.dumps(pending_update(slug='arrays', title='Arrays')).encode(),
+            },
+        ]
+
+        # Act
+        response = self.client.get('/foundations/101/exercises')
+
+        # Assert
+        self.assertEqual(
+            [(exercise['slug'], exercise['attempts']) for exercise in response.data],
+            [('loops', 7), ('arrays', 4)]
+        )
+        self.assertIsNone(response.data[1]['id'])
+
+    def test_listing_includes_learners_only_in_buffer(self, mock_valkey):
+        """
+        Test that the learner listing includes learners whose progress in the
+        window has not been written yet.
+        """
+        # Arrange
+        self.user.is_staff = True
+        self.user.save()
+        recent = timezone.now().isoformat()
+        FoundationsExercise.objects.create(
+            slug='loops', learner_github_id='101', learner_name='learner101', last_attempt=timezone.now()
+        )
+        FoundationsLearnerProfile.objects.create(learner_github_id='202', cohort_type='day', cohort_number=70)
+        mock_valkey.smembers.return_value = {b'202'}
+        mock_valkey.pipeline.return_value.execute.return_value = [
+            {},
+            {b'loops': json.dumps({**pending_update(username='learner202', lastAttempt=recent), 'userId': '202'}).encode()},
+        ]
+
+        # Act
+        response = self.client.get('/foundations?limit=10')
+
+        # Assert
+        learners = response.data['results']
+        self.assertEqual([learner['learner_github_id'] for learner in learners], ['101', '202'])
+        self.assertEqual((learners[1]['learner_name'], learners[1]['cohort']), ('learner202', 'day 70'))
+        self.assertIsNone(learners[1]['exercises'][0]['id'])
+
+    def test_failed_flush_restores_updates(self, mock_valkey):
+        """
+        Test that updates taken for a flush are merged back when the write
+        fails, and the lock is released.
+        """
+        # Arrange
+        update = json.dumps(pending_update()).encode()
+        mock_valkey.smembers.return_value = {b'101'}
+        mock_valkey.pipeline.return_value.execute.side_effect = [
+            [True], [{}], [[b'loops', update]], [{b'loops': update}], [1, 1], [1]
+        ]
+
+        # Act
+        with patch('LearningAPI.foundations_progress.upsert_exercises', side_effect=RuntimeError("database down")):
+            with self.assertRaises(RuntimeError):
+                foundations_progress.flush()
+
+        # Assert
+        pipeline = mock_valkey.pipeline.return_value
+        scripts = [call.args[0] for call in pipeline.eval.call_args_list]
+        self.assertEqual(scripts, [
+            foundations_progress.TAKE_SCRIPT, foundations_progress.MERGE_SCRIPT, foundations_progress.RELEASE_SCRIPT
+        ])
+        pipeline.delete.assert_called_with('foundations:buffer:101:inflight')
@@ -0,0 +1,189 @@
+"""
+Tests and benchmark for GET /foundations and its paginated and streamed forms.
+
+The listing must read every learner's exercises and profile in one query.
+Run the benchmark with `pytest -m slow -s` to see its time for a large
+Foundations cohort.
+"""
+import json
+import time
+from datetime import timedelta
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models.coursework import FoundationsExercise, FoundationsLearnerProfile
+
+
+def make_exercises(learners, per_learner=3, offset=0):
+    """Create recent exercises for a range of learners"""
+    recent = timezone.now() - timedelta(days=1)
+    FoundationsExercise.objects.bulk_create([
+        FoundationsExercise(
+            learner_github_id=str(1000 + index),
+            learner_name=f'learner{index}',
+            title=f'Exercise {number}',
+            slug=f'exercise-{number}',
+            attempts=number + 1,
+            complete=number % 2 == 0,
+            first_attempt=recent,
+            last_attempt=recent,
+        )
+        for index in range(offset, offset + learners)
+        for number in range(per_learner)
+    ])
+
+
+class FoundationsListTests(APITestCase):
+    """Verify the learner listing payload and its query count"""
+
+    def setUp(self):
+        """Create an instructor"""
+        user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def test_learners_are_grouped_with_profile_cohort(self):
+        """
+        Test that exercises in the window are grouped by learner with their
+        profile's cohort, and learners without a profile are Unassigned.
+        """
+        # Arrange
+        make_exercises(2, per_learner=2)
+        FoundationsLearnerProfile.objects.create(
+            learner_github_id='1000', learner_name='learner0', cohort_type='evening', cohort_number=31
+        )
+        FoundationsExercise.objects.create(
+            learner_github_id='1000', learner_name='learner0', title='Old', slug='old',
+            last_attempt=timezone.now() - timedelta(days=200)
+        )
+
+        # Act
+        response = self.client.get('/foundations')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(learner['learner_github_id'], learner['cohort']) for learner in response.data],
+            [('1000', 'evening 31'), ('1001', 'Unassigned')]
+        )
+        exercise = response.data[0]['exercises'][0]
+        self.assertEqual(exercise['slug'], 'exercise-0')
+        self.assertEqual(len(response.data[0]['exercises']), 2)
+        self.assertIsNone(exercise['completed_on'])
+        self.assertIsInstance(exercise['last_attempt'], str)
+
+    def test_query_count_does_not_grow_with_learners(self):
+        """
+        Test that listing 30 learners takes as many queries as listing 3.
+        """
+        # Arrange
+        make_exercises(3)
+        FoundationsLearnerProfile.objects.create(learner_github_id='1000', learner_name='learner0')
+
+        # Act
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/foundations')
+        make_exercises(27, offset=3)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/foundations')
+
+        # Assert
+        self.assertEqual(len(response.data), 30)
+        self.assertEqual(len(small), len(large))
+
+
+class FoundationsStreamingTests(APITestCase):
+    """Verify cursor pagination and the streamed responses"""
+
+    def setUp(self):
+        """Create an instructor and five learners"""
+        user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        make_exercises(5, per_learner=2)
+
+    def test_pages_follow_the_cursor(self):
+        """
+        Test that following `next` visits every learner once and the last
+        page has no `next`.
+        """
+        # Act
+        first = self.client.get('/foundations?limit=2')
+        second = self.client.get(first.data['next'])
+        third = self.client.get(second.data['next'])
+
+        # Assert
+        seen = [
+            learner['learner_github_id']
+            for page in (first, second, third)
+            for learner in page.data['results']
+        ]
+        self.assertEqual(seen, ['1000', '1001', '1002', '1003', '1004'])
+        self.assertIsNone(third.data['next'])
+
+    def test_stream_matches_list(self):
+        """
+        Test that the streamed listing has the same content as the regular one.
+        """
+        # Act
+        listed = self.client.get('/foundations')
+        streamed = self.client.get('/foundations?stream=true')
+
+        # Assert
+        self.assertTrue(streamed.streaming)
+        self.assertEqual(json.loads(b''.join(streamed.streaming_content)), json.loads(listed.content))
+
+    def test_streamed_page_has_cursor(self):
+        """
+        Test that a streamed page is wrapped with its `next` cursor.
+        """
+        # Act
+        response = self.client.get('/foundations?limit=3&stream=true')
+
+        # Assert
+        page = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(page['results']), 3)
+        self.assertIn('after=1002', page['next'])
+
+    def test_learner_exercises_stream(self):
+        """
+        Test that a learner's exercises, including their code, can be streamed.
+        """
+        # Act
+        response = self.client.get('/foundations/1000/exercises?stream=true')
+
+        # Assert
+        exercises = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([exercise['slug'] for exercise in exercises], ['exercise-0', 'exercise-1'])
+        self.assertIn('completed_code', exercises[0])
+
+
+@pytest.mark.slow
+class FoundationsListBenchmark(APITestCase):
+    """Time the listing for a large Foundations cohort"""
+
+    def test_large_cohort(self):
+        """
+        Test that 3000 learners with 5 exercises each are listed with a
+        constant number of queries, and report the time taken.
+        """
+        user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=user).key)
+        make_exercises(3000, per_learner=5)
+        FoundationsLearnerProfile.objects.bulk_create([
+            FoundationsLearnerProfile(learner_github_id=str(1000 + index), learner_name=f'learner{index}')
+            for index in range(0, 3000, 2)
+        ])
+
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/foundations')
+        elapsed = time.perf_counter() - start
+        print(f"\n3000 learners: {elapsed * 1000:.0f}ms, {len(queries)} queries")
+
+        self.assertEqual(len(response.data), 3000)
+        self.assertLess(len(queries), 10)
@@ -0,0 +1,172 @@
+"""
+Tests for the Foundations learner summary table and GET /foundations/summary.
+"""
+from datetime import timedelta
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models.coursework import (
+    FoundationsExercise, FoundationsLearnerProfile, FoundationsLearnerSummary,
+)
+
+
+class FoundationsSummaryTests(APITestCase):
+    """Verify summaries follow exercise upserts and are listed without exercise rows"""
+
+    def setUp(self):
+        """Create an instructor and a learner token"""
+        instructor = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        self.instructor_token = Token.objects.create(user=instructor).key
+        learner = User.objects.create_user(username='learner', password='pass')
+        self.learner_token = Token.objects.create(user=learner).key
+
+    def post_batch(self, updates):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.learner_token)
+        return self.client.post('/foundations/batch', updates, format='json')
+
+    def get_summary(self, query=''):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.instructor_token)
+        return self.client.get(f'/foundations/summary{query}')
+
+    def test_batch_upsert_refreshes_summary(self):
+        """
+        Test that a batch upsert recalculates the learners' totals.
+        """
+        # Arrange
+        recent = (timezone.now() - timedelta(days=1)).isoformat()
+
+        # Act
+        self.post_batch([
+            {'slug': 'loops', 'userId': 101, 'username': 'ada', 'attempts': 3, 'completed': True, 'lastAttempt': recent},
+            {'slug': 'arrays', 'userId': 101, 'username': 'ada', 'attempts': 2, 'solutionShown': True, 'lastAttempt': recent},
+            {'slug': 'loops', 'userId': 202, 'username': 'grace', 'attempts': 1, 'lastAttempt': recent},
+        ])
+        self.post_batch([
+            {'slug': 'arrays', 'userId': 101, 'username': 'ada', 'attempts': 5, 'completed': True, 'lastAttempt': recent},
+        ])
+
+        # Assert
+        summary = FoundationsLearnerSummary.objects.get(learner_github_id='101')
+        self.assertEqual(
+            (summary.exercises_started, summary.exercises_completed, summary.total_attempts, summary.solutions_shown),
+            (2, 2, 8, 0)
+        )
+        self.assertEqual(FoundationsLearnerSummary.objects.get(learner_github_id='202').total_attempts, 1)
+
+    def test_summary_name_is_from_latest_attempt(self):
+        """
+        Test that a learner's summary uses the name on their most recently
+        attempted exercise.
+        """
+        # Arrange
+        FoundationsExercise.objects.create(
+            slug='loops', learner_github_id='101', learner_name='zed', last_attempt=timezone.now() - timedelta(days=3)
+        )
+
+        # Act
+        FoundationsExercise.objects.create(
+            slug='arrays', learner_github_id='101', learner_name='ada', last_attempt=timezone.now()
+        )
+
+        # Assert
+        self.assertEqual(FoundationsLearnerSummary.objects.get().learner_name, 'ada')
+
+    @override_settings(FOUNDATIONS_WRITE_BEHIND=True)
+    def test_summary_includes_buffered_progress(self):
+        """
+        Test that the summary counts progress still in the write-behind
+        buffer, including learners with nothing stored yet.
+        """
+        # Arrange
+        recent = timezone.now().isoformat()
+        FoundationsExercise.objects.create(
+            slug='loops', learner_github_id='101', learner_name='ada', attempts=1, last_attempt=timezone.now()
+        )
+        FoundationsExercise.objects.create(
+            slug='loops', learner_github_id='150', learner_name='hedy', attempts=2, last_attempt=timezone.now()
+        )
+        buffered = {
+            '101': {'loops': {'slug': 'loops', 'userId': '101', 'username': 'ada', 'attempts': 4,
+                              'completed': True, 'lastAttempt': recent}},
+            '202': {'arrays': {'slug': 'arrays', 'userId': '202', 'username': 'grace', 'attempts': 2,
+                               'lastAttempt': recent}},
+        }
+
+        # Act
+        with patch('LearningAPI.foundations_progress.pending', return_value=buffered):
+            response = self.get_summary('?limit=10')
+
+        # Assert
+        summaries = response.data['results']
+        self.assertEqual([summary['learner_github_id'] for summary in summaries], ['101', '150', '202'])
+        self.assertEqual((summaries[0]['total_attempts'], summaries[0]['exercises_completed']), (4, 1))
+        self.assertEqual((summaries[2]['learner_name'], summaries[2]['exercises_started']), ('grace', 1))
+
+    def test_deleting_last_exercise_removes_summary(self):
+        """
+        Test that a learner without exercises has no summary.
+        """
+        # Arrange
+        exercise = FoundationsExercise.objects.create(
+            slug='loops', learner_github_id='101', learner_name='ada', last_attempt=timezone.now()
+        )
+
+        # Act
+        exercise.delete()
+
+        # Assert
+        self.assertFalse(FoundationsLearnerSummary.objects.exists())
+
+    def test_summary_lists_recent_learners_with_cohort(self):
+        """
+        Test that the summary lists learners active in the window with their
+        profile's cohort, in a constant number of queries.
+        """
+        # Arrange
+        for index in range(12):
+            FoundationsExercise.objects.create(
+                slug='loops', learner_github_id=str(100 + index), learner_name=f'learner{index}',
+                attempts=index, last_attempt=timezone.now() - timedelta(days=1)
+            )
+        FoundationsExercise.objects.create(
+            slug='loops', learner_github_id='999', learner_name='inactive',
+            last_attempt=timezone.now() - timedelta(days=200)
+        )
+        FoundationsLearnerProfile.objects.create(learner_github_id='100', learner_name='learner0', cohort_type='day', cohort_number=70)
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_summary()
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 12)
+        self.assertEqual(response.data[0]['cohort'], 'day 70')
+        self.assertEqual(response.data[1]['cohort'], 'Unassigned')
+        self.assertNotIn('exercises', response.data[0])
+        self.assertLessEqual(len(queries), 3)
+
+    def test_summary_pages(self):
+        """
+        Test that the summary can be paged by learner.
+        """
+        # Arrange
+        for index in range(3):
+            FoundationsExercise.objects.create(
+                slug='loops', learner_github_id=str(100 + index), learner_name=f'learner{index}',
+                last_attempt=timezone.now()
+            )
+
+        # Act
+        first = self.get_summary('?limit=2')
+        second = self.client.get(first.data['next'])
+
+        # Assert
+        self.assertEqual([learner['learner_github_id'] for learner in first.data['results']], ['100', '101'])
+        self.assertEqual([learner['learner_github_id'] for learner in second.data['results']], ['102'])
+        self.assertIsNone(second.data['next'])
@@ -0,0 +1,223 @@
+"""
+Tests for the shared GitHub rate limit and deferred GitHub writes.
+
+Valkey and the GitHub API are mocked, following the pattern in
+test_cohort_student_cache.py.
+"""
+import time
+from datetime import date, timedelta
+from email.utils import formatdate
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI import rate_limit
+from LearningAPI.models import Cohort, CohortInfo, DeferredGithubRequest, NssUser, NssUserCohort
+from LearningAPI.models.coursework import Book, Course
+from LearningAPI.models.people import Assessment, StudentAssessment, StudentAssessmentStatus
+from LearningAPI.utils import GithubRateLimited, GithubRequest
+
+MEMBERSHIP_URL = 'https://api.github.com/orgs/nss-c70/memberships/ada'
+
+
+def github_response(status_code, headers=None, text=''):
+    response = MagicMock(status_code=status_code, headers=headers or {}, text=text)
+    response.ok = status_code < 400
+    return response
+
+
+@patch('LearningAPI.utils.timed_request')
+@patch('LearningAPI.cache.valkey_client')
+class GithubRateLimitTests(TestCase):
+    """Verify requests never wait in the calling thread"""
+
+    def test_spent_budget_raises_without_calling_github(self, mock_valkey, mock_request):
+        """
+        Test that a spent shared budget raises GithubRateLimited with the
+        wait reported by Valkey and sends nothing.
+        """
+        # Arrange
+        mock_valkey.eval.return_value = 120
+
+        # Act
+        with self.assertRaises(GithubRateLimited) as raised:
+            GithubRequest().put(MEMBERSHIP_URL, {"role": "member"})
+
+        # Assert
+        self.assertEqual(raised.exception.wait, 120)
+        mock_request.assert_not_called()
+
+    def test_spent_budget_defers_write(self, mock_valkey, mock_request):
+        """
+        Test that a deferrable write is stored for the background job.
+        """
+        # Arrange
+        mock_valkey.eval.return_value = 120
+
+        # Act
+        response = GithubRequest().put(MEMBERSHIP_URL, {"role": "member"}, defer=True)
+
+        # Assert
+        self.assertIsNone(response)
+        deferred = DeferredGithubRequest.objects.get()
+        self.assertEqual((deferred.method, deferred.url, deferred.data), ("PUT", MEMBERSHIP_URL, {"role": "member"}))
+        self.assertGreater(deferred.available_on, timezone.now() + timedelta(seconds=100))
+
+    def test_exhausted_response_blocks_every_worker(self, mock_valkey, mock_request):
+        """
+        Test that a 403 reporting no remaining requests stores the reset time
+        in Valkey and raises instead of sleeping.
+        """
+        # Arrange
+        reset = int(time.time()) + 600
+        mock_valkey.eval.return_value = 0
+        mock_request.return_value = github_response(403, {
+            'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(reset)
+        })
+
+        # Act
+        with self.assertRaises(GithubRateLimited) as raised:
+            GithubRequest().get(MEMBERSHIP_URL)
+
+        # Assert
+        self.assertAlmostEqual(raised.exception.wait, 600, delta=2)
+        pipeline = mock_valkey.pipeline.return_value
+        pipeline.set.assert_any_call(rate_limit.BUDGET_KEY, '0', exat=reset)
+        pipeline.set.assert_any_call(rate_limit.BLOCKED_KEY, reset, exat=reset)
+
+    def test_retry_after_date_blocks_every_worker(self, mock_valkey, mock_request):
+        """
+        Test that a Retry-After given as an HTTP date is read as the time to
+        wait until.
+        """
+        # Arrange
+        mock_valkey.eval.return_value = 0
+        mock_request.return_value = github_response(429, {'Retry-After': formatdate(time.time() + 90, usegmt=True)})
+
+        # Act
+        with self.assertRaises(GithubRateLimited) as raised:
+            GithubRequest().get(MEMBERSHIP_URL)
+
+        # Assert
+        self.assertAlmostEqual(raised.exception.wait, 90, delta=2)
+
+    def test_secondary_limit_without_headers_blocks_every_worker(self, mock_valkey, mock_request):
+        """
+        Test that a 403 for the secondary rate limit without rate limit
+        headers blocks workers for a minute.
+        """
+        # Arrange
+        mock_valkey.eval.return_value = 0
+        mock_request.return_value = github_response(
+            403, text='{"message": "You have exceeded a secondary rate limit. Please wait a few minutes."}'
+        )
+
+        # Act
+        with self.assertRaises(GithubRateLimited) as raised:
+            GithubRequest().get(MEMBERSHIP_URL)
+
+        # Assert
+        self.assertAlmostEqual(raised.exception.wait, rate_limit.SECONDARY_LIMIT_SECONDS, delta=1)
+
+    def test_forbidden_response_is_returned(self, mock_valkey, mock_request):
+        """
+        Test that a 403 without rate limit headers is handed back to the caller.
+        """
+        # Arrange
+        mock_valkey.eval.return_value = 0
+        mock_request.return_value = github_response(403, {'X-RateLimit-Remaining': '4000'})
+
+        # Act
+        response = GithubRequest().get(MEMBERSHIP_URL)
+
+        # Assert
+        self.assertEqual(response.status_code, 403)
+
+    def test_deferred_requests_are_sent_in_order(self, mock_valkey, mock_request):
+        """
+        Test that the background job sends due requests oldest first and
+        postpones the rest when GitHub limits it again.
+        """
+        # Arrange
+        first = DeferredGithubRequest.defer("PUT", MEMBERSHIP_URL, {"role": "member"}, 0)
+        second = DeferredGithubRequest.defer("PUT", f'{MEMBERSHIP_URL}-2', {"role": "member"}, 0)
+        mock_valkey.eval.side_effect = [0, 300]
+        mock_request.return_value = github_response(200)
+
+        # Act
+        call_command('run_deferred_github_requests', '--once', stdout=StringIO())
+
+        # Assert
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, DeferredGithubRequest.SENT)
+        self.assertEqual(second.status, DeferredGithubRequest.PENDING)
+        self.assertEqual(second.attempts, 0)
+        self.assertGreater(second.available_on, timezone.now() + timedelta(seconds=200))
+
+    def test_claimed_requests_are_leased(self, mock_valkey, mock_request):
+        """
+        Test that a claimed request is not claimed again until its lease
+        expires.
+        """
+        # Arrange
+        deferred = DeferredGithubRequest.defer("PUT", MEMBERSHIP_URL, {"role": "member"}, 0)
+
+        # Act
+        first = DeferredGithubRequest.claim(10)
+        second = DeferredGithubRequest.claim(10)
+
+        # Assert
+        self.assertEqual([claimed.pk for claimed in first], [deferred.pk])
+        self.assertEqual(second, [])
+
+
+@override_settings(CURRENT_COHORT_CACHE_TTL=0)
+@patch('LearningAPI.views.student_view.GithubRequest')
+class AssessmentRateLimitTests(APITestCase):
+    """Verify a rate limited assessment start can be retried"""
+
+    def setUp(self):
+        """Create an instructor, a student in a cohort and a book assessment"""
+        user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        NssUser.objects.create(user=user)
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        cohort = Cohort.objects.create(
+            name="Day Cohort 70", slack_channel="C12345",
+            start_date=date(2024, 1, 1), end_date=date(2024, 6, 30),
+            break_start_date=date(2024, 3, 15), break_end_date=date(2024, 3, 22),
+        )
+        CohortInfo.objects.create(cohort=cohort, student_organization_url="https://github.com/nss-c70")
+        self.student = NssUser.objects.create(
+            user=User.objects.create_user(username='ada', password='pass'), github_handle='adagh'
+        )
+        NssUserCohort.objects.create(nss_user=self.student, cohort=cohort)
+        book = Book.objects.create(name="Loops", course=Course.objects.create(name="Client Side"))
+        Assessment.objects.create(name="Loops Assessment", source_url="https://github.com/nss/loops", book=book)
+        StudentAssessmentStatus.objects.create(status="In Progress")
+
+    def test_rate_limited_start_is_rolled_back(self, mock_github):
+        """
+        Test that an assessment is not recorded when GitHub is rate limited,
+        so the retried request creates the repository instead of a 409.
+        """
+        # Arrange
+        mock_github.return_value.post.side_effect = GithubRateLimited(60)
+        book_id = Book.objects.get().id
+
+        # Act
+        limited = self.client.post(f'/students/{self.student.id}/assess', {'bookId': book_id}, format='json')
+        mock_github.return_value.post.side_effect = None
+        mock_github.return_value.put.return_value = None
+        retried = self.client.post(f'/students/{self.student.id}/assess', {'bookId': book_id}, format='json')
+
+        # Assert
+        self.assertEqual(limited.status_code, 429)
+        self.assertEqual(retried.status_code, 201)
+        self.assertEqual(StudentAssessment.objects.get().url, 'https://github.com/nss-c70/Loops-Assessment-adagh')
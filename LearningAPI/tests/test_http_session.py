@@ -0,0 +1,99 @@
+"""
+Tests for the pooled HTTP session shared by SlackAPI and GithubRequest.
+
+Requests go to a local keep-alive server so connection reuse can be observed.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.test import SimpleTestCase, override_settings
+from prometheus_client import REGISTRY
+from LearningAPI.utils import GithubRequest, SlackAPI, github_endpoint, http_session
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Answer every request with {"ok": true} over a persistent connection"""
+    protocol_version = "HTTP/1.1"
+
+    def handle_request(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        self.server.clients.append(self.client_address)
+
+        body = json.dumps({"ok": True}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = handle_request
+    do_POST = handle_request
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class HttpSessionTests(SimpleTestCase):
+    """Verify connection reuse, endpoint labels and latency metrics"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        self.server.clients = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_session_is_shared(self):
+        """
+        Test that every caller gets the same session.
+        """
+        self.assertIs(http_session(), http_session())
+
+    def test_slack_calls_reuse_one_connection(self):
+        """
+        Test that back to back Slack calls are sent over a single kept-alive connection.
+        """
+        # Act
+        with override_settings(SLACK_API_URL=self.base_url):
+            for _ in range(3):
+                SlackAPI().send_message(channel="C12345", text="Hello")
+
+        # Assert
+        self.assertEqual(len(self.server.clients), 3)
+        self.assertEqual(len(set(self.server.clients)), 1)
+
+    def test_github_calls_record_latency_per_endpoint(self):
+        """
+        Test that GitHub calls are timed under the endpoint template,
+        not the full URL.
+        """
+        # Arrange
+        labels = {'service': 'github', 'endpoint': '/orgs/{}/memberships/{}', 'method': 'GET', 'status': '200'}
+        before = REGISTRY.get_sample_value('outbound_request_duration_seconds_count', labels) or 0
+
+        # Act
+        GithubRequest().get(url=f'{self.base_url}/orgs/nss-cohort-1/memberships/ada')
+        GithubRequest().get(url=f'{self.base_url}/orgs/nss-cohort-2/memberships/grace')
+
+        # Assert
+        after = REGISTRY.get_sample_value('outbound_request_duration_seconds_count', labels)
+        self.assertEqual(after - before, 2)
+
+    def test_github_endpoint_templates(self):
+        """
+        Test that owner, repository and user names are replaced in endpoint labels.
+        """
+        self.assertEqual(
+            github_endpoint('https://api.github.com/repos/nss/api-template/generate'),
+            '/repos/{}/{}/generate'
+        )
+        self.assertEqual(
+            github_endpoint('https://api.github.com/repos/nss-c70/team-1/collaborators/ada'),
+            '/repos/{}/{}/collaborators/{}'
+        )
+        self.assertEqual(
+            github_endpoint('https://api.github.com/orgs/nss-c70/memberships/ada'),
+            '/orgs/{}/memberships/{}'
+        )
@@ -0,0 +1,88 @@
+"""
+Tests for per-request query profiling and query budgets.
+"""
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.middleware import QueryBudgetExceeded, QueryProfile
+from LearningAPI.models.people import CohortEventType
+
+
+class QueryProfileTests(TestCase):
+    """Verify queries are counted and repeated patterns are found"""
+
+    def test_repeated_pattern_is_a_duplicate(self):
+        """
+        Test that one statement run per row is reported once with its count,
+        whatever the length of its IN lists.
+        """
+        # Arrange
+        profile = QueryProfile()
+        for number in range(6):
+            CohortEventType.objects.create(description=f'Event {number}')
+
+        # Act
+        with connection.execute_wrapper(profile):
+            for event_type in CohortEventType.objects.all():
+                CohortEventType.objects.filter(id=event_type.id).exists()
+            list(CohortEventType.objects.filter(id__in=[1, 2]))
+            list(CohortEventType.objects.filter(id__in=[1, 2, 3]))
+
+        # Assert
+        self.assertEqual(profile.count, 9)
+        duplicates = profile.duplicates(threshold=2)
+        self.assertEqual([count for _, count in duplicates], [6, 2])
+        self.assertIn('IN (...)', duplicates[1][0])
+
+
+@patch('LearningAPI.cache.valkey_client')
+class QueryBudgetTests(APITestCase):
+    """Verify request metrics and budget enforcement"""
+
+    def setUp(self):
+        """Authenticate as an instructor"""
+        user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def test_request_queries_are_observed_by_view(self, mock_valkey):
+        """
+        Test that the query count of a request is observed under its view name.
+        """
+        # Arrange
+        labels = {'view': 'cohorteventtype-list'}
+        before = REGISTRY.get_sample_value('db_queries_per_request_count', labels) or 0
+
+        # Act
+        self.client.get('/eventtypes')
+
+        # Assert
+        self.assertEqual(REGISTRY.get_sample_value('db_queries_per_request_count', labels), before + 1)
+        self.assertGreater(REGISTRY.get_sample_value('db_queries_per_request_sum', labels), 0)
+
+    @override_settings(QUERY_BUDGETS={'cohorteventtype-list': 1}, QUERY_BUDGET_STRICT=True)
+    def test_strict_budget_fails_request(self, mock_valkey):
+        """
+        Test that a view over its budget raises when budgets are strict.
+        """
+        # Act, Assert
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/eventtypes')
+
+    @override_settings(QUERY_BUDGETS={'cohorteventtype-list': 1}, QUERY_BUDGET_STRICT=False)
+    def test_lenient_budget_is_logged(self, mock_valkey):
+        """
+        Test that a view over its budget is only reported when budgets are
+        not strict.
+        """
+        # Act
+        with patch('LearningAPI.middleware.log') as mock_log:
+            response = self.client.get('/eventtypes')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        mock_log.warning.assert_called_with("QueryProfileMiddleware: query budget exceeded", budget=1)
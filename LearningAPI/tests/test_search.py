@@ -0,0 +1,100 @@
+"""
+Tests for ranked cohort and student search.
+
+Test databases are created without migrations, so these exercise the
+substring fallback used when pg_trgm is not installed.
+"""
+from datetime import date
+from django.contrib.auth.models import Group, User
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models import Cohort, NssUser, NssUserCohort
+
+
+def make_cohort(name):
+    return Cohort.objects.create(
+        name=name, slack_channel="C12345",
+        start_date=date(2024, 1, 1), end_date=date(2024, 6, 30),
+        break_start_date=date(2024, 3, 15), break_end_date=date(2024, 3, 22),
+    )
+
+
+def make_student(username, first_name, last_name, github_handle):
+    user = User.objects.create_user(username=username, password='pass', first_name=first_name, last_name=last_name)
+    return NssUser.objects.create(user=user, github_handle=github_handle)
+
+
+class SearchTests(APITestCase):
+    """Verify matching and ranking of cohort and student searches"""
+
+    def setUp(self):
+        """Create an instructor, two cohorts and three students"""
+        user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        user.groups.add(Group.objects.get_or_create(name='Instructors')[0])
+        NssUser.objects.create(user=user)
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.day_cohort = make_cohort("Day Cohort 70")
+        self.evening_cohort = make_cohort("Evening Cohort 31")
+        self.ada = make_student('ada', 'Ada', 'Lovelace', 'adagh')
+        self.grace = make_student('grace', 'Grace', 'Hopper', 'ghopper')
+        self.alan = make_student('alan', 'Alan', 'Turing', 'lovelace-fan')
+        NssUserCohort.objects.create(nss_user=self.ada, cohort=self.day_cohort)
+        NssUserCohort.objects.create(nss_user=self.alan, cohort=self.evening_cohort)
+
+    def test_cohort_search_matches_every_word(self):
+        """
+        Test that a cohort search returns cohorts containing every word.
+        """
+        # Act
+        response = self.client.get('/cohorts?q=day 70')
+
+        # Assert
+        self.assertEqual([cohort['name'] for cohort in response.data], ['Day Cohort 70'])
+
+    def test_student_search_ranks_closest_match_first(self):
+        """
+        Test that a student whose last name is the search ranks above one
+        whose GitHub handle only contains it.
+        """
+        # Act
+        response = self.client.get('/students/search?q=lovelace')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([student['id'] for student in response.data], [self.ada.id, self.alan.id])
+        self.assertEqual(response.data[0]['cohorts'], [{'id': self.day_cohort.id, 'name': 'Day Cohort 70'}])
+
+    def test_student_search_by_full_name_and_cohort(self):
+        """
+        Test that words can match different columns and the search can be
+        limited to a cohort.
+        """
+        # Act
+        by_name = self.client.get('/students/search?q=ada lovelace')
+        in_cohort = self.client.get(f'/students/search?q=lovelace&cohort={self.evening_cohort.id}')
+
+        # Assert
+        self.assertEqual([student['name'] for student in by_name.data], ['Ada Lovelace'])
+        self.assertEqual([student['id'] for student in in_cohort.data], [self.alan.id])
+
+    def test_student_search_requires_terms(self):
+        """
+        Test that a search without words is rejected.
+        """
+        # Act
+        response = self.client.get('/students/search?q=')
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+
+    def test_unassigned_last_name_search(self):
+        """
+        Test that the last name search only returns students without a cohort.
+        """
+        # Act
+        response = self.client.get('/students?lastname_like=hop')
+
+        # Assert
+        self.assertEqual(response.data, [{'name': 'Grace Hopper', 'id': self.grace.id}])
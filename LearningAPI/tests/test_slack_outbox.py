@@ -0,0 +1,201 @@
+"""
+Tests for the Slack outbox and the deliver_slack_messages worker.
+
+Messages are delivered to a fake Slack Web API served from a local thread.
+"""
+import json
+from io import StringIO
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models import NssUser, SlackMessage
+
+
+class FakeSlackHandler(BaseHTTPRequestHandler):
+    """Answer chat.postMessage with the next queued reply"""
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        length = int(self.headers['Content-Length'])
+        payload = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+        self.server.received.append((self.path, payload))
+
+        status, body = self.server.replies.pop(0) if self.server.replies else (200, {"ok": True})
+        encoded = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class FakeSlackMixin:
+    """Run a fake Slack Web API for the duration of each test"""
+
+    def setUp(self):
+        super().setUp()
+        self.slack = ThreadingHTTPServer(('127.0.0.1', 0), FakeSlackHandler)
+        self.slack.received = []
+        self.slack.replies = []
+        threading.Thread(target=self.slack.serve_forever, daemon=True).start()
+
+        settings_override = override_settings(
+            SLACK_API_URL=f'http://127.0.0.1:{self.slack.server_address[1]}',
+            SLACK_OUTBOX_MAX_ATTEMPTS=3,
+            SLACK_OUTBOX_RETRY_SECONDS=30,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(self.slack.server_close)
+        self.addCleanup(self.slack.shutdown)
+
+    def deliver(self):
+        call_command('deliver_slack_messages', '--once', stdout=StringIO())
+
+
+class SlackOutboxDeliveryTests(FakeSlackMixin, TestCase):
+    """Verify delivery, retries and dead-lettering"""
+
+    def test_pending_message_is_delivered(self):
+        """
+        Test that a queued message is posted to chat.postMessage and marked sent.
+        """
+        # Arrange
+        message = SlackMessage.queue(channel="C12345", text="Hello cohort")
+
+        # Act
+        self.deliver()
+
+        # Assert
+        message.refresh_from_db()
+        self.assertEqual(message.status, SlackMessage.SENT)
+        self.assertEqual(message.attempts, 1)
+        path, payload = self.slack.received[0]
+        self.assertEqual(path, '/chat.postMessage')
+        self.assertEqual(payload['channel'], "C12345")
+        self.assertEqual(payload['text'], "Hello cohort")
+
+    def test_server_error_is_retried_with_backoff(self):
+        """
+        Test that an HTTP failure leaves the message pending until its
+        backoff expires, and that it is delivered on the next attempt.
+        """
+        # Arrange
+        message = SlackMessage.queue(channel="C12345", text="Retry me")
+        self.slack.replies.append((500, "<html>Internal error</html>"))
+
+        # Act
+        self.deliver()
+        message.refresh_from_db()
+        first_attempt = (message.status, message.attempts, message.available_on)
+        self.deliver()
+
+        # Assert
+        self.assertEqual(first_attempt[0], SlackMessage.PENDING)
+        self.assertEqual(first_attempt[1], 1)
+        self.assertGreater(first_attempt[2], timezone.now() + timedelta(seconds=20))
+        self.assertEqual(len(self.slack.received), 1)
+
+        SlackMessage.objects.filter(pk=message.pk).update(available_on=timezone.now())
+        self.deliver()
+        message.refresh_from_db()
+        self.assertEqual(message.status, SlackMessage.SENT)
+        self.assertEqual(message.attempts, 2)
+
+    def test_claimed_message_is_leased(self):
+        """
+        Test that a claimed message is not claimed again until its lease
+        expires, so a worker that stops mid-batch does not lose it.
+        """
+        # Arrange
+        message = SlackMessage.queue(channel="C12345", text="Leased")
+
+        # Act
+        first = SlackMessage.claim(10)
+        second = SlackMessage.claim(10)
+        SlackMessage.objects.filter(pk=message.pk).update(available_on=timezone.now())
+        after_lease = SlackMessage.claim(10)
+
+        # Assert
+        self.assertEqual([claimed.pk for claimed in first], [message.pk])
+        self.assertEqual(second, [])
+        self.assertEqual([claimed.pk for claimed in after_lease], [message.pk])
+
+    def test_message_is_dead_lettered_after_max_attempts(self):
+        """
+        Test that a message failing SLACK_OUTBOX_MAX_ATTEMPTS times is marked dead.
+        """
+        # Arrange
+        message = SlackMessage.queue(channel="C12345", text="Never arrives")
+        self.slack.replies.extend([(200, {"ok": False, "error": "ratelimited"})] * 3)
+
+        # Act
+        for _ in range(3):
+            SlackMessage.objects.filter(pk=message.pk).update(available_on=timezone.now())
+            self.deliver()
+
+        # Assert
+        message.refresh_from_db()
+        self.assertEqual(message.status, SlackMessage.DEAD)
+        self.assertEqual(message.attempts, 3)
+        self.assertEqual(message.last_error, "ratelimited")
+
+    def test_permanent_error_is_dead_lettered_immediately(self):
+        """
+        Test that an error retrying cannot fix skips the remaining attempts.
+        """
+        # Arrange
+        message = SlackMessage.queue(channel="CGONE", text="Nobody home")
+        self.slack.replies.append((200, {"ok": False, "error": "channel_not_found"}))
+
+        # Act
+        self.deliver()
+
+        # Assert
+        message.refresh_from_db()
+        self.assertEqual(message.status, SlackMessage.DEAD)
+        self.assertEqual(message.attempts, 1)
+
+
+class SlackOutboxViewTests(FakeSlackMixin, APITestCase):
+    """Verify request handlers queue messages instead of calling Slack"""
+
+    def setUp(self):
+        """Create an instructor, a student with a Slack handle, and authenticate"""
+        super().setUp()
+        self.user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        self.user.groups.add(Group.objects.create(name='Instructors'))
+        self.coach = NssUser.objects.create(user=self.user)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.student = NssUser.objects.create(
+            user=User.objects.create_user(username='student', password='pass'),
+            slack_handle='U12345'
+        )
+
+    def test_feedback_queues_message_for_student(self):
+        """
+        Test that 1:1 feedback responds without contacting Slack and the
+        worker later delivers the queued message.
+        """
+        # Act
+        response = self.client.post(f'/students/{self.student.id}/feedback', {"notes": "Great work"}, format='json')
+
+        # Assert
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.slack.received, [])
+        message = SlackMessage.objects.get()
+        self.assertEqual(message.channel, 'U12345')
+
+        self.deliver()
+        self.assertEqual(self.slack.received[0][1]['channel'], 'U12345')
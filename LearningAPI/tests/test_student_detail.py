@@ -0,0 +1,130 @@
+"""
+Query budget tests for GET /students/<id>.
+
+A student profile must load in the same number of queries no matter how many
+learning records, entries, notes or capstones the student has.
+
+Valkey is mocked, following the pattern in test_cohort_student_cache.py, so
+no cached current cohort is read.
+"""
+from datetime import date
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models import Book, Cohort, Course, NssUser, NssUserCohort, Project
+from LearningAPI.models.coursework import Capstone, StudentProject
+from LearningAPI.models.people import OneOnOneNote, StudentNote
+from LearningAPI.models.skill import (
+    CoreSkill, CoreSkillRecord, LearningRecord, LearningRecordEntry, LearningWeight
+)
+
+
+STUDENT_DETAIL_QUERY_BUDGET = 16
+
+
+@patch('LearningAPI.cache.valkey_client')
+class StudentDetailQueryTests(APITestCase):
+    """Verify the student detail endpoint has a constant query count"""
+
+    def setUp(self):
+        """Create an instructor, a cohort and the course content students need"""
+        self.user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        self.coach = NssUser.objects.create(user=self.user)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.cohort = Cohort.objects.create(
+            name="Detail Cohort 1",
+            slack_channel="C12345",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 6, 30),
+            break_start_date=date(2024, 3, 15),
+            break_end_date=date(2024, 3, 22),
+        )
+        self.course = Course.objects.create(name="Client Side")
+        book = Book.objects.create(name="Book One", course=self.course, index=0)
+        self.projects = [
+            Project.objects.create(name=f"Project {index}", book=book, index=index)
+            for index in range(3)
+        ]
+        self.skills = [CoreSkill.objects.create(label=f"Skill {index}") for index in range(3)]
+
+    def create_student(self, username, size):
+        """Create a student with `size` of every kind of related record"""
+        student = NssUser.objects.create(
+            user=User.objects.create_user(username=username, password='pass'),
+            github_handle=username
+        )
+        NssUserCohort.objects.create(nss_user=student, cohort=self.cohort)
+
+        for index in range(size):
+            weight = LearningWeight.objects.create(label=f"{username} objective {index}", weight=index + 1)
+            record = LearningRecord.objects.create(student=student, weight=weight, achieved=index % 2 == 0)
+            LearningRecordEntry.objects.create(record=record, note="Progress", instructor=self.coach)
+            LearningRecordEntry.objects.create(record=record, note="More progress", instructor=self.coach)
+            StudentNote.objects.create(student=student, coach=self.coach, note=f"Note {index}")
+            OneOnOneNote.objects.create(student=student, coach=self.coach, notes=f"Feedback {index}")
+
+        for skill in self.skills[:size]:
+            CoreSkillRecord.objects.create(student=student, skill=skill, level=3)
+
+        for project in self.projects[:size]:
+            StudentProject.objects.create(student=student, project=project)
+
+        if size:
+            Capstone.objects.create(student=student, course=self.course, proposal_url="https://x", description="")
+
+        return student
+
+    def count_detail_queries(self, student):
+        """Request a student's profile and return the number of queries it ran"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/students/{student.id}')
+
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_is_constant(self, mock_valkey):
+        """
+        Test that a student with many related records costs the same number
+        of queries as a student with one of each.
+        """
+        # Arrange
+        mock_valkey.get.return_value = None
+        small = self.create_student('small', 1)
+        large = self.create_student('large', 12)
+
+        # Act
+        small_count = self.count_detail_queries(small)
+        large_count = self.count_detail_queries(large)
+
+        # Assert
+        self.assertEqual(small_count, large_count,
+                         "Query count should not grow with the number of records")
+        self.assertLessEqual(large_count, STUDENT_DETAIL_QUERY_BUDGET)
+
+    def test_detail_payload(self, mock_valkey):
+        """
+        Test that the prefetched profile reports the latest project and
+        every record, entry and note.
+        """
+        # Arrange
+        mock_valkey.get.return_value = None
+        student = self.create_student('learner', 3)
+
+        # Act
+        response = self.client.get(f'/students/{student.id}')
+
+        # Assert
+        self.assertEqual(response.data['project']['id'], self.projects[2].id)
+        self.assertEqual(len(response.data['records']), 3)
+        self.assertEqual(len(response.data['records'][0]['entries']), 2)
+        self.assertFalse(response.data['records'][0]['achieved'],
+                         "Records should be ordered with unachieved records first")
+        self.assertEqual(len(response.data['notes']), 3)
+        self.assertEqual(len(response.data['feedback']), 3)
+        self.assertEqual(len(response.data['core_skill_records']), 3)
+        self.assertEqual(len(response.data['capstones']), 1)
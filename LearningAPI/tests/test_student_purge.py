@@ -0,0 +1,145 @@
+"""
+Tests for purging students with DELETE /students/<id> and the purge_students command.
+"""
+from datetime import date
+from io import StringIO
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models import Book, Cohort, Course, NssUser, NssUserCohort, Project, Tag
+from LearningAPI.models.coursework import Capstone, CapstoneTimeline, ProposalStatus, StudentProject
+from LearningAPI.models.people import StudentNote, StudentTag
+from LearningAPI.purge import purge_students
+
+
+class StudentPurgeTests(APITestCase):
+    """Verify students and their records are removed set-wise in one transaction"""
+
+    def setUp(self):
+        """Create an instructor and a cohort"""
+        self.user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        self.coach = NssUser.objects.create(user=self.user)
+        Group.objects.get_or_create(name='Instructors')[0].user_set.add(self.user)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.cohort = Cohort.objects.create(
+            name="Archived Cohort 1",
+            slack_channel="C12345",
+            start_date=date(2023, 1, 1),
+            end_date=date(2023, 6, 30),
+            break_start_date=date(2023, 3, 15),
+            break_end_date=date(2023, 3, 22),
+        )
+        NssUserCohort.objects.create(cohort=self.cohort, nss_user=self.coach)
+        self.course = Course.objects.create(name="Client Side")
+        self.project = Project.objects.create(
+            name="Project", book=Book.objects.create(name="Book", course=self.course, index=0), index=0
+        )
+        self.tag = Tag.objects.create(name="Tag")
+        self.proposal_status = ProposalStatus.objects.create(status="Submitted")
+
+    def add_students(self, count, offset=0):
+        students = []
+        for index in range(offset, offset + count):
+            student = NssUser.objects.create(
+                user=User.objects.create_user(username=f'student{index}', password='pass')
+            )
+            NssUserCohort.objects.create(cohort=self.cohort, nss_user=student)
+            StudentProject.objects.create(student=student, project=self.project)
+            StudentTag.objects.create(student=student, tag=self.tag)
+            StudentNote.objects.create(student=student, coach=self.coach, note="Note")
+            capstone = Capstone.objects.create(
+                student=student, course=self.course, proposal_url="https://example.com", description=""
+            )
+            CapstoneTimeline.objects.create(capstone=capstone, status=self.proposal_status)
+            students.append(student)
+        return students
+
+    def test_destroy_deletes_student_and_records(self):
+        """
+        Test that deleting a student removes their account and every record.
+        """
+        # Arrange
+        student = self.add_students(1)[0]
+
+        # Act
+        response = self.client.delete(f'/students/{student.id}')
+
+        # Assert
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(NssUser.objects.filter(pk=student.id).exists())
+        self.assertFalse(User.objects.filter(pk=student.user_id).exists())
+        self.assertEqual(StudentProject.objects.count(), 0)
+        self.assertEqual(CapstoneTimeline.objects.count(), 0)
+        self.assertEqual(StudentNote.objects.count(), 0)
+
+    def test_soft_destroy_keeps_student_and_notes(self):
+        """
+        Test that a soft delete keeps the account and notes but clears the
+        cohort and coursework.
+        """
+        # Arrange
+        student = self.add_students(1)[0]
+
+        # Act
+        response = self.client.delete(f'/students/{student.id}?soft=true')
+
+        # Assert
+        self.assertEqual(response.status_code, 204)
+        self.assertTrue(NssUser.objects.filter(pk=student.id).exists())
+        self.assertEqual(StudentNote.objects.filter(student=student).count(), 1)
+        self.assertFalse(NssUserCohort.objects.filter(nss_user=student).exists())
+        self.assertEqual(Capstone.objects.count(), 0)
+
+    def test_purge_reports_counts_per_table(self):
+        """
+        Test that purging returns the number of deleted rows of each model.
+        """
+        # Arrange
+        students = self.add_students(3)
+
+        # Act
+        counts = purge_students([student.id for student in students], soft=True)
+
+        # Assert
+        self.assertEqual(counts['LearningAPI.StudentProject'], 3)
+        self.assertEqual(counts['LearningAPI.CapstoneTimeline'], 3)
+        self.assertEqual(counts['LearningAPI.NssUserCohort'], 3)
+        self.assertNotIn('LearningAPI.StudentNote', counts)
+
+    def test_command_purges_cohort_students_only(self):
+        """
+        Test that the command purges the cohort's students but not its instructor.
+        """
+        # Arrange
+        self.add_students(2)
+        out = StringIO()
+
+        # Act
+        call_command('purge_students', '--cohort', str(self.cohort.id), stdout=out)
+
+        # Assert
+        self.assertIn("Purged 2 students", out.getvalue())
+        self.assertEqual(list(NssUser.objects.values_list('id', flat=True)), [self.coach.id])
+        self.assertTrue(NssUserCohort.objects.filter(nss_user=self.coach).exists())
+
+    def test_query_count_does_not_grow_with_students(self):
+        """
+        Test that a soft purge of 20 students takes as many queries as a purge of 2.
+        """
+        # Arrange
+        small = [student.id for student in self.add_students(2)]
+        large = [student.id for student in self.add_students(20, offset=2)]
+
+        # Act
+        with CaptureQueriesContext(connection) as small_queries:
+            purge_students(small, soft=True)
+        with CaptureQueriesContext(connection) as large_queries:
+            purge_students(large, soft=True)
+
+        # Assert
+        self.assertEqual(len(small_queries), len(large_queries))
@@ -0,0 +1,109 @@
+"""
+Tests for the stored NssUser.score and the refresh_scores command.
+"""
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from LearningAPI.models import NssUser
+from LearningAPI.models.skill import CoreSkill, CoreSkillRecord, LearningRecord, LearningWeight
+from LearningAPI.views.student_view import StudentSerializer
+
+
+class StudentScoreTests(TestCase):
+    """Verify the stored score follows learning and core skill records"""
+
+    def setUp(self):
+        """Create a student and two learning objectives"""
+        self.student = NssUser.objects.create(
+            user=User.objects.create_user(username='student', password='pass'),
+            github_handle='student'
+        )
+        self.functions = LearningWeight.objects.create(label="Functions", weight=20)
+        self.loops = LearningWeight.objects.create(label="Loops", weight=10)
+
+    def stored_score(self):
+        self.student.refresh_from_db(fields=['score'])
+        return self.student.score
+
+    def test_achieving_objective_updates_score(self):
+        """
+        Test that achieving and un-achieving objectives keeps the stored
+        score equal to the total of achieved weights.
+        """
+        # Arrange
+        record = LearningRecord.objects.create(student=self.student, weight=self.functions, achieved=True)
+        LearningRecord.objects.create(student=self.student, weight=self.loops, achieved=False)
+        self.assertEqual(self.stored_score(), 20)
+
+        # Act
+        record.achieved = False
+        record.save()
+
+        # Assert
+        self.assertEqual(self.stored_score(), 0)
+
+    def test_core_skill_levels_adjust_score(self):
+        """
+        Test that core skill levels raise the score by their mean percent and
+        that deleting a core skill record recalculates it.
+        """
+        # Arrange
+        LearningRecord.objects.create(student=self.student, weight=self.functions, achieved=True)
+        first = CoreSkillRecord.objects.create(student=self.student, skill=CoreSkill.objects.create(label="A"), level=2)
+        CoreSkillRecord.objects.create(student=self.student, skill=CoreSkill.objects.create(label="B"), level=4)
+        self.assertEqual(self.stored_score(), 26)
+
+        # Act
+        first.delete()
+
+        # Assert
+        self.assertEqual(self.stored_score(), 28)
+        self.assertEqual(self.stored_score(), self.student.calculate_score())
+
+    def test_reweighting_objective_updates_score(self):
+        """
+        Test that changing the weight of an objective updates the scores of
+        students who achieved it.
+        """
+        # Arrange
+        LearningRecord.objects.create(student=self.student, weight=self.functions, achieved=True)
+
+        # Act
+        self.functions.weight = 35
+        self.functions.save()
+
+        # Assert
+        self.assertEqual(self.stored_score(), 35)
+
+    def test_command_verifies_and_backfills(self):
+        """
+        Test that --verify reports a wrong stored score and that a plain run
+        corrects it.
+        """
+        # Arrange
+        LearningRecord.objects.create(student=self.student, weight=self.functions, achieved=True)
+        NssUser.objects.filter(id=self.student.id).update(score=0)
+
+        # Act
+        with self.assertRaises(CommandError):
+            call_command('refresh_scores', '--verify', stdout=StringIO())
+        call_command('refresh_scores', stdout=StringIO())
+
+        # Assert
+        self.assertEqual(self.stored_score(), 20)
+        call_command('refresh_scores', '--verify', stdout=StringIO())
+
+    def test_serializer_does_not_write_score(self):
+        """
+        Test that a score sent to the student serializer is ignored.
+        """
+        # Arrange
+        serializer = StudentSerializer(self.student, data={'score': 999}, partial=True)
+
+        # Act
+        serializer.is_valid(raise_exception=True)
+
+        # Assert
+        self.assertNotIn('score', serializer.validated_data)
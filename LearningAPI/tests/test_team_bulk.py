@@ -0,0 +1,205 @@
+"""
+Tests for bulk team creation with POST /teams/bulk and the provision_teams job.
+
+Slack, GitHub and Valkey are mocked, following test_team_maker_integration.py.
+"""
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models import (
+    Book, Cohort, CohortInfo, Course, GroupProjectRepository, NssUser, NssUserCohort, Project, StudentTeam
+)
+from LearningAPI.models.people import NSSUserTeam, TeamProvisioningJob
+
+
+class TeamBulkTests(APITestCase):
+    """Verify teams are saved at once and provisioned by the background job"""
+
+    def setUp(self):
+        """Create an instructor, a cohort with a GitHub organization, a group project and six students in it"""
+        self.user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        NssUser.objects.create(user=self.user)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.cohort = Cohort.objects.create(
+            name="Bulk Cohort 51",
+            slack_channel="C12345",
+            start_date="2024-01-01",
+            end_date="2024-06-30",
+            break_start_date="2024-03-15",
+            break_end_date="2024-03-22",
+        )
+        CohortInfo.objects.create(cohort=self.cohort, student_organization_url="https://github.com/bulk-org")
+        book = Book.objects.create(name="Book", course=Course.objects.create(name="Course"), index=1)
+        self.project = Project.objects.create(
+            name="Group Project",
+            book=book,
+            index=1,
+            client_template_url="https://github.com/templates/client-template",
+            is_group_project=True
+        )
+        self.students = [
+            NssUser.objects.create(
+                user=User.objects.create_user(username=f'student{index}', password='pass'),
+                github_handle=f'student{index}gh'
+            )
+            for index in range(6)
+        ]
+        for student in self.students:
+            NssUserCohort.objects.create(nss_user=student, cohort=self.cohort)
+        self.teams = [[student.id for student in self.students[start:start + 2]] for start in range(0, 6, 2)]
+
+    def post_bulk(self, teams=None):
+        return self.client.post('/teams/bulk', {
+            "cohort": self.cohort.id,
+            "teams": teams if teams is not None else self.teams,
+            "groupProject": self.project.id,
+            "weeklyPrefix": "sprint"
+        }, format='json')
+
+    def test_bulk_saves_teams_and_queues_job(self):
+        """
+        Test that every team and membership is saved without calling Slack or
+        GitHub, and a pending job is returned.
+        """
+        # Act
+        with patch('LearningAPI.views.team_maker_view.SlackAPI') as MockSlack:
+            response = self.post_bulk()
+
+        # Assert
+        self.assertEqual(response.status_code, 202)
+        MockSlack.assert_not_called()
+        self.assertEqual(StudentTeam.objects.filter(cohort=self.cohort).count(), 3)
+        self.assertEqual(NSSUserTeam.objects.count(), 6)
+        self.assertEqual(response.data['status'], TeamProvisioningJob.PENDING)
+        self.assertEqual(response.data['total'], 3)
+        self.assertTrue(response['Location'].endswith(f"/teams/bulk/{response.data['id']}"))
+
+    def test_unknown_student_is_rejected(self):
+        """
+        Test that a team with an unknown student saves nothing.
+        """
+        # Act
+        response = self.post_bulk([[self.students[0].id, 999999]])
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(StudentTeam.objects.count(), 0)
+
+    def test_student_from_another_cohort_is_rejected(self):
+        """
+        Test that a team with a student who is not in the cohort saves nothing.
+        """
+        # Arrange
+        outsider = NssUser.objects.create(
+            user=User.objects.create_user(username='outsider', password='pass'),
+            github_handle='outsidergh'
+        )
+
+        # Act
+        response = self.post_bulk([[self.students[0].id, outsider.id]])
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(StudentTeam.objects.count(), 0)
+
+    def test_student_in_two_teams_is_rejected(self):
+        """
+        Test that a student listed in more than one team saves nothing.
+        """
+        # Act
+        response = self.post_bulk([[self.students[0].id, self.students[1].id], [self.students[1].id]])
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(StudentTeam.objects.count(), 0)
+
+    def test_non_integer_student_id_is_rejected(self):
+        """
+        Test that student ids that are not integers are a bad request.
+        """
+        # Act
+        response = self.post_bulk([[self.students[0].id, str(self.students[1].id)], [None]])
+
+        # Assert
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(StudentTeam.objects.count(), 0)
+
+    @patch('LearningAPI.views.team_maker_view.valkey_client')
+    @patch('LearningAPI.views.team_maker_view.GithubRequest')
+    @patch('LearningAPI.views.team_maker_view.SlackAPI')
+    def test_abandoned_job_is_resumed(self, MockSlack, MockGithub, mock_valkey):
+        """
+        Test that a job left running by a stopped worker is claimed again
+        after its lease, skips the teams already set up and counts each
+        team once.
+        """
+        # Arrange
+        job_id = self.post_bulk().data['id']
+        team = StudentTeam.objects.order_by('id').first()
+        team.slack_channel = "C1"
+        team.save()
+        GroupProjectRepository.objects.create(team=team, project=self.project, repository="https://github.com/bulk-org/done")
+        TeamProvisioningJob.objects.filter(pk=job_id).update(
+            status=TeamProvisioningJob.RUNNING, completed=1,
+            heartbeat_on=timezone.now() - timedelta(hours=1)
+        )
+        MockSlack.return_value.create_channel.side_effect = ["C2", "C3"]
+        MockGithub.return_value.create_repository.return_value = MagicMock(status_code=201)
+
+        # Act
+        call_command('provision_teams', '--once', stdout=StringIO())
+
+        # Assert
+        job = TeamProvisioningJob.objects.get(pk=job_id)
+        self.assertEqual((job.status, job.completed, job.failed), (TeamProvisioningJob.COMPLETE, 3, 0))
+        self.assertEqual(MockSlack.return_value.create_channel.call_count, 2)
+
+    def test_running_job_is_not_claimed_twice(self):
+        """
+        Test that a job whose worker is still making progress is left alone.
+        """
+        # Arrange
+        self.post_bulk()
+        TeamProvisioningJob.claim()
+
+        # Act
+        job = TeamProvisioningJob.claim()
+
+        # Assert
+        self.assertIsNone(job)
+
+    @patch('LearningAPI.views.team_maker_view.valkey_client')
+    @patch('LearningAPI.views.team_maker_view.GithubRequest')
+    @patch('LearningAPI.views.team_maker_view.SlackAPI')
+    def test_job_provisions_teams_and_reports_progress(self, MockSlack, MockGithub, mock_valkey):
+        """
+        Test that the job creates each team's channel and repository, records
+        a failing team, and publishes one ticket migration for all repositories.
+        """
+        # Arrange
+        job_id = self.post_bulk().data['id']
+        MockSlack.return_value.create_channel.side_effect = ["C1", "C2", Exception("name_taken")]
+        MockGithub.return_value.create_repository.return_value = MagicMock(status_code=201)
+
+        # Act
+        call_command('provision_teams', '--once', stdout=StringIO())
+        response = self.client.get(f'/teams/bulk/{job_id}')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], TeamProvisioningJob.COMPLETE)
+        self.assertEqual((response.data['completed'], response.data['failed']), (2, 1))
+        self.assertEqual(response.data['errors'][0]['message'], "name_taken")
+        self.assertEqual(GroupProjectRepository.objects.count(), 2)
+        self.assertEqual(
+            list(StudentTeam.objects.order_by('id').values_list('slack_channel', flat=True)),
+            ["C1", "C2", ""]
+        )
+        mock_valkey.publish.assert_called_once()
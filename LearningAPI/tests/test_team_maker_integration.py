@@ -10,6 +10,7 @@ Key concepts:
 - Verifying integration behavior
 - Testing error scenarios
 """
+import threading
 from rest_framework.test import APITestCase
 from unittest.mock import patch, MagicMock, ANY, call
 from django.urls import reverse
@@ -20,6 +21,7 @@ from LearningAPI.models import (
     CohortInfo, NssUserCohort, GroupProjectRepository,
     Book, Course
 )
+from LearningAPI.utils import GithubRateLimited
 
 
 class TeamMakerIntegrationTests(APITestCase):
@@ -140,7 +142,7 @@ class TeamMakerIntegrationTests(APITestCase):
         # Mock Slack channel creation
         slack_instance = MockSlack.return_value
         slack_instance.create_channel.return_value = "C9876543"
-        slack_instance.send_message.return_value = None
+        slack_instance.queue_message.return_value = None
 
         # Mock GitHub repository creation
         github_instance = MockGithub.return_value
@@ -185,7 +187,7 @@ class TeamMakerIntegrationTests(APITestCase):
         channel_name_arg = slack_instance.create_channel.call_args[0][0]
         self.assertIn('capstone', channel_name_arg.lower(),
                      "Channel name should include prefix")
-        slack_instance.send_message.assert_called()
+        slack_instance.queue_message.assert_called()
 
         # Assert: Verify GitHub was called correctly
         github_instance.create_repository.assert_called()
@@ -204,6 +206,44 @@ class TeamMakerIntegrationTests(APITestCase):
         self.assertEqual(publish_args[0], 'channel_migrate_issue_tickets',
                         "Should publish to correct channel")
 
+    @patch('LearningAPI.views.team_maker_view.valkey_client')
+    @patch('LearningAPI.views.team_maker_view.GithubRequest')
+    @patch('LearningAPI.views.team_maker_view.SlackAPI')
+    def test_repositories_are_provisioned_concurrently(self, MockSlack, MockGithub, mock_valkey):
+        """
+        Test that both repositories are generated at the same time and the
+        response reports the duration of each provisioning step.
+        """
+        # Arrange: each repository generation waits for the other to start
+        MockSlack.return_value.create_channel.return_value = "C9876543"
+        both_started = threading.Barrier(2, timeout=5)
+
+        def create_repository(**kwargs):
+            both_started.wait()
+            return MagicMock(status_code=201)
+
+        github_instance = MockGithub.return_value
+        github_instance.create_repository.side_effect = create_repository
+
+        # Act
+        url = reverse('team_maker-list')
+        data = {
+            "cohort": self.cohort.id,
+            "students": [self.student1.id, self.student2.id],
+            "groupProject": self.project.id,
+            "weeklyPrefix": "capstone"
+        }
+        response = self.client.post(url, data, format='json')
+
+        # Assert
+        self.assertEqual(response.status_code, 201,
+                        "Both generations should run at once without breaking the barrier")
+        self.assertEqual(github_instance.assign_student_permissions.call_count, 4)
+        self.assertEqual(GroupProjectRepository.objects.count(), 2)
+        server_timing = response['Server-Timing']
+        for step in ('slack_channel', 'repositories', 'collaborators'):
+            self.assertIn(f'{step};dur=', server_timing)
+
     @patch('LearningAPI.views.team_maker_view.valkey_client')
     @patch('LearningAPI.views.team_maker_view.GithubRequest')
     @patch('LearningAPI.views.team_maker_view.SlackAPI')
@@ -249,6 +289,66 @@ class TeamMakerIntegrationTests(APITestCase):
         self.assertEqual(GroupProjectRepository.objects.count(), 0,
                         "No repository records should be saved on failure")
 
+    @patch('LearningAPI.views.team_maker_view.valkey_client')
+    @patch('LearningAPI.views.team_maker_view.GithubRequest')
+    @patch('LearningAPI.views.team_maker_view.SlackAPI')
+    def test_rate_limited_repository_rolls_back_team(self, MockSlack, MockGithub, mock_valkey):
+        """
+        Test that a team whose client repository is refused by the GitHub
+        rate limit is removed with its channel, so the request can be retried.
+        """
+        # Arrange
+        slack_instance = MockSlack.return_value
+        slack_instance.create_channel.return_value = "C9876543"
+        MockGithub.return_value.create_repository.side_effect = GithubRateLimited(60)
+
+        # Act
+        response = self.client.post(reverse('team_maker-list'), {
+            "cohort": self.cohort.id,
+            "students": [self.student1.id, self.student2.id],
+            "groupProject": self.project.id,
+            "weeklyPrefix": "capstone"
+        }, format='json')
+
+        # Assert
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(StudentTeam.objects.count(), 0)
+        slack_instance.delete_channel.assert_called_once_with("C9876543")
+
+    @patch('LearningAPI.views.team_maker_view.valkey_client')
+    @patch('LearningAPI.views.team_maker_view.GithubRequest')
+    @patch('LearningAPI.views.team_maker_view.SlackAPI')
+    def test_rate_limited_grants_are_deferred_from_request_thread(self, MockSlack, MockGithub, mock_valkey):
+        """
+        Test that collaborator grants refused by the rate limit in the worker
+        threads are deferred again from the request thread.
+        """
+        # Arrange
+        MockSlack.return_value.create_channel.return_value = "C9876543"
+        github_instance = MockGithub.return_value
+        github_instance.create_repository.return_value = MagicMock(status_code=201)
+        request_thread = threading.get_ident()
+        deferring_threads = []
+
+        def assign_student_permissions(defer=True, **kwargs):
+            if not defer:
+                raise GithubRateLimited(60)
+            deferring_threads.append(threading.get_ident())
+
+        github_instance.assign_student_permissions.side_effect = assign_student_permissions
+
+        # Act
+        response = self.client.post(reverse('team_maker-list'), {
+            "cohort": self.cohort.id,
+            "students": [self.student1.id, self.student2.id],
+            "groupProject": self.project.id,
+            "weeklyPrefix": "capstone"
+        }, format='json')
+
+        # Assert
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(deferring_threads, [request_thread] * 4)
+
     @patch('LearningAPI.views.team_maker_view.valkey_client')
     @patch('LearningAPI.views.team_maker_view.GithubRequest')
     @patch('LearningAPI.views.team_maker_view.SlackAPI')
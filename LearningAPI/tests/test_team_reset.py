@@ -0,0 +1,120 @@
+"""
+Tests for DELETE /teams/reset and the archive_slack_channels job.
+
+Slack is mocked, following test_team_maker_integration.py.
+"""
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from LearningAPI.models import Cohort, NssUser, StudentTeam
+from LearningAPI.models.people import ChannelArchiveJob, NSSUserTeam
+
+
+class TeamResetTests(APITestCase):
+    """Verify reset deletes teams at once and archives channels in the background"""
+
+    def setUp(self):
+        """Create an instructor and a cohort with three teams"""
+        self.user = User.objects.create_user(username='coach', password='pass', is_staff=True)
+        NssUser.objects.create(user=self.user)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.cohort = Cohort.objects.create(
+            name="Reset Cohort 52",
+            slack_channel="C12345",
+            start_date="2024-01-01",
+            end_date="2024-06-30",
+            break_start_date="2024-03-15",
+            break_end_date="2024-03-22",
+        )
+        student = NssUser.objects.create(user=User.objects.create_user(username='student', password='pass'))
+        for channel in ("C1", "C2", "C3"):
+            team = StudentTeam.objects.create(group_name="", cohort=self.cohort, slack_channel=channel)
+            NSSUserTeam.objects.create(team=team, student=student)
+
+    def test_reset_deletes_teams_before_archiving(self):
+        """
+        Test that reset removes the teams without calling Slack and returns
+        a job holding their channels.
+        """
+        # Act
+        with patch('LearningAPI.views.team_maker_view.SlackAPI') as MockSlack:
+            response = self.client.delete(f'/teams/reset?cohort={self.cohort.id}')
+
+        # Assert
+        self.assertEqual(response.status_code, 202)
+        MockSlack.assert_not_called()
+        self.assertEqual(StudentTeam.objects.filter(cohort=self.cohort).count(), 0)
+        self.assertEqual(NSSUserTeam.objects.count(), 0)
+        self.assertEqual(sorted(ChannelArchiveJob.objects.get().channel_ids), ["C1", "C2", "C3"])
+        self.assertEqual(response.data['total'], 3)
+
+    def test_teams_without_channels_are_skipped(self):
+        """
+        Test that reset only records the channels of teams that have one.
+        """
+        # Arrange
+        StudentTeam.objects.create(group_name="", cohort=self.cohort, slack_channel="")
+
+        # Act
+        response = self.client.delete(f'/teams/reset?cohort={self.cohort.id}')
+
+        # Assert
+        self.assertEqual(response.data['total'], 3)
+        self.assertNotIn("", ChannelArchiveJob.objects.get().channel_ids)
+
+    @patch('LearningAPI.views.team_maker_view.SlackAPI')
+    def test_abandoned_job_is_resumed(self, MockSlack):
+        """
+        Test that a job left running by a stopped worker is claimed again
+        after its lease and counts each channel once.
+        """
+        # Arrange
+        job_id = self.client.delete(f'/teams/reset?cohort={self.cohort.id}').data['id']
+        ChannelArchiveJob.objects.filter(pk=job_id).update(
+            status=ChannelArchiveJob.RUNNING, archived=2,
+            heartbeat_on=timezone.now() - timedelta(hours=1)
+        )
+        MockSlack.return_value.delete_channel.return_value = True
+
+        # Act
+        call_command('archive_slack_channels', '--once', stdout=StringIO())
+
+        # Assert
+        job = ChannelArchiveJob.objects.get(pk=job_id)
+        self.assertEqual((job.status, job.archived, job.failed), (ChannelArchiveJob.COMPLETE, 3, 0))
+
+    @override_settings(SLACK_ARCHIVE_MAX_WORKERS=3)
+    @patch('LearningAPI.views.team_maker_view.SlackAPI')
+    def test_job_archives_channels_concurrently(self, MockSlack):
+        """
+        Test that the job archives every channel at once and reports the
+        channels Slack refused.
+        """
+        # Arrange: each archive waits until all three have started
+        job_id = self.client.delete(f'/teams/reset?cohort={self.cohort.id}').data['id']
+        all_started = threading.Barrier(3, timeout=5)
+
+        def delete_channel(channel_id):
+            all_started.wait()
+            return channel_id != "C3"
+
+        MockSlack.return_value.delete_channel.side_effect = delete_channel
+
+        # Act
+        call_command('archive_slack_channels', '--once', stdout=StringIO())
+        response = self.client.get(f'/teams/reset/{job_id}')
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], ChannelArchiveJob.COMPLETE)
+        self.assertEqual((response.data['archived'], response.data['failed']), (2, 1))
+        self.assertEqual(response.data['errors'][0]['channel'], "C3")
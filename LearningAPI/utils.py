@@ -2,9 +2,20 @@ import json, time, os, logging, requests
 import structlog
 from functools import wraps
 import time
+import threading
 import uuid
+from contextlib import contextmanager
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
+from django.conf import settings
 
+from rest_framework.exceptions import Throttled
+
+from LearningAPI import rate_limit
+from LearningAPI.metrics import outbound_request_duration_seconds
+from LearningAPI.models import DeferredGithubRequest, SlackMessage
 from LearningAPI.models.people import NssUser
 
 # Get a logger instance
@@ -77,6 +88,107 @@ def log_action(action_type):
         return wrapper
     return decorator
 
+class StepTimer(object):
+    """Collect the duration of the named steps of a request
+
+    Steps can be timed more than once; their durations add up.
+
+    >>> timings = StepTimer()
+    >>> with timings.step("repositories"):
+    ...     create_repositories()
+    >>> Response(data, headers=timings.headers())
+    """
+    def __init__(self):
+        self.durations = {}
+
+    @contextmanager
+    def step(self, name):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start_time) * 1000
+            self.durations[name] = self.durations.get(name, 0) + elapsed
+
+    def headers(self):
+        """Server-Timing header reporting each step in milliseconds"""
+        if not self.durations:
+            return {}
+
+        return {
+            "Server-Timing": ", ".join(f"{name};dur={duration:.1f}" for name, duration in self.durations.items())
+        }
+
+_session = None
+_session_lock = threading.Lock()
+
+def http_session():
+    """Get the process-wide HTTP session shared by SlackAPI and GithubRequest
+
+    Connections to each host are kept alive and reused, up to
+    HTTP_POOL_CONFIG['MAXSIZE'] per host. Cookies are never stored, so no
+    state leaks between callers.
+    """
+    global _session  # pylint: disable=global-statement
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(
+                    pool_connections=settings.HTTP_POOL_CONFIG['CONNECTIONS'],
+                    pool_maxsize=settings.HTTP_POOL_CONFIG['MAXSIZE'],
+                    pool_block=settings.HTTP_POOL_CONFIG['BLOCK'],
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+
+    return _session
+
+def timed_request(service, endpoint, method, url, **kwargs):
+    """Send a request through the shared session and record its latency
+
+    Args:
+        service (str): External API being called, e.g. "github"
+        endpoint (str): Low-cardinality name of the endpoint for the metrics
+        method (str): HTTP method
+        url (str): Full URL of the request
+        kwargs: Passed on to requests.Session.request()
+
+    Returns:
+        requests.Response: The response
+    """
+    status = "error"
+    start_time = time.perf_counter()
+    try:
+        response = http_session().request(method, url, **kwargs)
+        status = str(response.status_code)
+        return response
+    finally:
+        outbound_request_duration_seconds.labels(
+            service=service, endpoint=endpoint, method=method, status=status
+        ).observe(time.perf_counter() - start_time)
+
+def github_endpoint(url):
+    """Replace the owner, repository and other names in a GitHub API URL with {}
+
+    >>> github_endpoint("https://api.github.com/repos/nss/api/collaborators/ada")
+    '/repos/{}/{}/collaborators/{}'
+    """
+    segments = urlsplit(url).path.strip("/").split("/")
+    endpoint = []
+    index = 0
+    while index < len(segments):
+        resource = segments[index]
+        names = 2 if resource == "repos" else 1
+        endpoint.append(resource)
+        endpoint.extend("{}" for _ in segments[index + 1:index + 1 + names])
+        index += 1 + names
+
+    return "/" + "/".join(endpoint)
+
 class SlackAPI(object):
     """ This class is used to create a Slack channel for a student team """
     def __init__(self):
@@ -84,6 +196,25 @@ class SlackAPI(object):
             "Content-Type": "application/x-www-form-urlencoded"
         }
 
+    def post(self, method, payload):
+        """Call a Slack Web API method through the shared session"""
+        return timed_request(
+            "slack", method, "POST", f"{settings.SLACK_API_URL}/{method}",
+            data=payload, headers=self.headers, timeout=10
+        )
+
+    def queue_message(self, channel, text):
+        """Queue a message for the deliver_slack_messages worker
+
+        Use this from request handlers instead of send_message() so the
+        response does not wait on Slack.
+        """
+        if not channel:
+            logger.warning("slack_message_skipped", reason="no channel", text=text[:40])
+            return None
+
+        return SlackMessage.queue(channel=channel, text=text)
+
     def send_message(self, channel, text):
         # Configure the config for the Slack message
         channel_payload = {
@@ -92,12 +223,7 @@ class SlackAPI(object):
             "channel": channel
         }
 
-        response = requests.post(
-            url="https://slack.com/api/chat.postMessage",
-            data=channel_payload,
-            headers=self.headers,
-            timeout=10
-        )
+        response = self.post("chat.postMessage", channel_payload)
         return response.json()
 
 
@@ -108,12 +234,7 @@ class SlackAPI(object):
         }
 
         # Create a Slack channel with the given name
-        res = requests.post(
-            "https://slack.com/api/conversations.archive",
-            timeout=10,
-            data=channel_payload,
-            headers=self.headers
-        )
+        res = self.post("conversations.archive", channel_payload)
         channel_res = res.json()
         return channel_res['ok']
 
@@ -125,12 +246,7 @@ class SlackAPI(object):
         }
 
         # Create a Slack channel with the given name
-        res = requests.post(
-            "https://slack.com/api/conversations.create",
-            timeout=10,
-            data=channel_payload,
-            headers=self.headers
-        )
+        res = self.post("conversations.create", channel_payload)
         channel_res = res.json()
         logging.info("Channel created: %s", channel_res)
         if not channel_res["ok"]:
@@ -151,17 +267,20 @@ class SlackAPI(object):
         }
 
         # Invite students and instructors to the channel
-        requests.post(
-            "https://slack.com/api/conversations.invite",
-            timeout=10,
-            data=invitation_payload,
-            headers=self.headers
-        )
+        self.post("conversations.invite", invitation_payload)
 
         # Return the channel ID for the team
         return channel_res["channel"]["id"]
 
 
+class GithubRateLimited(Throttled):
+    """GitHub asked us to stop calling its API for `wait` seconds
+
+    Raised out of a view, DRF answers 429 with a Retry-After header.
+    """
+    default_detail = "GitHub's API rate limit has been reached."
+
+
 class GithubRequest(object):
     def __init__(self):
         self.headers = {
@@ -204,28 +323,31 @@ class GithubRequest(object):
 
         return response
 
-    def assign_student_permissions(self, student_org_name: str, repo_name: str, student: NssUser, permission: str = "write") -> requests.Response:
+    def assign_student_permissions(self, student_org_name: str, repo_name: str, student: NssUser, permission: str = "write", defer: bool = True) -> requests.Response:
         """Assign write permissions to a student for a repository
 
         Args:
             student_org_name (str): The name of the student organization
             repo_name (str): The name of the repository
             student (NSSUser): The student to assign permissions to
+            defer (bool): Store the request for later when GitHub is rate
+                limited, instead of raising GithubRateLimited
 
         Returns:
-            requests.Response: The response from the GitHub API
+            requests.Response: The response from the GitHub API, or None when deferred
         """
 
         # Construct request body for assigning permissions to the student
         request_body = { "permission":permission }
 
-        # Assign the student write permissions to the repository
+        # Assign the student write permissions to the repository, later if GitHub is rate limited
         response = self.put(
             url=f'https://api.github.com/repos/{student_org_name}/{repo_name}/collaborators/{student.github_handle}',
-            data=request_body
+            data=request_body,
+            defer=defer
         )
 
-        if response.status_code != 204:
+        if response is not None and response.status_code != 204:
             logger = logging.getLogger("LearningPlatform")
             logger.exception(
                 "Error: %s was not added as a collaborator to the assessment repository.",
@@ -236,18 +358,14 @@ class GithubRequest(object):
 
 
     def get(self, url):
-        return self.request_with_retry(lambda: requests.get(url=url, headers=self.headers, timeout=10))
+        return self.send("GET", url)
 
-    def put(self, url, data):
-        json_data = json.dumps(data)
-
-        return self.request_with_retry(lambda: requests.put(url=url, data=json_data, headers=self.headers, timeout=10))
-
-    def post(self, url, data):
-        json_data = json.dumps(data)
+    def put(self, url, data, defer=False):
+        return self.send("PUT", url, data, defer)
 
+    def post(self, url, data, defer=False):
         try:
-            result = self.request_with_retry(lambda: requests.post(url=url, data=json_data, headers=self.headers, timeout=10))
+            result = self.send("POST", url, data, defer)
             return result
 
         except TimeoutError:
@@ -258,26 +376,50 @@ class GithubRequest(object):
 
         return None
 
-    def request_with_retry(self, request):
-        retry_after_seconds = 1800
-        number_of_retries = 0
+    def send(self, method, url, data=None, defer=False):
+        """Send a request to the GitHub API within the shared rate limit
 
-        response = request()
+        Args:
+            method (str): HTTP method
+            url (str): Full GitHub API URL
+            data (dict): Request body, sent as JSON
+            defer (bool): When GitHub is rate limited, store the request for
+                run_deferred_github_requests instead of raising
+
+        Returns:
+            requests.Response: The response, or None when the request was deferred
+
+        Raises:
+            GithubRateLimited: GitHub is rate limited and defer is False
+        """
+        json_data = json.dumps(data) if data is not None else None
 
-        while response.status_code == 403 and number_of_retries <= 10:
-            number_of_retries += 1
+        try:
+            return self.request_within_limit(
+                lambda: timed_request("github", github_endpoint(url), method, url, data=json_data, headers=self.headers, timeout=10)
+            )
+        except GithubRateLimited as ex:
+            if not defer:
+                raise
 
-            os.system('cls' if os.name == 'nt' else 'clear')
-            self.sleep_with_countdown(retry_after_seconds)
+            DeferredGithubRequest.defer(method, url, data, ex.wait)
+            logger.info("github_request_deferred", method=method, endpoint=github_endpoint(url), wait=ex.wait)
+            return None
 
-            response = request()
+    def request_within_limit(self, request):
+        """Send a request unless the shared GitHub budget is spent
 
-        return response
+        Never waits. When GitHub is rate limited, before or because of this
+        request, GithubRateLimited reports how long every worker should hold off.
+        """
+        wait = rate_limit.acquire()
+        if wait:
+            raise GithubRateLimited(wait)
 
-    def sleep_with_countdown(self, countdown_seconds):
-        ticks = countdown_seconds * 2
-        for count in range(ticks, -1, -1):
-            if count:
-                time.sleep(0.5)
+        response = request()
 
+        wait = rate_limit.record(response)
+        if wait:
+            raise GithubRateLimited(wait)
 
+        return response
@@ -1,5 +1,7 @@
+from django.utils.decorators import method_decorator
 from rest_framework import serializers, permissions
 from rest_framework.viewsets import ModelViewSet
+from LearningAPI.conditional import conditional
 from LearningAPI.models.people import StudentAssessmentStatus
 
 
@@ -27,3 +29,11 @@ class AssessmentStatusView(ModelViewSet):
     queryset = StudentAssessmentStatus.objects.all()
     serializer_class = StatusSerializer
     permission_classes = [StatusPermission]
+
+    @method_decorator(conditional(StudentAssessmentStatus))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @method_decorator(conditional(StudentAssessmentStatus))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -1,9 +1,11 @@
 from django.http import HttpResponseServerError
+from django.utils.decorators import method_decorator
 from rest_framework import serializers, status
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
-from LearningAPI.models.coursework import Book, Course
+from LearningAPI.conditional import conditional
+from LearningAPI.models.coursework import Book, Course, Project
 from LearningAPI.models.people import  Assessment
 
 
@@ -33,6 +35,7 @@ class BookViewSet(ViewSet):
         except Exception as ex:
             return Response({"reason": ex.args[0]}, status=status.HTTP_400_BAD_REQUEST)
 
+    @method_decorator(conditional(Book, Course, Project, Assessment))
     def retrieve(self, request, pk=None):
         """Handle GET requests for single item
 
@@ -89,6 +92,7 @@ class BookViewSet(ViewSet):
         except Exception as ex:
             return Response({'message': ex.args[0]}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @method_decorator(conditional(Book, Course, Project, Assessment))
     def list(self, request):
         """Handle GET requests for all items
 
@@ -1,8 +1,10 @@
 from django.http import HttpResponseServerError
+from django.utils.decorators import method_decorator
 from rest_framework import serializers, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
+from LearningAPI.conditional import conditional
 from LearningAPI.models.people import Cohort, CohortEvent, CohortEventType
 from LearningAPI.utils import get_logger
 
@@ -11,6 +13,7 @@ logger = get_logger("LearningAPI.cohortevent")
 class CohortEventTypeViewSet(ViewSet):
     """Viewset to handle cohort event type-related operations"""
 
+    @method_decorator(conditional(CohortEventType))
     def list(self, request):
         """Handle GET operations to retrieve all cohort events
 
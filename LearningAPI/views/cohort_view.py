@@ -1,5 +1,6 @@
-from django.db.models import Count, Q
-from django.db import IntegrityError
+from django.db.models import Count, Prefetch, Q
+from django.db.models.functions import Lower
+from django.db import IntegrityError, transaction
 from django.http import HttpResponseServerError
 from rest_framework import serializers, status, permissions
 from rest_framework.decorators import action
@@ -7,15 +8,50 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 from LearningAPI.models.people import Cohort, NssUser, NssUserCohort, CohortInfo
 from LearningAPI.models.coursework import CohortCourse, Course, Project, StudentProject
+from LearningAPI.search import search_cohorts
+from LearningAPI.signals import defer_roster_expiry, expire_current_cohorts, expire_students
 from LearningAPI.utils import get_logger, bind_request_context, log_action
 
 logger = get_logger("LearningAPI.cohort")
 
+
+def student_lookup_key(entry):
+    """Classify a bulk assignment entry as a student id or a GitHub handle
+
+    GitHub handles are case-insensitive, so they are returned lowercased.
+
+    Returns:
+        tuple: ('id', int), ('handle', str) or (None, None) for unusable entries
+    """
+    if isinstance(entry, int) and not isinstance(entry, bool):
+        return 'id', entry
+    if isinstance(entry, str) and entry.strip().isdigit():
+        return 'id', int(entry.strip())
+    if isinstance(entry, str) and entry.strip():
+        return 'handle', entry.strip().lower()
+    return None, None
+
+
+def with_cohort_detail(cohorts):
+    """Load the coaches, courses and info serialized by CohortSerializer in bulk
+
+    The number of queries stays the same however many cohorts are listed.
+    """
+    return cohorts.select_related('info').prefetch_related(
+        Prefetch(
+            'members',
+            queryset=NssUserCohort.objects.filter(nss_user__user__is_staff=True).select_related('nss_user__user'),
+            to_attr='coach_memberships',
+        ),
+        Prefetch('courses', queryset=CohortCourse.objects.select_related('course')),
+    )
+
+
 class CohortPermission(permissions.BasePermission):
     """Cohort permissions"""
 
     def has_permission(self, request, view):
-        if view.action in ['create', 'update', 'destroy', 'assign', 'migrate', 'active']:
+        if view.action in ['create', 'update', 'destroy', 'assign', 'bulk_assign', 'migrate', 'active']:
             return request.auth.user.is_staff
         elif view.action in ['retrieve', 'list']:
             return True
@@ -97,12 +133,12 @@ class CohortViewSet(ViewSet):
             Response -- JSON serialized instance
         """
         try:
-            cohort = Cohort.objects.annotate(
+            cohort = with_cohort_detail(Cohort.objects.annotate(
                 students=Count(
                     'members',
                     filter=Q(members__nss_user__user__is_staff=False)
                 )
-            ).get(pk=pk)
+            )).get(pk=pk)
 
             serializer = CohortSerializer(cohort, context={'request': request})
             return Response(serializer.data)
@@ -170,13 +206,12 @@ class CohortViewSet(ViewSet):
                 cohorts = cohorts.filter(active=True)
 
             if search_terms is not None:
-                for letter in list(search_terms):
-                    cohorts = cohorts.filter(name__icontains=letter)
+                cohorts = search_cohorts(search_terms, cohorts)
 
                 serializer = MiniCohortSerializer(cohorts, many=True, context={'request': request})
                 return Response(serializer.data, status=status.HTTP_200_OK)
 
-            cohorts = cohorts\
+            cohorts = with_cohort_detail(cohorts)\
                 .annotate(
                     students=Count('members', filter=Q(members__nss_user__user__is_staff=False)),
                     is_instructor=Count('members', filter=Q(members__nss_user__user=request.auth.user))
@@ -209,6 +244,9 @@ class CohortViewSet(ViewSet):
         """Migrate all students in a cohort from client side to server side
 
         1. Assign all students in cohort to first book of chosen server-side course
+        2. Swap the active flags of the client side and server side courses
+
+        With ?dryRun=true nothing is changed and the planned changes are returned.
         """
 
         if request.method == "PUT":
@@ -252,33 +290,60 @@ class CohortViewSet(ViewSet):
                     'reason': 'Cohort does not exist'
                 }, status=status.HTTP_404_NOT_FOUND)
 
-            cohort_students = NssUser.objects.filter(
-                user__is_active=True,
-                user__is_staff=False,
-                assigned_cohorts__cohort=cohort
+            cohort_students = list(
+                NssUser.objects.filter(
+                    user__is_active=True,
+                    user__is_staff=False,
+                    assigned_cohorts__cohort=cohort
+                ).order_by('id').values_list('id', 'user__first_name', 'user__last_name').distinct()
+            )
+            student_ids = [student_id for student_id, _, _ in cohort_students]
+            already_assigned = set(
+                StudentProject.objects.filter(student_id__in=student_ids, project=first_project)
+                .values_list('student_id', flat=True)
             )
 
-            # Create record in student project
-            for student in cohort_students:
-                student_project = StudentProject()
-                student_project.student = student
-                student_project.project = first_project
-
-                try:
-                    student_project.save()
-                except IntegrityError:
-                    existing = StudentProject.objects.get(student=student, project=first_project)
-                    existing.delete()
-                    student_project.save()
-
-
-            # Deactivate client side course
-            client_side_course.active = False
-            client_side_course.save()
-
-            # Active server side course
-            server_side_course.active = True
-            server_side_course.save()
+            if request.query_params.get('dryRun', 'false').lower() == 'true':
+                return Response({
+                    'project': {'id': first_project.id, 'name': first_project.name},
+                    'deactivate_course': {'id': client_side_course.course.id, 'name': client_side_course.course.name},
+                    'activate_course': {'id': server_side_course.course.id, 'name': server_side_course.course.name},
+                    'students': [
+                        {
+                            'id': student_id,
+                            'name': f'{first_name} {last_name}',
+                            'change': 'reassigned' if student_id in already_assigned else 'assigned',
+                        }
+                        for student_id, first_name, last_name in cohort_students
+                    ],
+                }, status=status.HTTP_200_OK)
+
+            with transaction.atomic():
+                # Each deleted StudentProject would expire its student's rosters
+                # on its own, a few queries per student. Every student here is
+                # expired once below instead.
+                with defer_roster_expiry():
+                    # Students who already had the project get a fresh record so
+                    # it becomes their current (latest) project again
+                    if already_assigned:
+                        StudentProject.objects.filter(
+                            student_id__in=already_assigned, project=first_project
+                        ).delete()
+
+                    StudentProject.objects.bulk_create([
+                        StudentProject(student_id=student_id, project=first_project)
+                        for student_id in student_ids
+                    ])
+
+                expire_students(Q(nss_user_id__in=student_ids))
+
+                # Deactivate client side course
+                client_side_course.active = False
+                client_side_course.save()
+
+                # Active server side course
+                server_side_course.active = True
+                server_side_course.save()
 
             return Response(None, status=status.HTTP_204_NO_CONTENT)
 
@@ -524,6 +589,104 @@ class CohortViewSet(ViewSet):
             status=status.HTTP_405_METHOD_NOT_ALLOWED
         )
 
+    @log_action("bulk_assign_students_to_cohort")
+    @action(methods=['post', ], detail=True, url_path='assign/bulk')
+    def bulk_assign(self, request, pk):
+        """Assign many students to an existing cohort at once
+
+        The request body is {"students": [...]} where each entry is a student
+        id or GitHub handle. Every student is looked up in a single query and
+        the new memberships and first project assignments are inserted with
+        one statement each. The response reports the outcome of every entry.
+        """
+        req_logger = bind_request_context(logger, request)
+
+        entries = request.data.get("students", None)
+        if not isinstance(entries, list) or not entries:
+            return Response(
+                {'message': 'Provide a list of student ids or GitHub handles in `students`'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            cohort = Cohort.objects.get(pk=pk)
+        except Cohort.DoesNotExist as ex:
+            return Response({'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND)
+
+        keys = [student_lookup_key(entry) for entry in entries]
+        ids = {value for kind, value in keys if kind == 'id'}
+        handles = {value for kind, value in keys if kind == 'handle'}
+
+        students = list(
+            NssUser.objects.alias(github_handle_lower=Lower('github_handle'))
+            .filter(Q(id__in=ids) | Q(github_handle_lower__in=handles))
+            .select_related('user')
+        )
+        by_id = {student.id: student for student in students}
+        by_handle = {student.github_handle.lower(): student for student in students if student.github_handle}
+        existing = set(
+            NssUserCohort.objects.filter(cohort=cohort, nss_user__in=students)
+            .values_list('nss_user_id', flat=True)
+        )
+
+        results = []
+        new_members = []
+        for entry, (kind, value) in zip(entries, keys):
+            student = by_id.get(value) if kind == 'id' else by_handle.get(value)
+
+            if student is None:
+                results.append({'input': entry, 'status': 'not_found'})
+            elif student.user.is_staff:
+                results.append({'input': entry, 'student_id': student.id, 'status': 'is_instructor'})
+            elif student.id in existing:
+                results.append({'input': entry, 'student_id': student.id, 'status': 'already_assigned'})
+            else:
+                existing.add(student.id)
+                new_members.append(student)
+                results.append({'input': entry, 'student_id': student.id, 'status': 'assigned'})
+
+        first_project = Project.objects.filter(
+            index=0,
+            book__index=0,
+            book__course__cohorts__cohort=cohort,
+            book__course__cohorts__active=True
+        ).first()
+        if first_project is None:
+            req_logger.warning("first_project_not_found", cohort_id=cohort.id)
+
+        if new_members:
+            with transaction.atomic():
+                NssUserCohort.objects.bulk_create([
+                    NssUserCohort(cohort=cohort, nss_user=student)
+                    for student in new_members
+                ])
+                if first_project is not None:
+                    # A student returning to the cohort may already have the project
+                    StudentProject.objects.bulk_create([
+                        StudentProject(student=student, project=first_project)
+                        for student in new_members
+                    ], ignore_conflicts=True)
+
+                # bulk_create sends no signals, so expire the cached data here
+                new_ids = [student.id for student in new_members]
+                expire_students(Q(nss_user_id__in=new_ids))
+                expire_current_cohorts(Q(nss_user_id__in=new_ids))
+
+        req_logger.info(
+            "cohort_bulk_assignment_completed",
+            cohort_id=cohort.id,
+            requested=len(entries),
+            assigned=len(new_members),
+            project_id=first_project.id if first_project else None
+        )
+
+        return Response({
+            'cohort': cohort.id,
+            'project': first_project.id if first_project else None,
+            'assigned': len(new_members),
+            'results': results
+        }, status=status.HTTP_201_CREATED if new_members else status.HTTP_200_OK)
+
 class MiniCohortSerializer(serializers.ModelSerializer):
     """JSON serializer"""
 
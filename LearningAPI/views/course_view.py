@@ -1,5 +1,6 @@
+from django.db.models import Prefetch
 from django.utils.decorators import method_decorator
-from django.http import HttpResponseServerError
+from django.http import HttpResponse, HttpResponseServerError
 from django.conf import settings # Added for debug toolbar diagnosis
 
 import structlog
@@ -10,9 +11,12 @@ log = structlog.get_logger(__name__)
 
 from rest_framework import serializers, status
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
+from LearningAPI import cache
+from LearningAPI.conditional import conditional
 from LearningAPI.decorators import is_instructor
 from LearningAPI.models.coursework import (
     Course, Book, Project, CohortCourse,
@@ -20,6 +24,49 @@ from LearningAPI.models.coursework import (
 from LearningAPI.models.people import Assessment
 
 
+def with_course_tree(courses):
+    """Prefetch the books, active projects and assessments of courses
+
+    The whole tree is read with one query per level instead of one per book.
+    """
+    return courses.prefetch_related(
+        Prefetch('books', to_attr='ordered_books', queryset=Book.objects.order_by('index').prefetch_related(
+            Prefetch(
+                'child_projects',
+                queryset=Project.objects.filter(active=True).order_by('index'),
+                to_attr='active_projects',
+            ),
+            'assessments',
+        ))
+    )
+
+
+def rendered_course_tree(namespace, courses, many=False):
+    """Rendered JSON of courses with their trees, from the cache when unchanged
+
+    Args:
+        namespace (str): Cache namespace from Course.cache_namespace()
+        courses (QuerySet): The courses to render, evaluated only on a miss
+        many (bool): Render a list of courses instead of the first one
+
+    Returns:
+        bytes: The rendered JSON, or None when a single course does not exist
+    """
+    version = cache.get_version(namespace)
+    body = cache.get('course_tree', namespace, version)
+    if body is not None:
+        return body
+
+    courses = list(with_course_tree(courses))
+    if not many and not courses:
+        return None
+
+    data = CourseSerializer(courses, many=True).data if many else CourseSerializer(courses[0]).data
+    body = JSONRenderer().render(data)
+    cache.set(namespace, version, body)
+    return body
+
+
 class CourseViewSet(ViewSet):
     """Course view set"""
 
@@ -40,6 +87,7 @@ class CourseViewSet(ViewSet):
         except Exception as ex:
             return Response({"reason": ex.args[0]}, status=status.HTTP_400_BAD_REQUEST)
 
+    @method_decorator(conditional(Course, Book, Project, Assessment))
     def retrieve(self, request, pk=None):
         """Handle GET requests for single item
 
@@ -49,11 +97,12 @@ class CourseViewSet(ViewSet):
         try:
             course_views_total.labels(type='detail', course_id=pk).inc() # Increment custom metric for single course view
             log.info("Retrieving course", course_id=pk, user_id=request.user.id) # INFO level: Indicates a normal, expected operation.
-            course = Course.objects.get(pk=pk)
-            log.debug("Course found", course_name=course.name, user_id=request.user.id) # DEBUG level: Provides detailed information, useful for development/debugging.
+            body = rendered_course_tree(Course.cache_namespace(pk), Course.objects.filter(pk=pk))
+            if body is None:
+                raise Course.DoesNotExist()
+            log.debug("Course found", course_id=pk, user_id=request.user.id) # DEBUG level: Provides detailed information, useful for development/debugging.
 
-            serializer = CourseSerializer(course, context={'request': request})
-            return Response(serializer.data)
+            return HttpResponse(body, content_type='application/json')
         except Course.DoesNotExist:
             log.warning("Course not found", course_id=pk, user_id=request.user.id) # WARNING level: Unexpected but handled client-side error.
             return Response({"message": "Course not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -101,6 +150,7 @@ class CourseViewSet(ViewSet):
         except Exception as ex:
             return Response({'message': ex.args[0]}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @method_decorator(conditional(Course, Book, Project, Assessment, CohortCourse))
     def list(self, request):
         """Handle GET requests for all items
 
@@ -111,15 +161,22 @@ class CourseViewSet(ViewSet):
         active = request.query_params.get("active", None)
 
         try:
-            courses = Course.objects.filter(active=True)
+            course_views_total.labels(type='list', course_id='all').inc() # Increment custom metric for course list view
 
             if cohort is not None and active is not None:
-                active_cohort_course = CohortCourse.objects.get(cohort__id=cohort, active=bool(active))
-                courses = courses.filter(pk=active_cohort_course.course.id)
-
-            course_views_total.labels(type='list', course_id='all').inc() # Increment custom metric for course list view
-            serializer = CourseSerializer(courses, many=True, context={'request': request})
-            return Response(serializer.data, status=status.HTTP_200_OK)
+                active_cohort_course = CohortCourse.objects.select_related('course').get(cohort__id=cohort, active=bool(active))
+                course = active_cohort_course.course
+                if not course.active:
+                    return Response([], status=status.HTTP_200_OK)
+
+                # The cohort's course is served from its cached tree
+                body = rendered_course_tree(Course.cache_namespace(course.id), Course.objects.filter(pk=course.id))
+                return HttpResponse(b'[' + body + b']', content_type='application/json')
+
+            body = rendered_course_tree(
+                Course.cache_namespace(), Course.objects.filter(active=True).order_by('id'), many=True
+            )
+            return HttpResponse(body, content_type='application/json')
         except Exception as ex:
             return HttpResponseServerError(ex)
 
@@ -169,7 +226,9 @@ class BookSerializer(serializers.ModelSerializer):
     projects = serializers.SerializerMethodField()
 
     def get_projects(self, obj):
-        projects = Project.objects.filter(book=obj, active=True).order_by("index")
+        projects = getattr(obj, 'active_projects', None)
+        if projects is None:
+            projects = Project.objects.filter(book=obj, active=True).order_by("index")
         return ProjectSerializer(projects, many=True).data
 
     # projects = ProjectSerializer(many=True)
@@ -186,7 +245,9 @@ class CourseSerializer(serializers.ModelSerializer):
     books = serializers.SerializerMethodField()
 
     def get_books(self, obj):
-        books = Book.objects.filter(course=obj).order_by("index")
+        books = getattr(obj, 'ordered_books', None)
+        if books is None:
+            books = Book.objects.filter(course=obj).order_by("index")
         return BookSerializer(books, many=True).data
 
     class Meta:
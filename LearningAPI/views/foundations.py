@@ -1,71 +1,139 @@
 """Foundations Course tracking view set module"""
+import heapq
+import json
 from datetime import datetime, timedelta
-from django.utils.dateparse import parse_datetime
-from django.db import IntegrityError
-from django.http import HttpResponseServerError
+from itertools import chain, groupby
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.http import StreamingHttpResponse
 from rest_framework import serializers, status, permissions
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.decorators import action
 from rest_framework.viewsets import ViewSet
-from LearningAPI.models.coursework import FoundationsExercise, FoundationsLearnerProfile
+from LearningAPI import foundations_progress
+from LearningAPI.models.coursework import (
+    FoundationsExercise, FoundationsLearnerProfile, FoundationsLearnerSummary,
+)
+
+
+# Rows fetched per round trip when reading exercises through a server-side cursor
+STREAM_CHUNK_SIZE = 2000
+LEARNER_PAGE_MAX_SIZE = 500
+FOUNDATIONS_BATCH_MAX_SIZE = 1000
+
+_datetime_field = serializers.DateTimeField()
+
+
+def _as_datetime(value):
+    """Format a datetime the way FoundationsSerializer does"""
+    return _datetime_field.to_representation(value) if value is not None else None
+
+
+def stream_json_array(items):
+    """Encode items as a JSON array one element at a time
+
+    Args:
+        items (iterable): JSON serializable values, consumed lazily
+
+    Yields:
+        str: Pieces of the array
+    """
+    encoder = JSONEncoder()
+    yield '['
+    for index, item in enumerate(items):
+        yield (',' if index else '') + encoder.encode(item)
+    yield ']'
+
+
+def activity_since(last_attempt_param):
+    """Start of the activity window for the Foundations lists
+
+    Args:
+        last_attempt_param (str): The `lastAttempt` query parameter, if any
+
+    Returns:
+        date: The requested date, or 90 days ago when it is missing or invalid
+    """
+    if last_attempt_param is not None:
+        try:
+            return datetime.fromisoformat(last_attempt_param.replace('Z', '+00:00')).date()
+        except ValueError:
+            pass
+
+    return datetime.now().date() - timedelta(days=90)
+
+
+def with_profile_cohort(queryset):
+    """Annotate rows keyed by learner_github_id with their profile's cohort type and number"""
+    profile = FoundationsLearnerProfile.objects.filter(
+        learner_github_id=OuterRef('learner_github_id')
+    ).order_by('id')
+    return queryset.annotate(
+        cohort_type=Subquery(profile.values('cohort_type')[:1]),
+        cohort_number=Subquery(profile.values('cohort_number')[:1]),
+    )
+
+
+def pending_summaries(buffered, since, learner_name=None):
+    """Summaries of learners with progress in the write-behind buffer
+
+    Summarizes each learner's stored exercises with their pending updates
+    applied, reading the exercises and profiles in one query each.
+
+    Args:
+        buffered (dict): Pending updates from foundations_progress.pending()
+        since (date): Start of the activity window
+        learner_name (str): Only learners whose name contains this, ignoring case
+
+    Returns:
+        list: Unsaved FoundationsLearnerSummary instances annotated with their
+            profile's cohort type and number, ordered by learner
+    """
+    rows = FoundationsExercise.objects.filter(
+        learner_github_id__in=list(buffered)
+    ).order_by('learner_github_id', 'id').values(
+        'id', 'learner_github_id', 'slug', 'learner_name', 'attempts', 'complete', 'used_solution', 'last_attempt'
+    )
+    stored = {
+        learner_github_id: list(exercises)
+        for learner_github_id, exercises in groupby(rows, key=lambda row: row['learner_github_id'])
+    }
+    profiles = {}
+    for profile in FoundationsLearnerProfile.objects.filter(learner_github_id__in=list(buffered)).order_by('-id'):
+        profiles[profile.learner_github_id] = profile
+
+    summaries = []
+    for learner_github_id in sorted(buffered):
+        exercises = list(foundations_progress.overlay(
+            learner_github_id, stored.get(learner_github_id, []), buffered[learner_github_id]
+        ))
+        summary = FoundationsLearnerSummary.from_exercises(learner_github_id, exercises)
+        if summary.last_activity is None or summary.last_activity.date() < since:
+            continue
+        if learner_name is not None and learner_name.lower() not in summary.learner_name.lower():
+            continue
+
+        profile = profiles.get(learner_github_id)
+        summary.cohort_type = profile.cohort_type if profile else None
+        summary.cohort_number = profile.cohort_number if profile else None
+        summaries.append(summary)
+
+    return summaries
 
 
 class FoundationsPermission(permissions.BasePermission):
     """Foundations permissions"""
 
     def has_permission(self, request, view):
-        if view.action in ['list',]:
+        if view.action in ['list', 'summary']:
             return request.auth.user.is_staff
-        if view.action in ['update', 'exercises']:
+        if view.action in ['update', 'batch', 'exercises']:
             return True
 
         return False
 
-def create_entry(pk, exercise, request, user_id):
-    """Create or update a FoundationsExercise entry
-    Args:
-        exercise (FoundationsExercise): The FoundationsExercise instance to update or create
-        request (Request): The request object containing data for the exercise
-    """
-    exercise.cohort = "Unassigned"
-    exercise.slug = pk
-    exercise.attempts = request.data.get('attempts', 0)
-    exercise.learner_name = request.data.get('username', "")
-    exercise.complete = request.data.get('completed', False)
-    exercise.title = request.data.get('title', "Undefined")
-
-    # Parse ISO 8601 timestamp for completed_on
-    completed_at = request.data.get('completedAt', None)
-    if completed_at:
-        dt_object = parse_datetime(completed_at)
-        django_date_string = dt_object.strftime('%Y-%m-%d %H:%M:%S.%f%z')
-        exercise.completed_on = django_date_string
-    else:
-        exercise.completed_on = None
-
-    # Parse ISO 8601 timestamp for first_attempt
-    first_attempt = request.data.get('firstAttempt', None)
-    if first_attempt:
-        dt_object = parse_datetime(first_attempt)
-        django_date_string = dt_object.strftime('%Y-%m-%d %H:%M:%S.%f%z')
-        exercise.first_attempt = django_date_string
-    else:
-        exercise.first_attempt = None
-
-    # Parse ISO 8601 timestamp for last_attempt
-    last_attempt = request.data.get('lastAttempt', None)
-    if last_attempt:
-        dt_object = parse_datetime(last_attempt)
-        django_date_string = dt_object.strftime('%Y-%m-%d %H:%M:%S.%f%z')
-        exercise.last_attempt = django_date_string
-    else:
-        exercise.last_attempt = None
-
-    exercise.completed_code = request.data.get('completedCode', None)
-    exercise.used_solution = request.data.get('solutionShown', None)
-    exercise.learner_github_id = user_id
-    exercise.save()
-
 class FoundationsViewSet(ViewSet):
     """Foundations view set"""
 
@@ -74,102 +142,234 @@ class FoundationsViewSet(ViewSet):
     def update(self, request, pk=None):
         """Handle PUT requests
 
+        The update is coalesced with the learner's other recent updates of the
+        exercise in the write-behind buffer, and written to the database by
+        flush_foundations_progress or as soon as the exercise is completed.
+        A completed exercise is written directly when its learner's buffer
+        cannot be flushed in time.
+
         Returns:
             Response -- Empty body with 204 status code
         """
         user_id = request.data.get('userId', None)
-        if user_id is not None:
-            try:
-                existing_profile = FoundationsLearnerProfile.objects.get(learner_github_id=user_id)
-            except FoundationsLearnerProfile.DoesNotExist:
-                # If the learner profile does not exist, create it
-                existing_profile = FoundationsLearnerProfile()
-                existing_profile.learner_github_id = user_id
-                existing_profile.learner_name = request.data.get('username', "")
-                existing_profile.save()
-
-            try:
-                exercise = FoundationsExercise.objects.get(slug=pk, learner_github_id=user_id)
-            except FoundationsExercise.DoesNotExist:
-                # If the foundations exercise entry does not exist, create it
-                exercise = FoundationsExercise()
-            except IntegrityError:
-                return Response(None, status=status.HTTP_404_NOT_FOUND)
-            except Exception as ex:
-                return HttpResponseServerError(ex)
-
-            create_entry(pk, exercise, request, user_id)
-            return Response(None, status=status.HTTP_204_NO_CONTENT)
-        else:
+        if user_id is None:
             return Response({'message': 'You must provide a \'userId\' in the request body'}, status=status.HTTP_400_BAD_REQUEST)
 
+        update = {**request.data, 'slug': pk}
+        try:
+            exercise = foundations_progress.build_exercise(update)
+        except ValueError as ex:
+            return Response({'message': str(ex)}, status=status.HTTP_400_BAD_REQUEST)
+
+        merged = foundations_progress.buffer_update(update) if settings.FOUNDATIONS_WRITE_BEHIND else None
+        if merged is None:
+            foundations_progress.upsert_exercises([exercise])
+        elif merged.get('completed'):
+            flushed = foundations_progress.flush(
+                str(user_id), pk, wait=foundations_progress.COMPLETION_LOCK_WAIT_SECONDS
+            )
+            if flushed is None:
+                foundations_progress.upsert_exercises([foundations_progress.build_exercise(merged)])
+
+        return Response(None, status=status.HTTP_204_NO_CONTENT)
 
     def list(self, request):
         """Handle GET requests to get all foundations exercises
 
+        Query parameters:
+            limit -- Return a page of this many learners as {next, results}
+            after -- Start the page after this learner_github_id (from `next`)
+            stream -- When `true`, write the JSON as the rows are read
+
         Returns:
             Response -- JSON serialized list of foundations exercises
         """
         # Get query parameters
         learner_name = request.query_params.get('learnerName', None)
         last_attempt_param = request.query_params.get('lastAttempt', None)
+        after = request.query_params.get('after', None)
+        stream = request.query_params.get('stream', 'false').lower() == 'true'
+
+        limit = request.query_params.get('limit', None)
+        if limit is not None:
+            try:
+                limit = min(max(int(limit), 1), LEARNER_PAGE_MAX_SIZE)
+            except ValueError:
+                return Response({'message': '`limit` must be a number'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Get all exercises ordered by learner_github_id, and grouped by learner_name
-        exercises = FoundationsExercise.objects.all().order_by('learner_github_id')
+        exercises = FoundationsExercise.objects.all()
 
         # Filter by learner_name if provided
         if learner_name is not None:
             exercises = exercises.filter(learner_name__icontains=learner_name)
 
         # Filter by last_attempt
-        if last_attempt_param is not None:
-            # If lastAttempt parameter is provided, use it
+        since = activity_since(last_attempt_param)
+        exercises = exercises.filter(last_attempt__gte=since)
+
+        # Learners whose only progress in the window is still in the
+        # write-behind buffer are listed from the buffer
+        buffered = foundations_progress.pending() if settings.FOUNDATIONS_WRITE_BEHIND else {}
+        buffer_only = foundations_progress.active_learners(buffered, since, learner_name)
+        if buffer_only:
+            stored = set(
+                exercises.filter(learner_github_id__in=buffer_only)
+                .values_list('learner_github_id', flat=True).distinct()
+            )
+            buffer_only = [learner_github_id for learner_github_id in buffer_only if learner_github_id not in stored]
+
+        # Cursor pagination by learner: the page is the next `limit` learners
+        # in the window after the cursor
+        next_url = None
+        if limit is not None:
+            learner_ids = exercises.order_by('learner_github_id').values_list('learner_github_id', flat=True).distinct()
+            if after is not None:
+                learner_ids = learner_ids.filter(learner_github_id__gt=after)
+                buffer_only = [learner_github_id for learner_github_id in buffer_only if learner_github_id > after]
+
+            page_ids = sorted(set(learner_ids[:limit + 1]) | set(buffer_only))[:limit + 1]
+            if len(page_ids) > limit:
+                page_ids = page_ids[:limit]
+                next_url = replace_query_param(request.build_absolute_uri(), 'after', page_ids[-1])
+            exercises = exercises.filter(learner_github_id__in=page_ids)
+            buffer_only = [learner_github_id for learner_github_id in buffer_only if learner_github_id in page_ids]
+
+        profiles = {}
+        if buffer_only:
+            for profile in FoundationsLearnerProfile.objects.filter(learner_github_id__in=buffer_only).order_by('-id'):
+                profiles[profile.learner_github_id] = profile
+
+        # One query for every exercise in the window, with the learner's
+        # profile joined in and rows grouped by learner
+        rows = with_profile_cohort(exercises).order_by('learner_github_id', 'id').values(*FoundationsSerializer.Meta.fields, 'cohort_type', 'cohort_number')
+        learners = UniqueLearnerSerializer.iter_learners(
+            rows.iterator(chunk_size=STREAM_CHUNK_SIZE), buffered,
+            {learner_github_id: profiles.get(learner_github_id) for learner_github_id in buffer_only}
+        )
+
+        if stream:
+            content = stream_json_array(learners)
+            if limit is not None:
+                content = chain(['{"next": ', json.dumps(next_url), ', "results": '], content, ['}'])
+            return StreamingHttpResponse(content, content_type='application/json')
+
+        if limit is not None:
+            return Response({'next': next_url, 'results': list(learners)})
+
+        return Response(list(learners))
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Handle GET requests for each learner's Foundations totals
+
+        Reads the summary table maintained on every exercise upsert instead
+        of every exercise row. Learners with progress still in the
+        write-behind buffer are summarized from their exercises instead. A
+        learner's exercises are loaded on demand with
+        GET /foundations/<learner_github_id>/exercises.
+
+        Query parameters:
+            learnerName, lastAttempt -- Filter as for the full list
+            limit, after -- Cursor pagination by learner, as for the full list
+
+        Returns:
+            Response -- JSON serialized list of learner summaries
+        """
+        learner_name = request.query_params.get('learnerName', None)
+        after = request.query_params.get('after', None)
+        limit = request.query_params.get('limit', None)
+        if limit is not None:
             try:
-                last_attempt_date = datetime.fromisoformat(last_attempt_param.replace('Z', '+00:00')).date()
-                exercises = exercises.filter(last_attempt__gte=last_attempt_date)
+                limit = min(max(int(limit), 1), LEARNER_PAGE_MAX_SIZE)
             except ValueError:
-                # If invalid date format, use default (current date - 90 days)
-                ninety_days_ago = datetime.now().date() - timedelta(days=90)
-                exercises = exercises.filter(last_attempt__gte=ninety_days_ago)
-        else:
-            # Default to current date minus 90 days
-            ninety_days_ago = datetime.now().date() - timedelta(days=90)
-            exercises = exercises.filter(last_attempt__gte=ninety_days_ago)
-
-        # Create hashmap to store unique learners. Github ID is the key and a list of exercises is the value
-        # This will help in filtering out duplicate learners
-        unique_learners = {}
-        for exercise in exercises:
-            if exercise.learner_github_id not in unique_learners:
-                unique_learners[exercise.learner_github_id] = {
-                    'learner_name': exercise.learner_name,
-                    'exercises': []
-                }
-            unique_learners[exercise.learner_github_id]['exercises'].append(exercise)
-            try:
-                profile = FoundationsLearnerProfile.objects.get(learner_github_id=exercise.learner_github_id)
-            except FoundationsLearnerProfile.DoesNotExist:
-                profile = None
-
-            assigned_cohort = f'{profile.cohort_type} {profile.cohort_number}' if profile else 'Unassigned'
-            unique_learners[exercise.learner_github_id]['cohort'] = assigned_cohort
+                return Response({'message': '`limit` must be a number'}, status=status.HTTP_400_BAD_REQUEST)
 
+        since = activity_since(request.query_params.get('lastAttempt', None))
+        summaries = FoundationsLearnerSummary.objects.filter(last_activity__gte=since)
+        if learner_name is not None:
+            summaries = summaries.filter(learner_name__icontains=learner_name)
+        summaries = with_profile_cohort(summaries).order_by('learner_github_id')
+
+        buffered = foundations_progress.pending() if settings.FOUNDATIONS_WRITE_BEHIND else {}
+        recalculated = pending_summaries(buffered, since, learner_name) if buffered else []
+        if buffered:
+            summaries = summaries.exclude(learner_github_id__in=list(buffered))
+
+        if limit is None:
+            if recalculated:
+                summaries = heapq.merge(summaries, recalculated, key=lambda summary: summary.learner_github_id)
+            return Response(FoundationsSummarySerializer(summaries, many=True).data)
+
+        if after is not None:
+            summaries = summaries.filter(learner_github_id__gt=after)
+            recalculated = [summary for summary in recalculated if summary.learner_github_id > after]
+        page = list(heapq.merge(
+            summaries[:limit + 1], recalculated, key=lambda summary: summary.learner_github_id
+        ))[:limit + 1]
+        next_url = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_url = replace_query_param(request.build_absolute_uri(), 'after', page[-1].learner_github_id)
+
+        return Response({'next': next_url, 'results': FoundationsSummarySerializer(page, many=True).data})
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Handle POST requests with many exercise updates at once
+
+        The body is a list of updates, each shaped like a PUT /foundations/<slug>
+        body with the exercise `slug` added. Updates may be for any number of
+        learners.
 
-        # Serialize the unique learners with UniqueLearnerSerializer
-        unique_learners_list = []
-        for learner_id, learner_data in unique_learners.items():
-            unique_learners_list.append(UniqueLearnerSerializer(data=learner_data).create(learner_data))
+        Returns:
+            Response -- JSON with the number of exercises stored, or 400 with
+            the position and reason of every invalid update
+        """
+        updates = request.data
+        if not isinstance(updates, list) or not updates:
+            return Response({'message': 'The body must be a list of exercise updates'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(updates) > FOUNDATIONS_BATCH_MAX_SIZE:
+            return Response(
+                {'message': f'A batch can hold at most {FOUNDATIONS_BATCH_MAX_SIZE} updates'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        exercises = []
+        errors = []
+        for index, update in enumerate(updates):
+            try:
+                if not isinstance(update, dict):
+                    raise ValueError("Each update must be an object")
+                exercises.append(foundations_progress.build_exercise(update))
+            except ValueError as ex:
+                errors.append({'index': index, 'message': str(ex)})
 
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(unique_learners_list)
+        stored = foundations_progress.upsert_exercises(exercises)
+        return Response({'stored': stored}, status=status.HTTP_200_OK)
 
     # Custom action to update the cohort type and number for a specific learner
     @action(detail=True, methods=['get'])
     def exercises(self, request, pk=None):
         # Get all exercises for a specific learner
         if pk is not None:
-            exercises = FoundationsExercise.objects.filter(learner_github_id=pk).order_by('pk')
-            serializer = LearnerProgressSerializer(exercises, many=True)
+            rows = FoundationsExercise.objects.filter(
+                learner_github_id=pk
+            ).order_by('pk').values(*LearnerProgressSerializer.Meta.fields)
+
+            # Include progress still waiting in the write-behind buffer
+            updates = foundations_progress.pending([pk]).get(pk, {}) if settings.FOUNDATIONS_WRITE_BEHIND else {}
+            exercises = foundations_progress.overlay(pk, rows.iterator(chunk_size=STREAM_CHUNK_SIZE), updates)
+
+            if request.query_params.get('stream', 'false').lower() == 'true':
+                return StreamingHttpResponse(
+                    stream_json_array(LearnerProgressSerializer(exercise).data for exercise in exercises),
+                    content_type='application/json'
+                )
+
+            serializer = LearnerProgressSerializer(list(exercises), many=True)
             return Response(serializer.data)
         else:
             return Response({'message': 'You must provide a \'userId\' in the query parameters'}, status=status.HTTP_400_BAD_REQUEST)
@@ -208,6 +408,21 @@ class LearnerProgressSerializer(serializers.ModelSerializer):
                   'complete', 'completed_on', 'first_attempt',
                   'last_attempt', 'used_solution', 'completed_code')
 
+class FoundationsSummarySerializer(serializers.ModelSerializer):
+    """JSON serializer for Foundations learner summaries annotated with their cohort"""
+    cohort = serializers.SerializerMethodField()
+
+    def get_cohort(self, obj):
+        if obj.cohort_type is None:
+            return 'Unassigned'
+        return f'{obj.cohort_type} {obj.cohort_number}'
+
+    class Meta:
+        model = FoundationsLearnerSummary
+        fields = ('learner_github_id', 'learner_name', 'cohort',
+                  'exercises_started', 'exercises_completed', 'total_attempts',
+                  'solutions_shown', 'last_activity')
+
 class FoundationsSerializer(serializers.ModelSerializer):
     """JSON serializer for Foundations exercises"""
 
@@ -235,3 +450,64 @@ class UniqueLearnerSerializer(serializers.Serializer):
             'exercises': exercises.data,
             'learner_github_id': exercises.data[0].get('learner_github_id'),
         }
+
+    @staticmethod
+    def iter_learners(rows, buffered=None, buffered_only=None):
+        """Represent exercise rows grouped by learner without serializer instances
+
+        Produces the payload that create() builds for each learner, from rows
+        of FoundationsSerializer fields plus the learner's profile cohort type
+        and number, ordered by learner.
+
+        Args:
+            rows (iterable): Exercise dictionaries ordered by learner_github_id
+            buffered (dict): Pending updates from foundations_progress.pending()
+                to apply to the learners' exercises
+            buffered_only (dict): Profiles, or None, of learners without rows
+                whose exercises are all in `buffered`, keyed by learner
+
+        Yields:
+            dict: One learner, in learner order
+        """
+        buffered_only = buffered_only or {}
+        if buffered_only:
+            pending_rows = (
+                {
+                    **exercise,
+                    'cohort_type': profile.cohort_type if profile else None,
+                    'cohort_number': profile.cohort_number if profile else None,
+                }
+                for learner_github_id, profile in sorted(buffered_only.items())
+                for exercise in foundations_progress.overlay(learner_github_id, [], buffered[learner_github_id])
+            )
+            rows = heapq.merge(rows, pending_rows, key=lambda row: row['learner_github_id'])
+
+        for learner_github_id, exercises in groupby(rows, key=lambda row: row['learner_github_id']):
+            exercises = list(exercises)
+            first = exercises[0]
+            if buffered and learner_github_id in buffered and learner_github_id not in buffered_only:
+                exercises = list(foundations_progress.overlay(learner_github_id, exercises, buffered[learner_github_id]))
+            yield {
+                'learner_name': first['learner_name'],
+                'cohort': (
+                    f"{first['cohort_type']} {first['cohort_number']}"
+                    if first['cohort_type'] is not None else 'Unassigned'
+                ),
+                'exercises': [
+                    {
+                        'id': exercise['id'],
+                        'learner_github_id': exercise['learner_github_id'],
+                        'title': exercise['title'],
+                        'slug': exercise['slug'],
+                        'attempts': exercise['attempts'],
+                        'learner_name': exercise['learner_name'],
+                        'complete': exercise['complete'],
+                        'completed_on': _as_datetime(exercise['completed_on']),
+                        'first_attempt': _as_datetime(exercise['first_attempt']),
+                        'last_attempt': _as_datetime(exercise['last_attempt']),
+                        'used_solution': exercise['used_solution'],
+                    }
+                    for exercise in exercises
+                ],
+                'learner_github_id': learner_github_id,
+            }
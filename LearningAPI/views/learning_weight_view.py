@@ -1,10 +1,12 @@
 from django.http.response import HttpResponseServerError
+from django.utils.decorators import method_decorator
 from rest_framework import serializers, status
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.response import Response
-from LearningAPI.models.skill import LearningWeight
+from LearningAPI.conditional import conditional
+from LearningAPI.models.skill import LearningRecord, LearningWeight
 
 
 class LearningWeightSerializer(serializers.ModelSerializer):
@@ -28,6 +30,11 @@ class LearningWeightViewSet(ModelViewSet):
     permission_classes = [IsAdminUser]
     pagination_class = LargeResultsSetPagination
 
+    @method_decorator(conditional(LearningWeight))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @method_decorator(conditional(LearningWeight, LearningRecord))
     def list(self, request):
         """Handle GET requests for all items
 
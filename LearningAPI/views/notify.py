@@ -31,12 +31,12 @@ def notify(request):
         # Get the cohort's instrutor Slack channel
         target_user = NssUser.objects.get(user=request.auth.user)
         slack_channel = target_user.assigned_cohorts.order_by("-id").first().cohort.slack_channel
-        SlackAPI().send_message( text=message, channel=slack_channel )
+        SlackAPI().queue_message( text=message, channel=slack_channel )
         return Response({ 'message': 'Notification sent to instructor channel'}, status=200)
 
     elif student_channel is not None:
         slack_channel = target_user.assigned_cohorts.order_by("-id").first().cohort.slack_channel
-        SlackAPI().send_message( text=message, channel=student_channel )
+        SlackAPI().queue_message( text=message, channel=student_channel )
         return Response({ 'message': 'Notification sent to student'}, status=200)
 
     return Response({ 'message': 'Invalid request'}, status=400)
@@ -7,7 +7,7 @@ from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from allauth.socialaccount.models import SocialAccount
 
-from LearningAPI.utils import GithubRequest
+from LearningAPI.utils import GithubRateLimited, GithubRequest
 from LearningAPI.models.people import Cohort, NssUserCohort, NssUser
 from LearningAPI.models.coursework import StudentProject, Project
 from LearningAPI.utils import get_logger, bind_request_context, log_action
@@ -99,9 +99,9 @@ class Profile(ViewSet):
                 student_org_name = cohort_assignment.info.student_organization_url.split("/")[-1]
                 request_url = f'https://api.github.com/orgs/{student_org_name}/memberships/{person.extra_data["login"]}'
                 data = {"role": "member"}
-                response = gh_request.put(request_url, data)
+                response = gh_request.put(request_url, data, defer=True)
 
-                if response.status_code != 200:
+                if response is not None and response.status_code != 200:
                     req_logger.error("Failed to add user to cohort Github organization", user=nss_user.user.username, status=response.status_code)
                     return Response(
                         {"error": "Failed to add user to cohort Github organization."},
@@ -138,8 +138,12 @@ class Profile(ViewSet):
                 gh_request = GithubRequest()
                 student_org_name = student_cohort.cohort.info.student_organization_url.split("/")[-1]
                 request_url = f'https://api.github.com/orgs/{student_org_name}/memberships/{person.extra_data["login"]}'
-                response = gh_request.get(request_url).json()
-                github_org_membership_status = response.get("state", None)
+                try:
+                    response = gh_request.get(request_url).json()
+                    github_org_membership_status = response.get("state", None)
+                except GithubRateLimited:
+                    req_logger.warning("Github organization membership check skipped, rate limited", user=nss_user.user.username)
+                    github_org_membership_status = None
 
                 if github_org_membership_status == "active":
                     student_cohort.is_github_org_member = True
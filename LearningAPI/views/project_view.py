@@ -1,8 +1,10 @@
 from django.http import HttpResponseServerError
+from django.utils.decorators import method_decorator
 from rest_framework import serializers, status
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
+from LearningAPI.conditional import conditional
 from LearningAPI.models.coursework import Book, Project, Course
 
 
@@ -34,6 +36,7 @@ class ProjectViewSet(ViewSet):
         except Exception as ex:
             return Response({"reason": ex.args[0]}, status=status.HTTP_400_BAD_REQUEST)
 
+    @method_decorator(conditional(Project, Book, Course))
     def retrieve(self, request, pk=None):
         """Handle GET requests for single item
 
@@ -91,6 +94,7 @@ class ProjectViewSet(ViewSet):
         except Exception as ex:
             return Response({'message': ex.args[0]}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @method_decorator(conditional(Project, Book, Course))
     def list(self, request):
         """Handle GET requests for all items
 
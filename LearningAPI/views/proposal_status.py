@@ -1,5 +1,7 @@
+from django.utils.decorators import method_decorator
 from rest_framework import serializers, permissions
 from rest_framework.viewsets import ModelViewSet
+from LearningAPI.conditional import conditional
 from LearningAPI.models.coursework import ProposalStatus
 
 
@@ -26,3 +28,11 @@ class ProposalStatusView(ModelViewSet):
     queryset = ProposalStatus.objects.all()
     serializer_class = ProposalStatusSerializer
     permission_classes = [ProposalStatusPermission]
+
+    @method_decorator(conditional(ProposalStatus))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @method_decorator(conditional(ProposalStatus))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
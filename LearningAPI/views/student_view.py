@@ -1,26 +1,27 @@
 """Student view module"""
-import os
-import json
 import logging
-import requests
 from django.contrib.auth.models import User
-from django.db import connection
-from django.db import IntegrityError
-from django.http import HttpResponseServerError
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.http import HttpResponse, HttpResponseServerError
 from django.utils.decorators import method_decorator
 from rest_framework import serializers, status
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
-from LearningAPI.utils import GithubRequest, SlackAPI
+from LearningAPI import cache
+from LearningAPI.purge import purge_students
+from LearningAPI.search import ranked, search_students
+from LearningAPI.utils import GithubRateLimited, GithubRequest, SlackAPI
 from LearningAPI.decorators import is_instructor
 from LearningAPI.models import Tag
-from LearningAPI.models.coursework import StudentProject, Project, Capstone, CapstoneTimeline
+from LearningAPI.models.coursework import StudentProject, Project
 from LearningAPI.models.people import (StudentNote, NssUser, StudentAssessment,
                                        OneOnOneNote, StudentPersonality, Assessment,
-                                       StudentAssessmentStatus, StudentTag)
+                                       StudentAssessmentStatus, StudentTag, CohortRoster)
 from LearningAPI.models.skill import (CoreSkillRecord, LearningRecord,
                                       LearningRecordEntry)
 from .personality import myers_briggs_persona
@@ -51,11 +52,13 @@ class StudentViewSet(ModelViewSet):
         logger = logging.getLogger("LearningPlatform")
 
         try:
+            students = StudentSerializer.eager_queryset()
+
             try:
-                student = NssUser.objects.get(pk=pk)
+                student = students.get(pk=pk)
 
             except ValueError:
-                student = NssUser.objects.get(slack_handle=pk)
+                student = students.get(slack_handle=pk)
 
             if request.auth.user == student.user or request.auth.user.is_staff:
                 serializer = StudentSerializer(student, context={'request': request})
@@ -113,43 +116,11 @@ class StudentViewSet(ModelViewSet):
             soft_delete = request.query_params.get('soft', None)
 
             student = NssUser.objects.get(pk=pk)
-            django_user = User.objects.get(pk=student.user.id)
-
-            # Delete all personality records
-            StudentPersonality.objects.filter(student=student).delete()
-
-            # Delete all student assessments
-            StudentAssessment.objects.filter(student=student).delete()
-
-            # Delete all student projects
-            StudentProject.objects.filter(student=student).delete()
-
-            # Delete all student tags
-            StudentTag.objects.filter(student=student).delete()
-
-            # Delete all learning records
-            LearningRecordEntry.objects.filter(record__student=student).delete()
-            LearningRecord.objects.filter(student=student).delete()
-
-            # Delete all core skill records
-            CoreSkillRecord.objects.filter(student=student).delete()
-
-            # Delete all CapstoneTimeline related to student
-            CapstoneTimeline.objects.filter(capstone__student=student).delete()
 
-            # Delete all capstones
-            Capstone.objects.filter(student=student).delete()
-
-            # Delete student cohorts
-            student.assigned_cohorts.all().delete()
-
-            if soft_delete is None:
-                # Delete all student notes
-                StudentNote.objects.filter(student=student).delete()
-
-                # Delete the student
-                student.delete()
-                django_user.delete()
+            counts = purge_students([student.id], soft=soft_delete is not None)
+            logging.getLogger("LearningPlatform").info(
+                "Purged student %s: %s", student.id, counts
+            )
 
             return Response(None, status=status.HTTP_204_NO_CONTENT)
 
@@ -171,7 +142,10 @@ class StudentViewSet(ModelViewSet):
         if lastname is not None:
             # Get students by last name and are not assigned to a cohort
 
-            students = NssUser.objects.filter(user__last_name__icontains=lastname, assigned_cohorts=None)
+            students = ranked(
+                NssUser.objects.filter(assigned_cohorts=None).select_related('user'),
+                ('user__last_name',), lastname
+            )
             return Response([{ 'name': student.full_name, 'id': student.id} for student in students], status=status.HTTP_200_OK)
 
         if cohort is None:
@@ -180,60 +154,27 @@ class StudentViewSet(ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         else:
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT
-                        user_id AS id,
-                        github_handle,
-                        extra_data,
-                        student_name AS name,
-                        current_cohort AS cohort_name,
-                        current_cohort_id AS cohort_id,
-                        assessment_status_id,
-                        assessment_url,
-                        current_project_id AS project_id,
-                        current_project_index AS project_index,
-                        current_project_name AS project_name,
-                        current_book_id AS book_id,
-                        current_book_index AS book_index,
-                        current_book_name AS book_name,
-                        score,
-                        student_notes,
-                        student_tags,
-                        capstone_proposals,
-                        project_duration
-                    FROM
-                        get_cohort_student_data(%s)
-                """, [cohort])
-                columns = [col[0] for col in cursor.description]
-                results = cursor.fetchall()
-
-                logger = logging.getLogger("LearningPlatform")
-                logger.debug("Number of student records retrieved for cohort %s is %s", cohort, len(results))
-
-                students = []
-                for row in results:
-                    student = dict(zip(columns, row))
-                    student['current_cohort'] = {
-                        'id': student['cohort_id'],
-                        'name': student['cohort_name']
-                    }
-                    student['tags'] = json.loads(student['student_tags'])
-                    student['avatar'] = json.loads(student['extra_data'])["avatar_url"]
-                    student['notes'] = json.loads(student['student_notes'])
-                    student['proposals'] = json.loads(student['capstone_proposals'])
-                    students.append(student)
-
-                serializer = CohortStudentSerializer(data=students, many=True)
-
-                if serializer.is_valid():
-                    logger.debug("Serializer for students by cohort succeeded")
-                    return Response(serializer.data, status=status.HTTP_200_OK)
-                else:
-                    logger.debug("Serializer for students by cohort failed")
-                    logger.debug(serializer.errors)
-                    return Response(serializer.data, status=status.HTTP_200_OK)
-                    # return Response({'message': serializer.error_messages}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            logger = logging.getLogger("LearningPlatform")
+
+            try:
+                cohort = int(cohort)
+            except ValueError:
+                return Response({'message': '`cohort` must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Serve the rendered list from the cache when nothing in the cohort has changed
+            namespace = CohortRoster.cache_namespace(cohort)
+            version = cache.get_version(namespace)
+            cached_students = cache.get('cohort_students', namespace, version)
+            if cached_students is not None:
+                return HttpResponse(cached_students, content_type='application/json')
+
+            roster = CohortRoster.for_cohort(cohort)
+            logger.debug("Number of student records retrieved for cohort %s is %s", cohort, len(roster))
+
+            students = CohortStudentSerializer.represent_roster(roster)
+
+            cache.set(namespace, version, JSONRenderer().render(students))
+            return Response(students, status=status.HTTP_200_OK)
 
     @action(methods=['post', 'put'], detail=True)
     def assess(self, request, pk):
@@ -253,18 +194,18 @@ class StudentViewSet(ModelViewSet):
 
                 try:
                     if latest_assessment.status.status == 'Ready for Review':
-                        slack.send_message(
+                        slack.queue_message(
                             text="🎉 Congratulations! You've completed your self-assessment. Your coaching team will review your work and provide feedback soon.",
                             channel=student.slack_handle
                         )
 
-                        slack.send_message(
+                        slack.queue_message(
                             text=f'{student.full_name} in {student.current_cohort["name"]} has completed their self-assessment for {latest_assessment.assessment.name}.\n\nReview it at {latest_assessment.url}',
                             channel=student.current_cohort["ic"]
                         )
 
                     if latest_assessment.status.status == 'Reviewed and Complete':
-                        slack.send_message(
+                        slack.queue_message(
                             text=f':fox-yay-woo-hoo: Self-Assessment Review Complete\n\n\n:white_check_mark: Your coaching team just marked {latest_assessment.assessment.name} as completed.\n\nVisit https://learning.nss.team to view your latest messages and statuses.',
                             channel=latest_assessment.student.slack_handle
                         )
@@ -314,74 +255,81 @@ class StudentViewSet(ModelViewSet):
                 except StudentAssessment.DoesNotExist:
                     pass
 
-                # Create the student assessment record
-                student_assessment = StudentAssessment()
-                student_assessment.student = student
-                student_assessment.instructor = NssUser.objects.get(user=request.auth.user)
-                student_assessment.status = StudentAssessmentStatus.objects.get(status="In Progress")
-                student_assessment.assessment = assessment
-                student_assessment.save()
-
-                gh_request = GithubRequest()
-                full_url = assessment.source_url
-
-                # Split the full URL on '/' and get the last two items
-                ( org, repo, ) = full_url.split('/')[-2:]
-
-                # Construct request body for creating the repository
-                student_org_name = student.current_cohort["github_org"].split("/")[-1]
-
-                # Replace all spaces in the assessment name with hyphens
-                hyphenated_assessment_name = assessment.name.replace(" ", "-")
-                repo_name = f"{hyphenated_assessment_name}-{student.github_handle}"
-
-                request_body = {
-                    "owner": student_org_name,
-                    "name": repo_name,
-                    "description": f"This is your self-assessment repository for the {assessment.book.name} book",
-                    "include_all_branches": False,
-                    "private": False
-                }
+                # Roll the assessment back if GitHub is rate limited, so the
+                # client can retry the request once the limit resets
+                with transaction.atomic():
+                    # Create the student assessment record
+                    student_assessment = StudentAssessment()
+                    student_assessment.student = student
+                    student_assessment.instructor = NssUser.objects.get(user=request.auth.user)
+                    student_assessment.status = StudentAssessmentStatus.objects.get(status="In Progress")
+                    student_assessment.assessment = assessment
+                    student_assessment.save()
+
+                    gh_request = GithubRequest()
+                    full_url = assessment.source_url
+
+                    # Split the full URL on '/' and get the last two items
+                    ( org, repo, ) = full_url.split('/')[-2:]
+
+                    # Construct request body for creating the repository
+                    student_org_name = student.current_cohort["github_org"].split("/")[-1]
+
+                    # Replace all spaces in the assessment name with hyphens
+                    hyphenated_assessment_name = assessment.name.replace(" ", "-")
+                    repo_name = f"{hyphenated_assessment_name}-{student.github_handle}"
+
+                    request_body = {
+                        "owner": student_org_name,
+                        "name": repo_name,
+                        "description": f"This is your self-assessment repository for the {assessment.book.name} book",
+                        "include_all_branches": False,
+                        "private": False
+                    }
 
-                # Create the repository
-                logger.debug("Generating repository for student assessment")
-                response = gh_request.post(url=f'https://api.github.com/repos/{org}/{repo}/generate',data=request_body)
-                logger.debug(response.json())
-
-                # Assign the student write permissions to the repository
-                logger.debug("Adding student as a collaborator to the repository")
-                request_body = { "permission":"write" }
-                response = gh_request.put(
-                    url=f'https://api.github.com/repos/{student_org_name}/{repo_name}/collaborators/{student.github_handle}',
-                    data=request_body
-                )
+                    # Create the repository
+                    logger.debug("Generating repository for student assessment")
+                    response = gh_request.post(url=f'https://api.github.com/repos/{org}/{repo}/generate',data=request_body)
+                    logger.debug(response.json())
+
+                    # Assign the student write permissions to the repository
+                    logger.debug("Adding student as a collaborator to the repository")
+                    request_body = { "permission":"write" }
+                    response = gh_request.put(
+                        url=f'https://api.github.com/repos/{student_org_name}/{repo_name}/collaborators/{student.github_handle}',
+                        data=request_body,
+                        defer=True
+                    )
 
-                if response.status_code != 204:
-                    logger.debug("Error: Student was not added as a collaborator to the assessment repository")
-                    return Response(
-                        {
-                            'message': 'Error: Student was not added as a collaborator to the assessment repository.'
-                        },
-                        status=status.HTTP_502_BAD_GATEWAY
+                    if response is not None and response.status_code != 204:
+                        logger.debug("Error: Student was not added as a collaborator to the assessment repository")
+                        return Response(
+                            {
+                                'message': 'Error: Student was not added as a collaborator to the assessment repository.'
+                            },
+                            status=status.HTTP_502_BAD_GATEWAY
+                        )
+
+                    # Send message to student
+                    created_repo_url = f'https://github.com/{student_org_name}/{repo_name}'
+                    slack.queue_message(
+                        text=f"🐙 Your self-assessment repository has been created. Visit the URL below and clone the project to your machine.\n\n{created_repo_url}",
+                        channel=student.slack_handle
                     )
 
-                # Send message to student
-                created_repo_url = f'https://github.com/{student_org_name}/{repo_name}'
-                slack.send_message(
-                    text=f"🐙 Your self-assessment repository has been created. Visit the URL below and clone the project to your machine.\n\n{created_repo_url}",
-                    channel=student.slack_handle
-                )
+                    # Send message to instructors
+                    slack_channel = student.assigned_cohorts.order_by("-id").first().cohort.slack_channel
+                    slack.queue_message(
+                        text=f"📝 {student.full_name} has started the self-assessment for {assessment.name}.",
+                        channel=slack_channel
+                    )
 
-                # Send message to instructors
-                slack_channel = student.assigned_cohorts.order_by("-id").first().cohort.slack_channel
-                slack.send_message(
-                    text=f"📝 {student.full_name} has started the self-assessment for {assessment.name}.",
-                    channel=slack_channel
-                )
+                    # Update the student assessment record with the Github repo URL
+                    student_assessment.url = created_repo_url
+                    student_assessment.save()
 
-                # Update the student assessment record with the Github repo URL
-                student_assessment.url = created_repo_url
-                student_assessment.save()
+            except GithubRateLimited:
+                raise
 
             except Exception as ex:
                 return Response({'message': ex.args[0]}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -404,6 +352,41 @@ class StudentViewSet(ModelViewSet):
 
             return Response({'message': 'Success'}, status=status.HTTP_201_CREATED)
 
+    @method_decorator(is_instructor())
+    @action(methods=['get'], detail=False)
+    def search(self, request):
+        """Search students by name or GitHub handle, best matches first
+
+        Query parameters:
+            q -- Words to match against first name, last name and GitHub handle
+            cohort -- Only search the members of this cohort
+            limit -- Maximum number of students returned (default 25, max 100)
+        """
+        terms = request.query_params.get('q', '').strip()
+        cohort = request.query_params.get('cohort', None)
+        if not terms:
+            return Response({'message': '`q` is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 25)), 1), 100)
+            cohort = int(cohort) if cohort is not None else None
+        except ValueError:
+            return Response({'message': '`limit` and `cohort` must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        students = search_students(terms, cohort)[:limit]
+        return Response([
+            {
+                'id': student.id,
+                'name': student.full_name,
+                'github_handle': student.github_handle,
+                'cohorts': [
+                    {'id': membership.cohort.id, 'name': membership.cohort.name}
+                    for membership in student.assigned_cohorts.all()
+                ],
+            }
+            for student in students
+        ], status=status.HTTP_200_OK)
+
     @method_decorator(is_instructor())
     @action(methods=['post'], detail=False)
     def teams(self, request):
@@ -468,24 +451,10 @@ class StudentViewSet(ModelViewSet):
                 note.save()
 
                 # Send message to student
-                try:
-                    headers = {
-                        "Content-Type": "application/x-www-form-urlencoded"
-                    }
-                    channel_payload = {
-                        "text": request.data.get("text", "You just received feedback from one of your coaches.\n\nVisit https://learning.nss.team to view your messages."),
-                        "token": os.getenv("SLACK_BOT_TOKEN"),
-                        "channel": student.slack_handle
-                    }
-
-                    requests.post(
-                        "https://slack.com/api/chat.postMessage",
-                        data=channel_payload,
-                        headers=headers,
-                        timeout=1000
-                    )
-                except Exception:
-                    pass
+                SlackAPI().queue_message(
+                    text=request.data.get("text", "You just received feedback from one of your coaches.\n\nVisit https://learning.nss.team to view your messages."),
+                    channel=student.slack_handle
+                )
 
             except NssUser.DoesNotExist as ex:
                 return Response({'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND)
@@ -570,6 +539,46 @@ class PersonalitySerializer(serializers.ModelSerializer):
         )
 
 
+def _as_int(value):
+    """Match IntegerField output for a trusted value"""
+    return None if value is None else int(value)
+
+
+def _as_text(value):
+    """Match CharField output, whitespace trimming included, for a trusted value"""
+    return None if value is None else str(value).strip()
+
+
+def _is_integral(value):
+    """Whether IntegerField would accept the value, e.g. 3 or 3.0 but not 3.5"""
+    try:
+        return int(value) == value
+    except (TypeError, ValueError, OverflowError):
+        return False
+
+
+def _is_valid_roster_row(row):
+    """Whether CohortStudentSerializer would accept a CohortRoster row
+
+    Mirrors the field declarations of CohortStudentSerializer for the values
+    the roster function produces.
+    """
+    required_text = ('github_handle', 'name', 'project_name', 'book_name')
+    nullable_integers = (
+        'assessment_status_id', 'project_id', 'project_duration', 'project_index',
+        'book_id', 'book_index', 'score',
+    )
+    return (
+        _is_integral(row['student_id'])
+        and all(
+            isinstance(row[field], str) and 0 < len(row[field].strip()) <= 100
+            for field in required_text
+        )
+        and (row['assessment_url'] is None or len(str(row['assessment_url']).strip()) <= 256)
+        and all(row[field] is None or _is_integral(row[field]) for field in nullable_integers)
+    )
+
+
 class CohortStudentSerializer(serializers.Serializer):
     """JSON serializer"""
     id = serializers.IntegerField()
@@ -591,6 +600,79 @@ class CohortStudentSerializer(serializers.Serializer):
     proposals = serializers.ListField(allow_empty=True, required=False)
     tags = serializers.ListField(allow_empty=True, required=False)
 
+    @staticmethod
+    def represent_roster(rows):
+        """Represent CohortRoster rows without a validation round trip
+
+        Produces the payload that validating the rows with this serializer and
+        reading `.data` would, without running every field's validators. When a
+        row would fail validation, e.g. a student with no project name, the
+        serializer returned every row as given, untrimmed. That case still goes
+        through the serializer so the payload does not change.
+
+        Args:
+            rows (list): Dictionaries from CohortRoster.for_cohort()
+
+        Returns:
+            list: One dictionary per student, in roster order
+        """
+        if not all(_is_valid_roster_row(row) for row in rows):
+            serializer = CohortStudentSerializer(data=[
+                {
+                    'id': row['student_id'],
+                    'github_handle': row['github_handle'],
+                    'name': row['name'],
+                    'current_cohort': {
+                        'id': row['cohort_id'],
+                        'name': row['cohort_name']
+                    },
+                    'avatar': row['avatar'],
+                    'assessment_status_id': row['assessment_status_id'],
+                    'assessment_url': row['assessment_url'],
+                    'project_id': row['project_id'],
+                    'project_duration': row['project_duration'],
+                    'project_index': row['project_index'],
+                    'project_name': row['project_name'],
+                    'book_id': row['book_id'],
+                    'book_index': row['book_index'],
+                    'book_name': row['book_name'],
+                    'score': row['score'],
+                    'notes': row['notes'],
+                    'proposals': row['proposals'],
+                    'tags': row['tags'],
+                }
+                for row in rows
+            ], many=True)
+            serializer.is_valid()
+            return serializer.data
+
+        return [
+            {
+                'id': _as_int(row['student_id']),
+                'github_handle': _as_text(row['github_handle']),
+                'name': _as_text(row['name']),
+                'current_cohort': {
+                    'id': row['cohort_id'],
+                    'name': row['cohort_name']
+                },
+                'avatar': _as_text(row['avatar']),
+                'assessment_status_id': _as_int(row['assessment_status_id']),
+                'assessment_url': _as_text(row['assessment_url']),
+                'project_id': _as_int(row['project_id']),
+                'project_duration': _as_int(row['project_duration']),
+                'project_index': _as_int(row['project_index']),
+                'project_name': _as_text(row['project_name']),
+                'book_id': _as_int(row['book_id']),
+                'book_index': _as_int(row['book_index']),
+                'book_name': _as_text(row['book_name']),
+                'score': _as_int(row['score']),
+                'notes': list(row['notes']),
+                'proposals': list(row['proposals']),
+                'tags': list(row['tags']),
+            }
+            for row in rows
+        ]
+
     def get_avatar(self, obj):
         try:
             github = obj.user.socialaccount_set.get(user=obj['id'])
@@ -609,8 +691,29 @@ class StudentSerializer(serializers.ModelSerializer):
     project = serializers.SerializerMethodField()
     core_skill_records = serializers.SerializerMethodField()
 
+    @staticmethod
+    def eager_queryset():
+        """NssUser queryset that loads everything this serializer reads
+
+        Every related collection is fetched with one query no matter how many
+        records, entries or notes the student has.
+        """
+        return NssUser.objects.select_related('user').prefetch_related(
+            Prefetch('projects', queryset=StudentProject.objects.select_related('project')),
+            Prefetch(
+                'learning_records',
+                queryset=LearningRecord.objects.select_related('weight').prefetch_related(
+                    Prefetch('entries', queryset=LearningRecordEntry.objects.select_related('instructor__user'))
+                ).order_by('achieved')
+            ),
+            Prefetch('core_skills', queryset=CoreSkillRecord.objects.select_related('skill').order_by('pk')),
+            Prefetch('feedback', queryset=OneOnOneNote.objects.select_related('coach__user')),
+            Prefetch('notes', queryset=StudentNote.objects.select_related('coach__user')),
+            'capstones',
+        )
+
     def get_project(self, obj):
-        project = StudentProject.objects.filter(student=obj).last()
+        project = max(obj.projects.all(), key=lambda student_project: student_project.id, default=None)
         if project is not None:
             return {
                 "id": project.project.id,
@@ -623,12 +726,11 @@ class StudentSerializer(serializers.ModelSerializer):
             }
 
     def get_records(self, obj):
-        records = LearningRecord.objects.filter(
-            student=obj).order_by("achieved")
+        records = sorted(obj.learning_records.all(), key=lambda record: record.achieved)
         return LearningRecordSerializer(records, many=True).data
 
     def get_core_skill_records(self, obj):
-        records = CoreSkillRecord.objects.filter(student=obj).order_by("pk")
+        records = sorted(obj.core_skills.all(), key=lambda record: record.pk)
         return CoreSkillRecordSerializer(records, many=True).data
 
     def get_name(self, obj):
@@ -644,3 +746,4 @@ class StudentSerializer(serializers.ModelSerializer):
             'core_skill_records', 'feedback', 'records', 'notes', 'capstones',
             'current_cohort'
         )
+        read_only_fields = ('score',)
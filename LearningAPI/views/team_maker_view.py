@@ -1,15 +1,22 @@
 import random, string, json, valkey
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import structlog
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 
 from rest_framework import serializers, status
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework.decorators import action
 
-from LearningAPI.models.people import StudentTeam, GroupProjectRepository, NSSUserTeam, Cohort
+from LearningAPI.models.people import (
+    StudentTeam, GroupProjectRepository, NSSUserTeam, Cohort, NssUser,
+    TeamProvisioningJob, ChannelArchiveJob
+)
 from LearningAPI.models.coursework import Project
-from LearningAPI.utils import GithubRequest, SlackAPI
+from LearningAPI.utils import GithubRateLimited, GithubRequest, SlackAPI, StepTimer
 
 
 valkey_client = valkey.Valkey(
@@ -18,6 +25,246 @@ valkey_client = valkey.Valkey(
     db=settings.VALKEY_CONFIG['DB'],
 )
 
+log = structlog.get_logger(__name__)
+
+
+def provision_repositories(gh_request, cohort, project, students, repo_name, api_repo_name, timings):
+    """Create a team's group project repositories and give its students access
+
+    Both repositories are generated at the same time, then every collaborator
+    grant is sent at once, with at most TEAM_PROVISIONING_MAX_WORKERS GitHub
+    requests in flight. Only GitHub is called from the worker threads, so
+    `students` must arrive with their users loaded. Grants refused by the
+    rate limit are deferred from the calling thread once the others finish.
+
+    Args:
+        gh_request (GithubRequest): Client shared by the worker threads
+        cohort (Cohort): Cohort whose GitHub organization gets the repositories
+        project (Project): Group project with the template repositories
+        students (list): NssUser instances on the team
+        repo_name (str): Name of the client repository
+        api_repo_name (str): Name of the API repository, or None when the project has no API template
+        timings (StepTimer): Receives the "repositories" and "collaborators" steps
+
+    Returns:
+        list: Names of the repositories created, client first, or None when
+            the client repository could not be created
+
+    Raises:
+        GithubRateLimited: GitHub is rate limited and the client repository
+            was not created
+    """
+    student_org_name = cohort.info.student_organization_url.split("/")[-1]
+    templates = {repo_name: project.client_template_url}
+    if api_repo_name is not None:
+        templates[api_repo_name] = project.api_template_url
+
+    def grant(name, student):
+        """Send one collaborator grant, returning it when it must be deferred"""
+        try:
+            gh_request.assign_student_permissions(
+                student_org_name=student_org_name, repo_name=name, student=student, defer=False
+            )
+        except GithubRateLimited:
+            return name, student
+        return None
+
+    with ThreadPoolExecutor(max_workers=settings.TEAM_PROVISIONING_MAX_WORKERS) as executor:
+        with timings.step("repositories"):
+            generations = {
+                name: executor.submit(
+                    gh_request.create_repository,
+                    source_url=templates[name],
+                    student_org_url=cohort.info.student_organization_url,
+                    repo_name=name,
+                    project_name=project.name
+                )
+                for name in templates
+            }
+            responses = {}
+            for name, generation in generations.items():
+                try:
+                    responses[name] = generation.result()
+                except GithubRateLimited:
+                    if name == repo_name:
+                        raise
+                    responses[name] = None
+
+        created = [name for name, response in responses.items() if response is not None and response.status_code == 201]
+        if repo_name not in created:
+            return None
+
+        for name in set(templates) - set(created):
+            log.error("Group project repository was not created", repository=name, project=project.name)
+
+        with timings.step("collaborators"):
+            grants = [executor.submit(grant, name, student) for name in created for student in students]
+            rate_limited = [refused for refused in (future.result() for future in grants) if refused is not None]
+
+    # Deferring writes to the database, so it is kept out of the worker threads
+    for name, student in rate_limited:
+        gh_request.assign_student_permissions(student_org_name=student_org_name, repo_name=name, student=student)
+
+    return created
+
+def create_team_channel(slack, cohort, team_prefix, student_ids):
+    """Create the Slack channel for a team and invite its members
+
+    Returns:
+        str: Id of the new channel
+    """
+    # The cohort name will always end in a number. Split on the space and get the last item
+    random_team_suffix = ''.join(random.choice(string.ascii_lowercase) for i in range(6))
+    channel_name = f"{team_prefix}-{cohort.name.split(' ')[-1]}-{random_team_suffix}"
+    # Lowercase the channel name
+    return slack.create_channel(channel_name.lower(), student_ids)
+
+
+def provision_team_repositories(team, project, slack, timings):
+    """Create a team's group project repositories and announce them in its channel
+
+    Returns:
+        str: "org/repo" of the client repository, or None when it could not be created
+    """
+    cohort = team.cohort
+
+    # Get student Github organization name
+    student_org_name = cohort.info.student_organization_url.split("/")[-1]
+
+    # Replace all spaces in the assessment name with hyphens
+    random_suffix = ''.join(random.choice(string.ascii_lowercase) for i in range(6))
+    repo_name = f'{project.name.replace(" ", "-")}-client-{random_suffix}'
+    api_repo_name = f'{project.name.replace(" ", "-")}-api-{random_suffix}' if project.api_template_url else None
+
+    repo_names = provision_repositories(
+        gh_request=GithubRequest(),
+        cohort=cohort,
+        project=project,
+        students=list(team.students.select_related('user')),
+        repo_name=repo_name,
+        api_repo_name=api_repo_name,
+        timings=timings,
+    )
+
+    if repo_names is None:
+        return None
+
+    for created_repo_name in repo_names:
+        # Save the team's repository URL to the database
+        group_project_repo = GroupProjectRepository()
+        group_project_repo.team_id = team.id
+        group_project_repo.project = project
+        group_project_repo.repository = f'https://github.com/{student_org_name}/{created_repo_name}'
+        group_project_repo.save()
+
+        # Send message to project team's Slack channel with the repository URL
+        repo_kind = "API" if created_repo_name == api_repo_name else "client"
+        slack.queue_message(
+            text=f"🐙 Your {repo_kind} repository has been created. Visit the URL below and clone the project to your machine.\n\n{group_project_repo.repository}",
+            channel=team.slack_channel
+        )
+
+    return f'{student_org_name}/{repo_name}'
+
+
+def publish_ticket_migration(cohort, project, target_repos):
+    """Publish a message on Valkey asking the ticket migrator to copy the project's issues"""
+    message = json.dumps({
+        'notification_channel': cohort.slack_channel,
+        'source_repo': "/".join(project.client_template_url.split('/')[-2:]),
+        'all_target_repositories': target_repos
+    })
+    valkey_client.publish('channel_migrate_issue_tickets', message)
+
+
+def run_provisioning_job(job):
+    """Create the Slack channels and repositories of every team in a bulk job
+
+    Teams that already have a channel or repositories are not set up again,
+    so a job that was interrupted can be run a second time. Its progress
+    counts start over when it is claimed again, so each team is counted once.
+
+    Args:
+        job (TeamProvisioningJob): Job claimed by the provision_teams command
+    """
+    slack = SlackAPI()
+    target_repos = []
+    teams = StudentTeam.objects.filter(id__in=job.team_ids).select_related('cohort__info').order_by('id')
+
+    for team in teams:
+        timings = StepTimer()
+        try:
+            if not team.slack_channel:
+                with timings.step("slack_channel"):
+                    student_ids = list(team.students.values_list('id', flat=True))
+                    team.slack_channel = create_team_channel(slack, team.cohort, job.team_prefix, student_ids)
+                team.save(update_fields=['slack_channel'])
+
+            if job.project is not None and not team.repositories.exists():
+                target_repo = provision_team_repositories(team, job.project, slack, timings)
+                if target_repo is None:
+                    raise RuntimeError('Failed to create repository')
+                target_repos.append(target_repo)
+
+            job.completed += 1
+        except Exception as ex:  # pylint: disable=broad-except
+            job.failed += 1
+            job.errors.append({'team': team.id, 'message': str(ex)})
+
+        log.info("Team provisioned", job=job.id, team=team.id, timings=timings.durations)
+        job.save_progress()
+
+    # Migrate the project's issue tickets to every new client repository at once
+    if target_repos:
+        publish_ticket_migration(job.cohort, job.project, target_repos)
+
+    job.finish()
+
+
+def run_archive_job(job):
+    """Archive the Slack channels of a reset cohort's teams
+
+    Channels are archived at the same time, with at most
+    SLACK_ARCHIVE_MAX_WORKERS calls in flight. Progress is saved as each
+    one finishes.
+
+    Args:
+        job (ChannelArchiveJob): Job claimed by the archive_slack_channels command
+    """
+    slack = SlackAPI()
+
+    with ThreadPoolExecutor(max_workers=settings.SLACK_ARCHIVE_MAX_WORKERS) as executor:
+        archives = {
+            executor.submit(slack.delete_channel, channel_id): channel_id
+            for channel_id in job.channel_ids
+        }
+
+        for archive in as_completed(archives):
+            try:
+                if not archive.result():
+                    raise RuntimeError('Slack did not archive the channel')
+                job.archived += 1
+            except Exception as ex:  # pylint: disable=broad-except
+                job.failed += 1
+                job.errors.append({'channel': archives[archive], 'message': str(ex)})
+
+            job.save_progress()
+
+    job.finish()
+
+
+class TeamProvisioningJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TeamProvisioningJob
+        fields = ( 'id', 'cohort', 'project', 'status', 'total', 'completed', 'failed', 'errors', 'team_ids', 'created_on', 'finished_on' )
+
+
+class ChannelArchiveJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChannelArchiveJob
+        fields = ( 'id', 'cohort', 'status', 'total', 'archived', 'failed', 'errors', 'created_on', 'finished_on' )
+
+
 class TeamRepoSerializer(serializers.ModelSerializer):
     class Meta:
         model = GroupProjectRepository
@@ -61,8 +308,6 @@ class TeamMakerView(ViewSet):
         group_project_id = request.data.get('groupProject', None)
         team_prefix = request.data.get('weeklyPrefix', None)
 
-        issue_target_repos = []
-
         # Create the student team in the database
         cohort = Cohort.objects.get(pk=cohort_id)
         team = StudentTeam()
@@ -70,119 +315,114 @@ class TeamMakerView(ViewSet):
         team.cohort = cohort
         team.sprint_team = group_project_id is not None
 
+        timings = StepTimer()
+
         # Create the Slack channel and add students to it and store the channel ID in the team
-        # The cohort name will always end in a number. Split on the space and get the last item
         slack = SlackAPI()
-        random_team_suffix = ''.join(random.choice(string.ascii_lowercase) for i in range(6))
-        channel_name = f"{team_prefix}-{cohort.name.split(' ')[-1]}-{random_team_suffix}"
-        # Lowercase the channel name
-        channel_name = channel_name.lower()
         try:
-            team.slack_channel = slack.create_channel(channel_name, student_list)
+            with timings.step("slack_channel"):
+                team.slack_channel = create_team_channel(slack, cohort, team_prefix, student_list)
         except Exception as ex:
             return Response({'message': str(ex)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        team.save()
-
-        # Assign the students to the team. Use a for loop with enumerate to get the index of the student
-        for student in student_list:
-            student_team = NSSUserTeam()
-            student_team.student_id = student
-            student_team.team = team
-            student_team.save()
-
-        # Create group project repository if group project is not None
-        if group_project_id is not None:
-            project = Project.objects.get(pk=group_project_id)
-
-            # Get student Github organization name
-            student_org_name = cohort.info.student_organization_url.split("/")[-1]
-
-            # Replace all spaces in the assessment name with hyphens
-            random_suffix = ''.join(random.choice(string.ascii_lowercase) for i in range(6))
-            repo_name = f'{project.name.replace(" ", "-")}-client-{random_suffix}'
-
-            # Create the client repository for the group project
-            gh_request = GithubRequest()
-
-            response = gh_request.create_repository(
-                source_url=project.client_template_url,
-                student_org_url=cohort.info.student_organization_url,
-                repo_name=repo_name,
-                project_name=project.name
-            )
-
-            if response.status_code != 201:
-                return Response({'message': 'Failed to create repository'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        # When GitHub is rate limited the team is rolled back and its channel
+        # archived, so the request can be sent again once the limit resets
+        try:
+            with transaction.atomic():
+                team.save()
+
+                # Assign the students to the team. Use a for loop with enumerate to get the index of the student
+                for student in student_list:
+                    student_team = NSSUserTeam()
+                    student_team.student_id = student
+                    student_team.team = team
+                    student_team.save()
+
+                # Create group project repository if group project is not None
+                target_repo = None
+                if group_project_id is not None:
+                    project = Project.objects.get(pk=group_project_id)
+                    target_repo = provision_team_repositories(team, project, slack, timings)
+
+                    if target_repo is None:
+                        return Response({'message': 'Failed to create repository'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except GithubRateLimited:
+            slack.delete_channel(team.slack_channel)
+            raise
 
-            # Grant write permissions to the students
-            for student in team.students.all(): # pylint: disable=E1101
-                gh_request.assign_student_permissions(
-                    student_org_name=student_org_name,
-                    repo_name=repo_name,
-                    student=student
-                )
+        if target_repo is not None:
+            # Start migrating the project's issue tickets to the client repository
+            publish_ticket_migration(cohort, project, [target_repo])
 
-            # Save the team's client-side repository URL to the database
-            group_project_repo = GroupProjectRepository()
-            group_project_repo.team_id = team.id
-            group_project_repo.project = project
-            group_project_repo.repository = f'https://github.com/{student_org_name}/{repo_name}'
-            group_project_repo.save()
+        serialized_team = StudentTeamSerializer(team, many=False).data
 
-            issue_target_repos.append(f'{student_org_name}/{repo_name}')
+        return Response(serialized_team, status=status.HTTP_201_CREATED, headers=timings.headers())
 
-            # Send message to project team's Slack channel with the repository URL
-            created_repo_url = f'https://github.com/{student_org_name}/{repo_name}'
-            slack.send_message(
-                text=f"🐙 Your client repository has been created. Visit the URL below and clone the project to your machine.\n\n{created_repo_url}",
-                channel=team.slack_channel
-            )
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create every team for a cohort at once
 
-            # Create the API repository for the group project if it exists
-            if project.api_template_url:
-                api_repo_name = f'{project.name.replace(" ", "-")}-api-{random_suffix}'
+        The teams are saved in one transaction and the response returns right
+        away. Their Slack channels and repositories are created by the
+        provision_teams command; poll GET /teams/bulk/<job id> for progress.
+        """
+        cohort_id = request.data.get('cohort', None)
+        teams = request.data.get('teams', None)
+        group_project_id = request.data.get('groupProject', None)
+        team_prefix = request.data.get('weeklyPrefix', None)
 
-                gh_request.create_repository(
-                    source_url=project.api_template_url,
-                    student_org_url=cohort.info.student_organization_url,
-                    repo_name=api_repo_name,
-                    project_name=project.name
-                )
+        if not isinstance(teams, list) or not teams or not all(
+            isinstance(students, list) and students
+            and all(isinstance(student_id, int) and not isinstance(student_id, bool) for student_id in students)
+            for students in teams
+        ):
+            return Response({'message': 'Provide \'teams\' as a list of student id lists'}, status=status.HTTP_400_BAD_REQUEST)
 
-                # Grant write permissions to the students
-                for student in team.students.all():
-                    gh_request.assign_student_permissions(
-                        student_org_name=student_org_name,
-                        repo_name=api_repo_name,
-                        student=student
-                    )
-
-                # Save the team's API repository URL to the database
-                group_project_repo = GroupProjectRepository()
-                group_project_repo.team_id = team.id
-                group_project_repo.project = project
-                group_project_repo.repository = f'https://github.com/{student_org_name}/{api_repo_name}'
-                group_project_repo.save()
-
-                # Send message to project team's Slack channel with the repository URL
-                created_repo_url = f'https://github.com/{student_org_name}/{api_repo_name}'
-                slack.send_message(
-                    text=f"🐙 Your API repository has been created. Visit the URL below and clone the project to your machine.\n\n{created_repo_url}",
-                    channel=team.slack_channel
-                )
+        try:
+            cohort = Cohort.objects.get(pk=cohort_id)
+            project = Project.objects.get(pk=group_project_id) if group_project_id is not None else None
+        except (Cohort.DoesNotExist, Project.DoesNotExist) as ex:
+            return Response({'message': str(ex)}, status=status.HTTP_404_NOT_FOUND)
 
-            message = json.dumps({
-                'notification_channel': cohort.slack_channel,
-                'source_repo': "/".join(project.client_template_url.split('/')[-2:]),
-                'all_target_repositories': issue_target_repos
-            })
-            valkey_client.publish('channel_migrate_issue_tickets', message)
+        student_ids = {student_id for students in teams for student_id in students}
+        if len(student_ids) != sum(len(students) for students in teams):
+            return Response({'message': 'A student is listed more than once in \'teams\''}, status=status.HTTP_400_BAD_REQUEST)
+
+        in_cohort = NssUser.objects.filter(id__in=student_ids, assigned_cohorts__cohort=cohort).distinct().count()
+        if in_cohort != len(student_ids):
+            return Response({'message': 'Every student in \'teams\' must belong to the cohort'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            created_teams = StudentTeam.objects.bulk_create([
+                StudentTeam(group_name="", cohort=cohort, sprint_team=project is not None)
+                for _ in teams
+            ])
+            NSSUserTeam.objects.bulk_create([
+                NSSUserTeam(team=team, student_id=student_id)
+                for team, students in zip(created_teams, teams)
+                for student_id in students
+            ])
+            job = TeamProvisioningJob.objects.create(
+                cohort=cohort,
+                project=project,
+                team_prefix=team_prefix or "",
+                team_ids=[team.id for team in created_teams],
+            )
 
-        serialized_team = StudentTeamSerializer(team, many=False).data
+        return Response(
+            TeamProvisioningJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': request.build_absolute_uri(f'/teams/bulk/{job.id}')}
+        )
 
-        # Publish a message to the channel_migrate_issue_tickets channel on redis to start migrating tickets
+    @action(detail=False, methods=['get'], url_path=r'bulk/(?P<job_id>\d+)')
+    def bulk_progress(self, request, job_id):
+        """Report the progress of a bulk team provisioning job"""
+        try:
+            job = TeamProvisioningJob.objects.get(pk=job_id)
+        except TeamProvisioningJob.DoesNotExist as ex:
+            return Response({'message': str(ex)}, status=status.HTTP_404_NOT_FOUND)
 
-        return Response(serialized_team, status=status.HTTP_201_CREATED)
+        return Response(TeamProvisioningJobSerializer(job).data, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['delete'])
     def reset(self, request):
@@ -193,23 +433,38 @@ class TeamMakerView(ViewSet):
 
         try:
             cohort = Cohort.objects.get(pk=cohort_id)
-            self._delete_slack_channels(cohort)
-            self._delete_cohort_teams(cohort)
-            return Response(None, status=status.HTTP_204_NO_CONTENT)
+
+            # Delete the teams now and leave their Slack channels to the archive_slack_channels command
+            with transaction.atomic():
+                channel_ids = list(
+                    StudentTeam.objects.filter(cohort=cohort)
+                    .exclude(Q(slack_channel="") | Q(slack_channel__isnull=True))
+                    .values_list('slack_channel', flat=True)
+                )
+                self._delete_cohort_teams(cohort)
+                job = ChannelArchiveJob.objects.create(cohort=cohort, channel_ids=channel_ids)
+
+            return Response(
+                ChannelArchiveJobSerializer(job).data,
+                status=status.HTTP_202_ACCEPTED,
+                headers={'Location': request.build_absolute_uri(f'/teams/reset/{job.id}')}
+            )
         except Cohort.DoesNotExist as ex:
             return Response({'message': str(ex)}, status=status.HTTP_404_NOT_FOUND)
         except Exception as ex:
             return Response({'message': str(ex)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['get'], url_path=r'reset/(?P<job_id>\d+)')
+    def reset_progress(self, request, job_id):
+        """Report the progress of archiving a reset cohort's Slack channels"""
+        try:
+            job = ChannelArchiveJob.objects.get(pk=job_id)
+        except ChannelArchiveJob.DoesNotExist as ex:
+            return Response({'message': str(ex)}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(ChannelArchiveJobSerializer(job).data, status=status.HTTP_200_OK)
+
     def _delete_cohort_teams(self, cohort):
         NSSUserTeam.objects.filter(team__cohort=cohort).delete()
         GroupProjectRepository.objects.filter(team__cohort=cohort).delete()
         StudentTeam.objects.filter(cohort=cohort).delete()
-
-    def _delete_slack_channels(self, cohort):
-        current_teams = StudentTeam.objects.filter(cohort=cohort)
-
-        for team in current_teams:
-            slack = SlackAPI()
-            slack.delete_channel(team.slack_channel)
-
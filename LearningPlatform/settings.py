@@ -90,6 +90,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Added for trigram search lookups
     'rest_framework',
     'rest_framework.authtoken',
     'dj_rest_auth',
@@ -137,6 +138,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'LearningAPI.middleware.RequestContextMiddleware', # Added for structlog tracing
+    'LearningAPI.middleware.QueryProfileMiddleware',   # Added for per-request query counts
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django_prometheus.middleware.PrometheusAfterMiddleware',  # Added for Prometheus metrics
@@ -209,6 +211,69 @@ VALKEY_CONFIG = {
     'DB': os.getenv("VALKEY_DB", 0),
 }
 
+# Seconds a student's current cohort stays cached in Valkey between requests.
+# Set to 0 to resolve it from the database on every request.
+CURRENT_COHORT_CACHE_TTL = int(os.getenv("CURRENT_COHORT_CACHE_TTL", 60 * 60))
+
+# Connection pool shared by SlackAPI and GithubRequest. CONNECTIONS is the
+# number of hosts kept pooled, MAXSIZE the keep-alive connections per host, and
+# BLOCK makes callers wait for a free connection instead of opening extra ones.
+HTTP_POOL_CONFIG = {
+    'CONNECTIONS': int(os.getenv("HTTP_POOL_CONNECTIONS", 10)),
+    'MAXSIZE': int(os.getenv("HTTP_POOL_MAXSIZE", 10)),
+    'BLOCK': os.getenv("HTTP_POOL_BLOCK", "false").lower() == "true",
+}
+
+# Slack Web API base URL, and how the deliver_slack_messages worker retries.
+# A failed message is retried after SLACK_OUTBOX_RETRY_SECONDS, doubling each
+# time, until it has been tried SLACK_OUTBOX_MAX_ATTEMPTS times. A claimed
+# message is retried after SLACK_OUTBOX_LEASE_SECONDS if its worker stops.
+SLACK_API_URL = os.getenv("SLACK_API_URL", "https://slack.com/api")
+SLACK_OUTBOX_MAX_ATTEMPTS = int(os.getenv("SLACK_OUTBOX_MAX_ATTEMPTS", 8))
+SLACK_OUTBOX_RETRY_SECONDS = int(os.getenv("SLACK_OUTBOX_RETRY_SECONDS", 30))
+SLACK_OUTBOX_LEASE_SECONDS = int(os.getenv("SLACK_OUTBOX_LEASE_SECONDS", 300))
+
+# GitHub requests left unspent in the shared rate limit budget, and how many
+# times run_deferred_github_requests tries a deferred write before giving up.
+# A claimed write is retried after GITHUB_DEFERRED_LEASE_SECONDS if its worker stops.
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", 10))
+GITHUB_DEFERRED_MAX_ATTEMPTS = int(os.getenv("GITHUB_DEFERRED_MAX_ATTEMPTS", 5))
+GITHUB_DEFERRED_LEASE_SECONDS = int(os.getenv("GITHUB_DEFERRED_LEASE_SECONDS", 300))
+
+# GitHub requests the team maker sends at once while creating a team's repositories
+TEAM_PROVISIONING_MAX_WORKERS = int(os.getenv("TEAM_PROVISIONING_MAX_WORKERS", 8))
+
+# Seconds without progress after which a running background job is assumed
+# abandoned by its worker and claimed again
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 900))
+
+# Slack channels archive_slack_channels archives at once after a team reset
+SLACK_ARCHIVE_MAX_WORKERS = int(os.getenv("SLACK_ARCHIVE_MAX_WORKERS", 4))
+
+# Buffer Foundations progress updates in Valkey and write them to the database
+# every FOUNDATIONS_FLUSH_SECONDS with flush_foundations_progress. Only enable
+# it where that command runs as a worker.
+FOUNDATIONS_WRITE_BEHIND = os.getenv("FOUNDATIONS_WRITE_BEHIND", "false").lower() == "true"
+FOUNDATIONS_FLUSH_SECONDS = float(os.getenv("FOUNDATIONS_FLUSH_SECONDS", 5))
+
+# Per-request query profiling by QueryProfileMiddleware. A query pattern run
+# QUERY_DUPLICATE_THRESHOLD times in one request is reported as a likely N+1.
+# QUERY_BUDGETS caps the queries of views by URL name and QUERY_BUDGET_DEFAULT
+# caps the rest. With QUERY_BUDGET_STRICT an exceeded budget raises instead of
+# logging, which fails the test that made the request. The test suite turns it
+# on in LearningAPI/tests/conftest.py.
+QUERY_PROFILE_ENABLED = os.getenv("QUERY_PROFILE_ENABLED", "true").lower() == "true"
+QUERY_DUPLICATE_THRESHOLD = int(os.getenv("QUERY_DUPLICATE_THRESHOLD", 5))
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT")) if os.getenv("QUERY_BUDGET_DEFAULT") else None
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+QUERY_BUDGETS = {
+    'cohort-list': 10,
+    'course-list': 10,
+    'course-detail': 10,
+    'foundation-list': 10,
+    'foundation-summary': 10,
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/2.0/ref/settings/#auth-password-validators
 